@@ -35,6 +35,7 @@ interface SheetResponse {
     workspace_id: string;
     name: string;
     column_schema: Array<{ key: string; label: string; type?: string }>;
+    row_ordering: "float" | "lexical";
     created_at: string;
 }
 
@@ -43,10 +44,33 @@ interface RowResponse {
     sheet_id: string;
     data: Record<string, string>;
     row_order: string;
+    order_key: string;
+    version: number;
+    change_seq: number;
     created_at: string;
     updated_at: string;
 }
 
+interface RowPage {
+    rows: RowResponse[];
+    next_cursor: string | null;
+    change_seq: number | null;
+}
+
+export interface RowChanges {
+    change_seq: number;
+    rows: RowResponse[];
+    deleted_ids: string[];
+    reset: boolean;
+}
+
+interface CsvImportReport {
+    inserted: number;
+    rejected: number;
+    errors: Array<{ line: number; error: string }>;
+    errors_truncated: boolean;
+}
+
 interface AgentRuleResponse {
     id: string;
     sheet_id: string;
@@ -109,11 +133,46 @@ export function useSheet(sheetId: string | null) {
 
 /* ── Row Hooks ────────────────────────────────────────── */
 
+/*
+ * The rows endpoint is keyset-paginated: each page returns a next_cursor
+ * that we pass back as `after` until it comes back null. The cache still
+ * holds a flat RowResponse[] so socket/optimistic updates stay simple.
+ */
+const ROWS_PAGE_SIZE = 1000;
+
+/*
+ * Change sequence number the cached rows of each sheet are up to date with.
+ * Set from the first page of a full fetch; useSheetSocket advances it as
+ * events arrive and catches up through GET /sheets/{id}/changes?since=.
+ */
+export const rowsChangeSeq = new Map<string, number>();
+
+async function fetchAllRows(sheetId: string): Promise<RowResponse[]> {
+    const rows: RowResponse[] = [];
+    let after: string | null = null;
+    let changeSeq: number | null = null;
+    do {
+        const cursor: string = after ? `&after=${encodeURIComponent(after)}` : "";
+        const page: RowPage = await api.get<RowPage>(
+            `/sheets/${sheetId}/rows?limit=${ROWS_PAGE_SIZE}${cursor}`,
+        );
+        changeSeq ??= page.change_seq;
+        rows.push(...page.rows);
+        after = page.next_cursor;
+    } while (after);
+    if (changeSeq !== null) rowsChangeSeq.set(sheetId, changeSeq);
+    return rows;
+}
+
 export function useRows(sheetId: string | null) {
     return useQuery({
         queryKey: queryKeys.rows(sheetId ?? ""),
-        queryFn: () => api.get<RowResponse[]>(`/sheets/${sheetId}/rows`),
+        queryFn: () => fetchAllRows(sheetId!),
         enabled: !!sheetId,
+        // useSheetSocket keeps the cache current (events + delta catch-up),
+        // so don't download the whole sheet again on focus/reconnect.
+        refetchOnWindowFocus: false,
+        refetchOnReconnect: false,
     });
 }
 
@@ -133,7 +192,7 @@ export function useCreateRow(sheetId: string) {
  *   1. onMutate: snapshot current cache, apply optimistic update
  *   2. API call runs in background
  *   3. onError: rollback to snapshot
- *   4. onSettled: invalidate to ensure server truth wins
+ *   4. onSuccess: store the returned row (server truth) — no sheet refetch
  */
 export function useMutateRow(sheetId: string) {
     const qc = useQueryClient();
@@ -163,15 +222,18 @@ export function useMutateRow(sheetId: string) {
             return { previous };
         },
 
+        onSuccess: (row) => {
+            // Server truth is the returned row — no need to refetch the sheet
+            qc.setQueryData<RowResponse[]>(queryKeys.rows(sheetId), (old) =>
+                old?.map((r) => (r.id === row.id && r.version <= row.version ? row : r)),
+            );
+        },
+
         onError: (_err, _vars, context) => {
-            // Rollback on error
+            // Rollback on error, then refetch to ensure server truth
             if (context?.previous) {
                 qc.setQueryData(queryKeys.rows(sheetId), context.previous);
             }
-        },
-
-        onSettled: () => {
-            // Always refetch to ensure server truth
             qc.invalidateQueries({ queryKey: queryKeys.rows(sheetId) });
         },
     });
@@ -181,7 +243,10 @@ export function useDeleteRow(sheetId: string) {
     const qc = useQueryClient();
     return useMutation({
         mutationFn: (rowId: string) => api.delete(`/rows/${rowId}`),
-        onSuccess: () => qc.invalidateQueries({ queryKey: queryKeys.rows(sheetId) }),
+        onSuccess: (_res, rowId) =>
+            qc.setQueryData<RowResponse[]>(queryKeys.rows(sheetId), (old) =>
+                old?.filter((r) => r.id !== rowId),
+            ),
     });
 }
 
@@ -191,7 +256,7 @@ export function useImportCSV(sheetId: string) {
         mutationFn: (file: File) => {
             const fd = new FormData();
             fd.append("file", file);
-            return api.upload<RowResponse[]>(`/sheets/${sheetId}/import-csv`, fd);
+            return api.upload<CsvImportReport>(`/sheets/${sheetId}/import-csv`, fd);
         },
         onSuccess: () => qc.invalidateQueries({ queryKey: queryKeys.rows(sheetId) }),
     });
@@ -7,7 +7,14 @@
  * WHY UPDATE CACHE DIRECTLY (not invalidate)?
  *   - Invalidation triggers a full refetch → flicker + latency
  *   - Direct cache update is instant and smooth
- *   - We still invalidate on reconnect to catch missed events
+ *
+ * MISSED EVENTS (delta sync):
+ *   Row events carry the sheet's change `seq`, consecutive per sheet.
+ *   rowsChangeSeq holds the seq the cache is up to date with. On a jump
+ *   (seq > last + 1) or a reconnect we fetch only what changed since —
+ *   GET /sheets/{id}/changes?since=last — and merge it; a full refetch
+ *   happens only when the server answers reset (too much changed, or
+ *   `since` is older than the server's tombstone retention).
  *
  * RECONNECTION STRATEGY:
  *   Exponential backoff: 1s → 2s → 4s → 8s → max 30s
@@ -19,22 +26,51 @@
 
 import { useEffect, useRef, useState } from "react";
 import { useQueryClient } from "@tanstack/react-query";
-import { queryKeys } from "./useSheetData";
+import { api } from "@/lib/api";
+import { queryKeys, rowsChangeSeq, type RowChanges } from "./useSheetData";
 
 const WS_BASE = process.env.NEXT_PUBLIC_WS_URL ?? "ws://localhost:8000";
 
 interface RowEvent {
-    event: "row_created" | "row_updated" | "row_deleted";
+    event: "row_created" | "row_updated" | "row_moved";
+    seq: number;
     row: {
         id: string;
         sheet_id: string;
         data: Record<string, string>;
         row_order: string;
+        order_key: string;
+        version: number;
+        change_seq: number;
         created_at: string;
         updated_at: string;
     };
 }
 
+interface RowsUpdatedEvent {
+    event: "rows_updated";
+    seq: number;
+    rows: RowEvent["row"][];
+}
+
+interface RowDeletedEvent {
+    event: "row_deleted";
+    seq: number;
+    row_id: string;
+}
+
+interface RowsDeletedEvent {
+    event: "rows_deleted";
+    seq: number;
+    count: number;
+    /** null when too many rows were deleted to list — refetch instead */
+    row_ids: string[] | null;
+}
+
+interface RowsRebalancedEvent {
+    event: "rows_rebalanced";
+}
+
 interface AgentLogEvent {
     event: "agent_log";
     log: {
@@ -47,19 +83,110 @@ interface AgentLogEvent {
     };
 }
 
-type WsEvent = RowEvent | AgentLogEvent;
+interface ImportProgressEvent {
+    event: "import_progress";
+    job_id: string;
+    status: "pending" | "running" | "succeeded" | "failed";
+    progress: { rows_parsed?: number; rows_inserted?: number; rows_rejected?: number };
+    error: string | null;
+}
+
+interface ColumnMigrationProgressEvent {
+    event: "column_migration_progress";
+    job_id: string;
+    status: "pending" | "running" | "succeeded" | "failed";
+    progress: {
+        rows_total?: number;
+        rows_rewritten?: number;
+        rows_to_recalculate?: number;
+        rows_recalculated?: number;
+    };
+    error: string | null;
+}
+
+type WsEvent =
+    | RowEvent
+    | RowsUpdatedEvent
+    | RowDeletedEvent
+    | RowsDeletedEvent
+    | RowsRebalancedEvent
+    | AgentLogEvent
+    | ImportProgressEvent
+    | ColumnMigrationProgressEvent;
+
+type Row = RowEvent["row"];
+
+/** Keep the cached row unless the event carries a newer version (events can arrive out of order). */
+function newer(cached: Row, incoming: Row): Row {
+    return incoming.version >= cached.version ? incoming : cached;
+}
+
+/** Merge a /changes response into the cached rows. */
+function applyChanges(rows: Row[], changes: RowChanges): Row[] {
+    const deleted = new Set(changes.deleted_ids);
+    const cached = new Map(rows.map((r) => [r.id, r]));
+    let next = rows.filter((r) => !deleted.has(r.id));
+    for (const row of changes.rows) {
+        const current = cached.get(row.id);
+        if (current && current.version > row.version) continue;
+        next = placeRow(next.filter((r) => r.id !== row.id), row);
+    }
+    return next;
+}
+
+/** Server row position: (order_key, row_order, id) — see Row model. */
+function comparePosition(a: Row, b: Row): number {
+    if (a.order_key !== b.order_key) return a.order_key < b.order_key ? -1 : 1;
+    const byOrder = Number(a.row_order) - Number(b.row_order);
+    if (byOrder !== 0) return byOrder;
+    return a.id < b.id ? -1 : a.id > b.id ? 1 : 0;
+}
+
+/** Insert `row` where the server would list it. */
+function placeRow(rows: Row[], row: Row): Row[] {
+    const index = rows.findIndex((r) => comparePosition(r, row) > 0);
+    return index === -1 ? [...rows, row] : [...rows.slice(0, index), row, ...rows.slice(index)];
+}
 
 export function useSheetSocket(sheetId: string | null) {
     const qc = useQueryClient();
     const wsRef = useRef<WebSocket | null>(null);
     const retryCountRef = useRef(0);
     const [agentLogs, setAgentLogs] = useState<AgentLogEvent["log"][]>([]);
+    const [importJobs, setImportJobs] = useState<Record<string, ImportProgressEvent>>({});
+    const [columnMigrations, setColumnMigrations] = useState<
+        Record<string, ColumnMigrationProgressEvent>
+    >({});
 
     useEffect(() => {
         if (!sheetId) return;
 
         let disposed = false;
         let timer: ReturnType<typeof setTimeout>;
+        let catchingUp = false;
+        const key = queryKeys.rows(sheetId);
+
+        /** Fetch and merge only the changes since the cached seq. */
+        async function catchUp() {
+            const since = rowsChangeSeq.get(sheetId!);
+            if (since === undefined || catchingUp) return;
+            catchingUp = true;
+            try {
+                const changes = await api.get<RowChanges>(
+                    `/sheets/${sheetId}/changes?since=${since}`,
+                );
+                if (changes.reset) {
+                    qc.invalidateQueries({ queryKey: key });
+                    return;
+                }
+                qc.setQueryData(key, (old: Row[] | undefined) => old && applyChanges(old, changes));
+                rowsChangeSeq.set(sheetId!, Math.max(changes.change_seq, rowsChangeSeq.get(sheetId!) ?? 0));
+            } catch {
+                qc.invalidateQueries({ queryKey: key });
+            } finally {
+                catchingUp = false;
+            }
+        }
 
         function connect() {
             if (disposed) return;
@@ -69,6 +196,8 @@ export function useSheetSocket(sheetId: string | null) {
 
             ws.onopen = () => {
                 retryCountRef.current = 0;
+                // Reconnected: pick up whatever happened while we were away
+                catchUp();
             };
 
             ws.onmessage = (evt) => {
@@ -80,26 +209,88 @@ export function useSheetSocket(sheetId: string | null) {
                         return;
                     }
 
-                    const key = queryKeys.rows(sheetId!);
+                    if (msg.event === "import_progress") {
+                        setImportJobs(prev => ({ ...prev, [msg.job_id]: msg }));
+                        // Background imports don't emit per-row events — catch up once done
+                        if (msg.status === "succeeded" || msg.status === "failed") {
+                            catchUp();
+                        }
+                        return;
+                    }
+
+                    if (msg.event === "column_migration_progress") {
+                        setColumnMigrations(prev => ({ ...prev, [msg.job_id]: msg }));
+                        // Renamed/dropped cells were rewritten — catch up once done
+                        if (msg.status === "succeeded" || msg.status === "failed") {
+                            catchUp();
+                        }
+                        return;
+                    }
+
+                    if (msg.event === "rows_rebalanced") {
+                        // Every row_order in the sheet changed — refetch
+                        qc.invalidateQueries({ queryKey: queryKeys.rows(sheetId!) });
+                        return;
+                    }
+
+                    if (msg.event === "rows_deleted" && msg.row_ids === null) {
+                        qc.invalidateQueries({ queryKey: queryKeys.rows(sheetId!) });
+                        return;
+                    }
+
+                    const last = rowsChangeSeq.get(sheetId!);
+                    if (last !== undefined) {
+                        // Already covered by a catch-up or refetch
+                        if (msg.seq <= last) return;
+                        if (msg.seq === last + 1) rowsChangeSeq.set(sheetId!, msg.seq);
+                        else catchUp(); // missed events — apply this one and fill the gap
+                    }
 
                     switch (msg.event) {
                         case "row_created":
                             qc.setQueryData(key, (old: RowEvent["row"][] | undefined) =>
-                                old ? [...old, msg.row] : [msg.row],
+                                old ? placeRow(old, msg.row) : [msg.row],
                             );
                             break;
 
+                        case "row_moved":
+                            qc.setQueryData(key, (old: RowEvent["row"][] | undefined) => {
+                                const cached = old?.find((r) => r.id === msg.row.id);
+                                if (!old || (cached && cached.version > msg.row.version)) return old;
+                                return placeRow(old.filter((r) => r.id !== msg.row.id), msg.row);
+                            });
+                            break;
+
                         case "row_updated":
                             qc.setQueryData(key, (old: RowEvent["row"][] | undefined) =>
-                                old?.map((r) => (r.id === msg.row.id ? msg.row : r)),
+                                old?.map((r) => (r.id === msg.row.id ? newer(r, msg.row) : r)),
+                            );
+                            break;
+
+                        case "rows_updated": {
+                            const byId = new Map(msg.rows.map((r) => [r.id, r]));
+                            qc.setQueryData(key, (old: RowEvent["row"][] | undefined) =>
+                                old?.map((r) => {
+                                    const incoming = byId.get(r.id);
+                                    return incoming ? newer(r, incoming) : r;
+                                }),
                             );
                             break;
+                        }
 
                         case "row_deleted":
                             qc.setQueryData(key, (old: RowEvent["row"][] | undefined) =>
-                                old?.filter((r) => r.id !== msg.row.id),
+                                old?.filter((r) => r.id !== msg.row_id),
+                            );
+                            break;
+
+                        case "rows_deleted": {
+                            const deleted = new Set(msg.row_ids);
+                            qc.setQueryData(key, (old: RowEvent["row"][] | undefined) =>
+                                old?.filter((r) => !deleted.has(r.id)),
                             );
                             break;
+                        }
                     }
                 } catch {
                     // Ignore malformed messages
@@ -127,5 +318,5 @@ export function useSheetSocket(sheetId: string | null) {
         };
     }, [sheetId, qc]);
 
-    return { agentLogs };
+    return { agentLogs, importJobs, columnMigrations };
 }
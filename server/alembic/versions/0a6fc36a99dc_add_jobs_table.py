@@ -0,0 +1,54 @@
+"""Add jobs table for background CSV imports
+
+Revision ID: 0a6fc36a99dc
+Revises: 2d9d26219346
+Create Date: 2026-10-16 10:02:41.530117
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0a6fc36a99dc"
+down_revision: Union[str, None] = "2d9d26219346"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "sheet_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("sheets.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True,
+        ),
+        sa.Column("kind", sa.String(50), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("params", postgresql.JSONB, nullable=False),
+        sa.Column("progress", postgresql.JSONB, nullable=False),
+        sa.Column("result", postgresql.JSONB, nullable=True),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("jobs")
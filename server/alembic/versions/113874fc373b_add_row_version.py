@@ -0,0 +1,28 @@
+"""Add per-row version counter for optimistic concurrency
+
+Revision ID: 113874fc373b
+Revises: 373544d5ce5c
+Create Date: 2026-10-17 00:21:56.919222
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "113874fc373b"
+down_revision: Union[str, None] = "373544d5ce5c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "rows",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("rows", "version")
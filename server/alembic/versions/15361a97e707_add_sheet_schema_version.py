@@ -0,0 +1,28 @@
+"""Add sheets.schema_version for cached row validators
+
+Revision ID: 15361a97e707
+Revises: ddf95caf6e80
+Create Date: 2026-10-17 00:38:40.183830
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "15361a97e707"
+down_revision: Union[str, None] = "ddf95caf6e80"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sheets",
+        sa.Column("schema_version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sheets", "schema_version")
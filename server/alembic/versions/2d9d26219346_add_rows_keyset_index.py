@@ -0,0 +1,31 @@
+"""Add composite (sheet_id, row_order, id) index for keyset pagination
+
+Revision ID: 2d9d26219346
+Revises: baba70db9a5a
+Create Date: 2026-10-16 09:12:04.118532
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2d9d26219346"
+down_revision: Union[str, None] = "baba70db9a5a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves both "WHERE sheet_id = ? ORDER BY row_order, id" and the
+    # "(row_order, id) > (?, ?)" seek, so every page is one index range scan.
+    op.create_index(
+        "ix_rows_sheet_id_row_order_id",
+        "rows",
+        ["sheet_id", "row_order", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rows_sheet_id_row_order_id", table_name="rows")
@@ -0,0 +1,35 @@
+"""Add per-sheet row order counter for O(1) appends
+
+Revision ID: 373544d5ce5c
+Revises: aa545ad532bb
+Create Date: 2026-10-17 00:18:15.991087
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "373544d5ce5c"
+down_revision: Union[str, None] = "aa545ad532bb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sheets",
+        sa.Column(
+            "next_row_order", sa.Float(), nullable=False, server_default="1"
+        ),
+    )
+    # Start every existing sheet's counter just above its last row.
+    op.execute(
+        "UPDATE sheets SET next_row_order = COALESCE("
+        "(SELECT max(row_order) FROM rows WHERE rows.sheet_id = sheets.id), 0) + 1"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sheets", "next_row_order")
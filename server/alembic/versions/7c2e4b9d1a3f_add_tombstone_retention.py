@@ -0,0 +1,33 @@
+"""Add sheets.tombstone_horizon and a deleted_at index for tombstone pruning
+
+Revision ID: 7c2e4b9d1a3f
+Revises: 15361a97e707
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e4b9d1a3f"
+down_revision: Union[str, None] = "15361a97e707"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nothing has been pruned yet, so every existing delta is complete.
+    op.add_column(
+        "sheets",
+        sa.Column(
+            "tombstone_horizon", sa.BigInteger(), nullable=False, server_default="0"
+        ),
+    )
+    op.create_index("ix_row_tombstones_deleted_at", "row_tombstones", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_row_tombstones_deleted_at", table_name="row_tombstones")
+    op.drop_column("sheets", "tombstone_horizon")
@@ -0,0 +1,79 @@
+"""Add generated search columns (tsvector + trigram text) to rows
+
+Revision ID: 96a1b8bca645
+Revises: f70695f33cdf
+Create Date: 2026-10-17 00:07:34.327477
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "96a1b8bca645"
+down_revision: Union[str, None] = "f70695f33cdf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # STORED generated columns: computed for existing rows here, then kept
+    # current by Postgres on every INSERT/UPDATE.
+    op.add_column(
+        "rows",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple'::regconfig, translate("
+                "lower(jsonb_path_query_array(data, '$.*'::jsonpath)::text), "
+                "'@.+-_/:', '       '))",
+                persisted=True,
+            ),
+        ),
+    )
+    op.add_column(
+        "rows",
+        sa.Column(
+            "search_text",
+            sa.Text(),
+            sa.Computed(
+                "lower(jsonb_path_query_array(data, '$.*'::jsonpath)::text)",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "ix_rows_search_vector",
+        "rows",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    # Trigram index only where the pg_trgm extension ships with the server
+    # (it is a contrib module, absent from some minimal installs). Search
+    # falls back to word/prefix matching without it.
+    bind = op.get_bind()
+    has_trgm = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_rows_search_text_trgm",
+            "rows",
+            ["search_text"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_rows_search_text_trgm")
+    op.drop_index("ix_rows_search_vector", table_name="rows")
+    op.drop_column("rows", "search_text")
+    op.drop_column("rows", "search_vector")
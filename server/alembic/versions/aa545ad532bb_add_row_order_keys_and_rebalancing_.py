@@ -0,0 +1,54 @@
+"""Add lexical row order keys and a per-sheet row ordering mode
+
+Revision ID: aa545ad532bb
+Revises: 96a1b8bca645
+Create Date: 2026-10-17 00:11:46.112163
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "aa545ad532bb"
+down_revision: Union[str, None] = "96a1b8bca645"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sheets",
+        sa.Column(
+            "row_ordering", sa.String(length=16), nullable=False, server_default="float"
+        ),
+    )
+    # Existing rows are all on float-ordered sheets, hence order_key = ''.
+    op.add_column(
+        "rows",
+        sa.Column(
+            "order_key", sa.String(collation="C"), nullable=False, server_default=""
+        ),
+    )
+    # The row position is (order_key, row_order, id) for both modes; this
+    # replaces the (sheet_id, row_order, id) keyset index.
+    op.create_index(
+        "ix_rows_sheet_id_position",
+        "rows",
+        ["sheet_id", "order_key", "row_order", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_rows_sheet_id_row_order_id", table_name="rows")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_rows_sheet_id_row_order_id",
+        "rows",
+        ["sheet_id", "row_order", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_rows_sheet_id_position", table_name="rows")
+    op.drop_column("rows", "order_key")
+    op.drop_column("sheets", "row_ordering")
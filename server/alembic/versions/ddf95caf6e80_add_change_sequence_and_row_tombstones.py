@@ -0,0 +1,60 @@
+"""Add per-sheet change sequence and row tombstones for delta sync
+
+Revision ID: ddf95caf6e80
+Revises: 113874fc373b
+Create Date: 2026-10-17 00:27:28.255659
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "ddf95caf6e80"
+down_revision: Union[str, None] = "113874fc373b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sheets",
+        sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # Existing rows predate every sequence number; clients already have them.
+    op.add_column(
+        "rows",
+        sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_rows_sheet_id_change_seq", "rows", ["sheet_id", "change_seq"])
+    op.create_table(
+        "row_tombstones",
+        sa.Column("row_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "sheet_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("sheets.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("change_seq", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_row_tombstones_sheet_id_change_seq",
+        "row_tombstones",
+        ["sheet_id", "change_seq"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("row_tombstones")
+    op.drop_index("ix_rows_sheet_id_change_seq", table_name="rows")
+    op.drop_column("rows", "change_seq")
+    op.drop_column("sheets", "change_seq")
@@ -0,0 +1,33 @@
+"""Add GIN (jsonb_path_ops) index on rows.data for containment filters
+
+Revision ID: f70695f33cdf
+Revises: 0a6fc36a99dc
+Create Date: 2026-10-16 11:20:37.904412
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f70695f33cdf"
+down_revision: Union[str, None] = "0a6fc36a99dc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # jsonb_path_ops only supports @> (not ?, ?|, ?&) but is ~3x smaller and
+    # faster than the default jsonb_ops — and @> is all the row filters use.
+    op.create_index(
+        "ix_rows_data_gin",
+        "rows",
+        ["data"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rows_data_gin", table_name="rows")
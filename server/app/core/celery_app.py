@@ -9,13 +9,19 @@ Redis is used as both the message broker (queue) and the result backend.
 """
 
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 celery_app = Celery(
     "sheetagent",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.tasks.agent_tasks"]
+    include=[
+        "app.tasks.agent_tasks",
+        "app.tasks.column_tasks",
+        "app.tasks.import_tasks",
+        "app.tasks.row_tasks",
+    ],
 )
 
 celery_app.conf.update(
@@ -28,3 +34,11 @@ celery_app.conf.update(
     task_time_limit=300, 
     task_soft_time_limit=270,
 )
+
+# Periodic jobs — run `celery -A app.core.celery_app beat` next to the worker.
+celery_app.conf.beat_schedule = {
+    "prune-row-tombstones": {
+        "task": "app.tasks.row_tasks.prune_tombstones",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
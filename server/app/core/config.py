@@ -29,6 +29,11 @@ class Settings(BaseSettings):
     # ── Redis ────────────────────────────────────────────
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # ── Background Jobs ──────────────────────────────────
+    # Uploads are spooled here for the Celery worker to pick up, so it must
+    # be a volume shared by the API and worker containers.
+    JOB_UPLOAD_DIR: str = "/tmp/sheetagent-uploads"
+
     # ── CORS ─────────────────────────────────────────────
     CORS_ORIGINS: list[str] = ["http://localhost:3000"]
 
@@ -0,0 +1,68 @@
+"""
+Serialization — Fast JSON for row payloads (listing pages, WebSocket events).
+
+WHY NOT RowResponse ON THE HOT PATH:
+  A 5000-row page used to be: ORM Row objects (identity map, attribute
+  instrumentation) → one RowResponse per row → model_dump → JSON. The
+  values are already JSON-shaped (JSONB data, floats, ints, UUIDs,
+  timestamps), so the models only validate what Postgres just returned.
+  Instead, row_service.list_page() selects plain column tuples and
+  dumps() encodes them with orjson in one native pass — several times
+  faster than the model round trip for the same bytes.
+
+SAME OUTPUT AS RowResponse:
+  orjson writes UUIDs as strings and, with OPT_UTC_Z, UTC timestamps as
+  "...Z" — the format Pydantic uses. The one thing it can't encode is an
+  integer beyond 64 bits (a cell could hold one); dumps() then falls back
+  to pydantic_core, which formats everything exactly as RowResponse does.
+  Floats with large exponents differ only in spelling (1e+16 vs 1e16).
+
+  RowResponse stays the documented response_model; routes using this
+  return a Response with the encoded body, so FastAPI skips it at runtime.
+"""
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+import orjson
+import pydantic_core
+from fastapi import Response
+
+from app.schemas.row import RowResponse
+
+# RowResponse's fields, in order — the columns a row payload is read from.
+ROW_FIELDS = tuple(RowResponse.model_fields)
+
+
+def row_payload(row: Any) -> dict[str, Any]:
+    """A RowResponse-shaped dict from an ORM Row, a column tuple or a mapping.
+
+    Tuples must hold ROW_FIELDS in order (row_service._RETURNING_COLUMNS).
+    Values are left as they are — dumps() encodes UUIDs and datetimes.
+    """
+    if isinstance(row, Mapping):
+        return {field: row[field] for field in ROW_FIELDS}
+    if isinstance(row, Sequence):
+        return dict(zip(ROW_FIELDS, row))
+    return {field: getattr(row, field) for field in ROW_FIELDS}
+
+
+def row_payloads(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    return [row_payload(row) for row in rows]
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode a JSON-able structure (plus UUIDs and datetimes) compactly."""
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_UTC_Z)
+    except orjson.JSONEncodeError:
+        return pydantic_core.to_json(obj)
+
+
+class FastJSONResponse(Response):
+    """A JSONResponse whose body is encoded with dumps()."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -28,10 +28,29 @@ WHY IN-MEMORY (not Redis pub/sub)?
 
   We start simple and upgrade to Redis pub/sub when we add Celery workers
   (they already depend on Redis).
+
+EVENTS FROM CELERY WORKERS:
+  Workers run in another process, so they can't reach `manager` directly.
+  They call publish_sheet_event(), which publishes to one Redis channel.
+  Each API process runs relay_from_redis() (started in main.py's lifespan),
+  which subscribes to that channel and re-broadcasts to its local rooms.
+  Request-path events still go straight through broadcast() — no Redis hop.
 """
 
+import asyncio
+import json
+import logging
 import uuid
+
 from fastapi import WebSocket
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+SHEET_EVENTS_CHANNEL = "sheetagent:sheet_events"
 
 
 class ConnectionManager:
@@ -59,16 +78,21 @@ class ConnectionManager:
     async def broadcast(self, sheet_id: uuid.UUID, message: dict) -> None:
         """Send a JSON message to all clients connected to a sheet.
 
+        The message is encoded once for the whole room, with the same
+        encoder as row listings, so it may carry row payloads as they come
+        from the database (UUIDs, datetimes) — see app/core/serialization.
+
         If a client has disconnected unexpectedly, we catch the error
         and remove them (stale connection cleanup).
         """
         if sheet_id not in self._rooms:
             return
 
+        text = dumps(message).decode()
         stale: list[WebSocket] = []
         for ws in self._rooms[sheet_id]:
             try:
-                await ws.send_json(message)
+                await ws.send_text(text)
             except Exception:
                 stale.append(ws)
 
@@ -84,6 +108,46 @@ class ConnectionManager:
         """Total active connections across all sheets."""
         return sum(len(conns) for conns in self._rooms.values())
 
+    async def relay_from_redis(self) -> None:
+        """Forward worker-published events to this process's sockets.
+
+        Runs until cancelled. If Redis is down we log, back off and
+        reconnect — the API keeps serving, only worker events are delayed.
+        """
+        delay = 1
+        while True:
+            try:
+                redis = aioredis.from_url(settings.REDIS_URL)
+                async with redis, redis.pubsub() as pubsub:
+                    await pubsub.subscribe(SHEET_EVENTS_CHANNEL)
+                    delay = 1
+                    async for msg in pubsub.listen():
+                        if msg["type"] != "message":
+                            continue
+                        envelope = json.loads(msg["data"])
+                        await self.broadcast(
+                            uuid.UUID(envelope["sheet_id"]), envelope["message"]
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(
+                    f"Redis event relay disconnected ({exc}); retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
 
 # Singleton instance — shared across the app
 manager = ConnectionManager()
+
+
+async def publish_sheet_event(sheet_id: uuid.UUID, message: dict) -> None:
+    """Send a sheet event from outside the API process (Celery workers).
+
+    Uses a short-lived client because each Celery task runs its own
+    asyncio.run() loop, and redis.asyncio connections are tied to a loop.
+    """
+    envelope = json.dumps({"sheet_id": str(sheet_id), "message": message})
+    async with aioredis.from_url(settings.REDIS_URL) as redis:
+        await redis.publish(SHEET_EVENTS_CHANNEL, envelope)
@@ -5,16 +5,30 @@ This is the root of the backend. All routers are registered here.
 CORS is configured to allow the Next.js frontend to communicate.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.routers import workspaces, sheets, rows, agent_rules, ws, webhooks
+from app.core.ws_manager import manager
+from app.routers import workspaces, sheets, rows, agent_rules, ws, webhooks, jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the Redis → WebSocket relay for worker events while the app is up."""
+    relay = asyncio.create_task(manager.relay_from_redis())
+    yield
+    relay.cancel()
+
 
 app = FastAPI(
     title="SheetAgent API",
     description="Agentic spreadsheet platform backend",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # ---------------------------------------------------------------------------
@@ -37,6 +51,7 @@ app.include_router(workspaces.router, prefix=API_PREFIX)
 app.include_router(sheets.router, prefix=API_PREFIX)
 app.include_router(rows.router, prefix=API_PREFIX)
 app.include_router(agent_rules.router, prefix=API_PREFIX)
+app.include_router(jobs.router, prefix=API_PREFIX)
 app.include_router(webhooks.router, prefix=API_PREFIX)  # Webhooks prefix /api/v1/webhooks
 app.include_router(ws.router)  # WebSocket — no prefix (ws://host/ws/sheet/{id})
 
@@ -6,11 +6,22 @@ to find all registered tables. By importing every model here, we ensure they're
 all registered before Alembic looks.
 """
 
+from app.models.agent_log import AgentLog
+from app.models.agent_rule import AgentRule
 from app.models.base import Base
-from app.models.workspace import Workspace
-from app.models.sheet import Sheet
+from app.models.job import Job
 from app.models.row import Row
-from app.models.agent_rule import AgentRule
-from app.models.agent_log import AgentLog
+from app.models.row_tombstone import RowTombstone
+from app.models.sheet import Sheet
+from app.models.workspace import Workspace
 
-__all__ = ["Base", "Workspace", "Sheet", "Row", "AgentRule", "AgentLog"]
+__all__ = [
+    "AgentLog",
+    "AgentRule",
+    "Base",
+    "Job",
+    "Row",
+    "RowTombstone",
+    "Sheet",
+    "Workspace",
+]
@@ -0,0 +1,76 @@
+"""
+Job Model — Long-running background work tracked in the database.
+
+Anything too slow for an HTTP request (large CSV imports, rewriting the
+cells of renamed or dropped columns) is recorded here, handed to a Celery worker, and polled via GET /jobs/{id}.
+The worker also pushes progress over the sheet WebSocket, so the table is
+the source of truth and the socket is just a fast notification path.
+
+STATUS VALUES:
+  "pending"   → Row written, task queued in Celery
+  "running"   → Worker picked it up
+  "succeeded" → Finished; `result` holds the final report
+  "failed"    → Aborted; `error` says why (work done so far is kept)
+
+PROGRESS (JSONB):
+  Counters that depend on the job kind, e.g. for "csv_import":
+    {"rows_parsed": 12000, "rows_inserted": 11994, "rows_rejected": 6}
+  and for "column_migration":
+    {"rows_total": 50000, "rows_rewritten": 12000}
+
+  Why a generic table over one table per job type?
+    Every job has the same lifecycle (status, progress, result), and the
+    polling endpoint doesn't care what kind of work it is.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    sheet_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("sheets.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # What the worker should do: "csv_import", "column_migration"
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+
+    # "pending", "running", "succeeded", "failed"
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+
+    # Kind-specific input (e.g. path of the spooled upload)
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+
+    # Live counters — see docstring above
+    progress: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+
+    # Final output once succeeded (e.g. the CsvImportReport)
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<Job {self.kind} {self.status}>"
@@ -9,8 +9,10 @@ WHY JSONB FOR ROW DATA?
   would require one SQL column per user-defined column, meaning ALTER TABLE
   on every column add. JSONB avoids this entirely.
 
-  Performance: PostgreSQL GIN indexes on JSONB allow queries like
-    "find all rows where data->>'status' = 'Selected'" in O(log n).
+  Performance: a GIN (jsonb_path_ops) index on `data` serves containment
+    queries like data @> '{"status": "Selected"}' in O(log n). Range and
+    sort queries on one column use per-sheet expression indexes instead —
+    see services/row_query.py and services/index_service.py.
 
 ROW ORDERING:
   We use a float-based ordering system instead of integer positions.
@@ -21,13 +23,66 @@ ROW ORDERING:
     "give me rows in order" (requires recursive CTE).
   Alternative: Integer gaps (1000, 2000, 3000) — works but eventually
     runs out of gaps and needs rebalancing. Float is simpler.
+
+SEARCH COLUMNS (generated, never written by the app):
+  search_text   = lower(jsonb_path_query_array(data, '$.*')::text)
+  search_vector = to_tsvector('simple', <search_text with @.+-_/: as spaces>)
+  search_text is the cell values only (no keys). Punctuation is blanked
+  before tokenising so "sarthak.s@mail.org" is indexed as sarthak, s,
+  mail, org and an email or URL fragment still matches word by word.
+  Both are STORED generated columns, so Postgres recomputes them inside
+  the same statement as every INSERT/UPDATE — including the set-based
+  bulk writes in row_service that never load a Row object. A GIN index on
+  search_vector serves word/prefix search. When the pg_trgm extension is
+  available, the migration also adds a trigram GIN index on search_text
+  for substring ("9876" inside a phone number) and typo-tolerant matches.
+  Both are deferred so ordinary row reads never fetch them.
+  Alternative: a trigger maintaining the columns — same effect, more code
+    to keep in sync, and easy to bypass with a future COPY path.
+
+ROW POSITION = (order_key, row_order, id):
+  Float sheets leave order_key at '' and order by row_order; lexical
+  sheets keep row_order at 0 and order by order_key. Ordering by the full
+  triple works for both modes, so no query has to look up the sheet's mode
+  first, and one index (sheet_id, order_key, row_order, id) serves both.
+  order_key uses COLLATE "C" — byte order, same as Python str comparison.
+
+VERSION (optimistic concurrency):
+  `version` starts at 1 and every write through row_service bumps it in
+  the same UPDATE. A client that sends expected_version gets its write
+  applied only if the row is still at that version (checked in the
+  UPDATE's WHERE clause — no SELECT ... FOR UPDATE). Events carry the
+  version so clients can drop messages older than what they have.
+
+CHANGE SEQUENCE (delta sync):
+  `change_seq` is the sheet's change_seq (see Sheet model) of the last
+  write to the row, indexed with sheet_id so "rows changed since N" is one
+  range scan. Deletes leave a RowTombstone with their sequence number.
+
+PAGINATION:
+  Listing uses keyset (a.k.a. "seek") pagination on the row position
+  backed by the composite index above. `id` is the tie-breaker so two
+  rows with the same row_order still have a total order.
+  Alternative: OFFSET/LIMIT — page N costs O(N) because Postgres still
+    walks every skipped row. Keyset makes every page cost the same.
 """
 
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, func
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import (
+    BigInteger,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -35,6 +90,17 @@ from app.models.base import Base
 
 class Row(Base):
     __tablename__ = "rows"
+    __table_args__ = (
+        Index("ix_rows_sheet_id_position", "sheet_id", "order_key", "row_order", "id"),
+        Index(
+            "ix_rows_data_gin",
+            "data",
+            postgresql_using="gin",
+            postgresql_ops={"data": "jsonb_path_ops"},
+        ),
+        Index("ix_rows_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_rows_sheet_id_change_seq", "sheet_id", "change_seq"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -53,6 +119,41 @@ class Row(Base):
     # Float ordering — allows cheap insertions between existing rows.
     row_order: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
 
+    # Lexical ordering key ('' on float-ordered sheets) — see module docstring.
+    order_key: Mapped[str] = mapped_column(
+        String(collation="C"), nullable=False, default="", server_default=""
+    )
+
+    # Bumped by every write — see VERSION in the module docstring.
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+
+    # Sheet change_seq of the last write — see CHANGE SEQUENCE above.
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
+    # Search columns — generated by Postgres from `data`, see module docstring.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple'::regconfig, translate("
+            "lower(jsonb_path_query_array(data, '$.*'::jsonpath)::text), "
+            "'@.+-_/:', '       '))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    search_text: Mapped[str] = mapped_column(
+        Text,
+        Computed(
+            "lower(jsonb_path_query_array(data, '$.*'::jsonpath)::text)",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
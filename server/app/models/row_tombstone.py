@@ -0,0 +1,59 @@
+"""
+RowTombstone Model — A record that a row was deleted, for delta sync.
+
+GET /sheets/{id}/changes?since=N returns rows whose change_seq is above N
+(created or updated since) plus the ids of rows deleted since. A deleted
+row is gone from `rows`, so row_service writes one tombstone per deleted
+row, stamped with the sheet's change_seq for that delete, in the same
+statement as the DELETE.
+
+Tombstones go away with their sheet (ON DELETE CASCADE). Deleting the
+whole sheet needs no per-row tombstones — clients of that sheet are gone.
+
+RETENTION:
+  A daily task (row_tasks.prune_tombstones) deletes tombstones older than
+  row_service.TOMBSTONE_RETENTION_DAYS and, in the same statement, raises
+  each affected sheet's tombstone_horizon to the highest change_seq it
+  removed. list_changes() answers "refetch" for any `since` below the
+  horizon instead of returning a delta with deletes missing.
+
+  Alternative: soft deletes (a deleted_at column on rows) — every read
+    path would need `WHERE deleted_at IS NULL`, and deleted rows would
+    keep bloating the rows indexes.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class RowTombstone(Base):
+    __tablename__ = "row_tombstones"
+    __table_args__ = (
+        Index("ix_row_tombstones_sheet_id_change_seq", "sheet_id", "change_seq"),
+        Index("ix_row_tombstones_deleted_at", "deleted_at"),
+    )
+
+    # The deleted row's id (UUIDs are never reused).
+    row_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+
+    sheet_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("sheets.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # The sheet's change_seq for the delete that removed the row.
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<RowTombstone {self.row_id} seq={self.change_seq}>"
@@ -21,12 +21,35 @@ WHY JSONB FOR COLUMN SCHEMA?
 
   Alternative: MongoDB — native document store, but we'd lose relational
     integrity (FK constraints between sheets ↔ rows ↔ rules).
+
+  schema_version is bumped every time column_schema changes; compiled row
+  validators are cached per version (see services/row_validator.py).
+
+ROW ORDERING MODE (fixed at creation):
+  "float"   — rows are positioned by Row.row_order (midpoints); a
+              background job renumbers a sheet once gaps get too small.
+              Appends take the next value of next_row_order, a counter
+              advanced with UPDATE ... RETURNING (no MAX(row_order) scan).
+  "lexical" — rows are positioned by Row.order_key strings, which never
+              run out of room (see services/order_keys.py).
+
+CHANGE SEQUENCE (delta sync):
+  change_seq counts the writes to the sheet's rows. Every row_service
+  write advances it with UPDATE ... RETURNING and stamps the rows it
+  touched (Row.change_seq) or deleted (RowTombstone) with the new value.
+  The UPDATE row-locks the sheet until commit, so sequence numbers become
+  visible in order: a reader that has seen N has seen everything up to N.
+
+  Tombstones are kept for TOMBSTONE_RETENTION_DAYS (see row_service).
+  tombstone_horizon is the highest change_seq whose tombstones may have
+  been pruned; a client behind it can no longer get a complete delta and
+  has to refetch the sheet.
 """
 
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, ForeignKey, func
+from sqlalchemy import BigInteger, String, DateTime, Float, ForeignKey, Integer, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -52,6 +75,32 @@ class Sheet(Base):
     # Flexible column definitions — see docstring above for structure.
     column_schema: Mapped[dict] = mapped_column(JSONB, nullable=False, default=list)
 
+    # Bumped on every column_schema change — see docstring above.
+    schema_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+
+    # "float" or "lexical" — see ROW ORDERING MODE above.
+    row_ordering: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="float", server_default="float"
+    )
+
+    # Append counter: always above every row_order in the sheet.
+    # Only row_service changes it (see reserve_orders()).
+    next_row_order: Mapped[float] = mapped_column(
+        Float, nullable=False, default=1.0, server_default="1"
+    )
+
+    # Last change sequence number — see CHANGE SEQUENCE above.
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
+    # Tombstones at or below this change_seq may be gone — see above.
+    tombstone_horizon: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
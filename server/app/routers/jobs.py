@@ -0,0 +1,27 @@
+"""
+Job Router — poll the status of background jobs.
+
+Jobs are started by the endpoints that own the work (e.g.
+POST /sheets/{sheet_id}/import-csv/jobs). Live progress is also pushed
+over /ws/sheet/{sheet_id}; this endpoint is for clients without a socket.
+"""
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.schemas.job import JobResponse
+from app.services import job_service
+
+router = APIRouter(tags=["jobs"])
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """Get a job's status, progress counters and (when finished) result."""
+    job = await job_service.get_by_id(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -7,20 +7,57 @@ This is the most critical router because:
   - CSV import hits the bulk-create endpoint
 """
 
-import csv
-import io
+import logging
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
+from app.core.database import async_session, get_db
+from app.core.serialization import FastJSONResponse, dumps, row_payload, row_payloads
 from app.core.ws_manager import manager
-from app.schemas.row import RowCreate, RowUpdate, RowBulkCreate, RowResponse
-from app.services import row_service
+from app.schemas.row import (
+    RowCreate,
+    RowInsert,
+    RowPlacement,
+    RowUpdate,
+    RowBulkCreate,
+    RowBatchUpdate,
+    RowBulkDelete,
+    RowBulkDeleteResult,
+    RowDuplicateSearch,
+    RowDuplicateReport,
+    RowResponse,
+    RowPage,
+    RowChanges,
+    RowAggregate,
+    CsvImportReport,
+)
+from app.schemas.job import JobResponse
+from app.services import (
+    agent_rule_service,
+    aggregate_service,
+    duplicate_service,
+    import_service,
+    job_service,
+    row_query,
+    row_service,
+    search_service,
+    sheet_service,
+)
+from app.tasks.import_tasks import import_csv_job
+from app.tasks.row_tasks import rebalance_sheet_orders
 
 router = APIRouter(tags=["rows"])
 
+logger = logging.getLogger(__name__)
+
+# A rows_deleted event lists the deleted ids up to this many; past it the
+# event carries only the count and clients refetch the sheet.
+ROWS_DELETED_EVENT_MAX_IDS = 5000
+
 
 @router.post(
     "/sheets/{sheet_id}/rows",
@@ -33,12 +70,18 @@ async def create_row(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a single row in a sheet."""
-    row = await row_service.create(db, sheet_id, payload)
+    try:
+        row = await row_service.create(db, sheet_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if payload.row_order is not None:
+        await _schedule_rebalance_if_crowded(db, row)
     await manager.broadcast(
         sheet_id,
         {
             "event": "row_created",
-            "row": RowResponse.model_validate(row).model_dump(mode="json"),
+            "seq": row.change_seq,
+            "row": row_payload(row),
         },
     )
     return row
@@ -55,16 +98,184 @@ async def bulk_create_rows(
     db: AsyncSession = Depends(get_db),
 ):
     """Bulk-create rows (JSON array)."""
-    return await row_service.bulk_create(db, sheet_id, payload.rows)
+    try:
+        created = await row_service.bulk_create(db, sheet_id, payload.rows)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FastJSONResponse(row_payloads(created), status_code=status.HTTP_201_CREATED)
 
 
-@router.get("/sheets/{sheet_id}/rows", response_model=list[RowResponse])
+@router.post(
+    "/sheets/{sheet_id}/rows/insert",
+    response_model=RowResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def insert_row(
+    sheet_id: uuid.UUID,
+    payload: RowInsert,
+    db: AsyncSession = Depends(get_db),
+):
+    """Create a row right after `after_id` and/or right before `before_id`."""
+    try:
+        row = await row_service.create_between(db, sheet_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    await _schedule_rebalance_if_crowded(db, row)
+    await manager.broadcast(
+        sheet_id,
+        {
+            "event": "row_created",
+            "seq": row.change_seq,
+            "row": row_payload(row),
+        },
+    )
+    return row
+
+
+async def _schedule_rebalance_if_crowded(db: AsyncSession, row) -> None:
+    """Queue a row_order renumbering once midpoints get too close."""
+    if await row_service.order_gap_too_small(db, row):
+        rebalance_sheet_orders.delay(str(row.sheet_id))
+
+
+FILTER_QUERY = Query(
+    [],
+    alias="filter",
+    description="key:op:value, repeatable — ops: eq, in, gt, gte, lt, lte, contains",
+)
+
+
+SORT_QUERY = Query(None, description="column_key:asc|desc (typed by column type)")
+
+
+async def _compile_query(
+    db: AsyncSession, sheet_id: uuid.UUID, filters: list[str], sort: str | None
+) -> tuple[list, row_query.RowSort | None]:
+    """Compile ?filter= and ?sort= against the sheet's column types (400 if invalid)."""
+    if not filters and sort is None:
+        return [], None
+    sheet = await sheet_service.get_by_id(db, sheet_id)
+    if not sheet:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    try:
+        where = row_query.compile_filters(filters, sheet.column_schema)
+        order = (
+            row_query.compile_sort(sort, sheet.column_schema)
+            if sort is not None
+            else None
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return where, order
+
+
+@router.get("/sheets/{sheet_id}/rows", response_model=RowPage)
 async def list_rows(
     sheet_id: uuid.UUID,
+    limit: int = Query(500, ge=1, le=5000),
+    after: str | None = Query(None, description="next_cursor from the previous page"),
+    filters: list[str] = FILTER_QUERY,
+    sort: str | None = SORT_QUERY,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get all rows in a sheet, ordered by row_order."""
-    return await row_service.list_by_sheet(db, sheet_id)
+    """Get one page of (filtered) rows in a sheet.
+
+    Ordered by (row_order, id), or by the typed sort column first. A cursor
+    is only valid with the same sort it was issued for. Rows are read as
+    column tuples and encoded without RowPage (see app/core/serialization).
+    """
+    where, order = await _compile_query(db, sheet_id, filters, sort)
+    # Read before the rows, so changes racing the listing are replayed.
+    change_seq = (
+        await row_service.current_change_seq(db, sheet_id) if after is None else None
+    )
+    try:
+        rows, next_cursor = await row_service.list_page(
+            db, sheet_id, limit, after, where, order
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FastJSONResponse(
+        {"rows": row_payloads(rows), "next_cursor": next_cursor, "change_seq": change_seq}
+    )
+
+
+@router.get("/sheets/{sheet_id}/rows/stream")
+async def stream_rows(
+    sheet_id: uuid.UUID,
+    chunk_size: int = Query(500, ge=1, le=5000),
+    filters: list[str] = FILTER_QUERY,
+    sort: str | None = SORT_QUERY,
+):
+    """Download every (matching) row as newline-delimited JSON.
+
+    No get_db() session: it would sit idle while the body streams. The
+    query is compiled in a short session and the generator opens its own.
+    """
+    async with async_session() as db:
+        where, order = await _compile_query(db, sheet_id, filters, sort)
+
+    async def ndjson():
+        async with async_session() as stream_db:
+            lines: list[bytes] = []
+            async for row in row_service.stream_by_sheet(
+                stream_db, sheet_id, chunk_size, where, order
+            ):
+                lines.append(dumps(row_payload(row)))
+                if len(lines) >= chunk_size:
+                    yield b"\n".join(lines) + b"\n"
+                    lines.clear()
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/sheets/{sheet_id}/rows/search", response_model=RowPage)
+async def search_rows(
+    sheet_id: uuid.UUID,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=500),
+    after: str | None = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Find rows whose cells match `q` (name, phone or email fragments), best first.
+
+    Rows are read as column tuples and encoded without RowPage, like
+    list_rows().
+    """
+    try:
+        rows, next_cursor = await search_service.search(db, sheet_id, q, limit, after)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FastJSONResponse(
+        {"rows": row_payloads(rows), "next_cursor": next_cursor, "change_seq": None}
+    )
+
+
+@router.get("/sheets/{sheet_id}/aggregate", response_model=RowAggregate)
+async def aggregate_rows(
+    sheet_id: uuid.UUID,
+    metrics: list[str] = Query(
+        ...,
+        alias="metric",
+        description="count, or fn:column_key with fn in count, sum, avg, min, max — repeatable",
+    ),
+    group_by: list[str] = Query([], description="column_key, repeatable"),
+    filters: list[str] = FILTER_QUERY,
+    db: AsyncSession = Depends(get_db),
+):
+    """Summarise a sheet's rows in Postgres (e.g. count per status, average score).
+
+    Cached per sheet until the next row write — see aggregate_service.
+    """
+    sheet = await sheet_service.get_by_id(db, sheet_id)
+    if not sheet:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    try:
+        return await aggregate_service.aggregate(db, sheet, metrics, group_by, filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 from sqlalchemy import select
@@ -79,10 +290,21 @@ async def update_row(
 ):
     """Update row data (cell values) or row_order.
     This is the agent trigger point — Phase 3 will hook rule evaluation here.
+    With expected_version, a stale write gets 409 and the current version.
     """
-    row = await row_service.update(db, row_id, payload)
+    try:
+        row = await row_service.update(db, row_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except row_service.RowVersionConflict as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(exc), "current_version": exc.current_version},
+        )
     if not row:
         raise HTTPException(status_code=404, detail="Row not found")
+    if payload.row_order is not None:
+        await _schedule_rebalance_if_crowded(db, row)
         
     # --- Agent Rule Evaluation ---
     # Phase 4: Iterate over enabled rules for this sheet
@@ -100,7 +322,7 @@ async def update_row(
             if rule.trigger_column in payload.data:
                 # Check if the new value matches the trigger condition
                 if str(payload.data[rule.trigger_column]) == str(rule.trigger_value):
-                    print(f"Triggering rule '{rule.action_type}' for row {row.id}")
+                    logger.info(f"Triggering rule '{rule.action_type}' for row {row.id}")
                     # Enqueue LangGraph Celery task
                     process_agent_rule.delay(str(rule.id), str(row.id))
 
@@ -109,22 +331,222 @@ async def update_row(
         row.sheet_id,
         {
             "event": "row_updated",
-            "row": RowResponse.model_validate(row).model_dump(mode="json"),
+            "seq": row.change_seq,
+            "row": row_payload(row),
         },
     )
     return row
 
 
+@router.post("/rows/{row_id}/move", response_model=RowResponse)
+async def move_row(
+    row_id: uuid.UUID,
+    payload: RowPlacement,
+    db: AsyncSession = Depends(get_db),
+):
+    """Move a row right after `after_id` and/or right before `before_id`.
+
+    The server computes the new position; only the moved row is broadcast.
+    """
+    try:
+        row = await row_service.move(db, row_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not row:
+        raise HTTPException(status_code=404, detail="Row not found")
+    await _schedule_rebalance_if_crowded(db, row)
+    await manager.broadcast(
+        row.sheet_id,
+        {
+            "event": "row_moved",
+            "seq": row.change_seq,
+            "row": row_payload(row),
+        },
+    )
+    return row
+
+
+@router.patch("/sheets/{sheet_id}/rows", response_model=list[RowResponse])
+async def batch_update_rows(
+    sheet_id: uuid.UUID,
+    payload: RowBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Apply many partial row updates (e.g. a pasted block) in one transaction.
+
+    One set-based UPDATE, one rule lookup for the whole batch, and one
+    "rows_updated" WebSocket event instead of one per row.
+    """
+    try:
+        updated = await row_service.bulk_update(db, sheet_id, payload.rows)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # --- Agent Rule Evaluation (one pass over all changed rows) ---
+    rules = await agent_rule_service.list_enabled(db, sheet_id)
+    if rules:
+        changes_by_row: dict[uuid.UUID, dict] = {}
+        for patch in payload.rows:
+            changes_by_row.setdefault(patch.id, {}).update(patch.data)
+        for row in updated:
+            for rule in agent_rule_service.match_changed_cells(
+                rules, changes_by_row[row["id"]]
+            ):
+                logger.info(f"Triggering rule '{rule.action_type}' for row {row['id']}")
+                process_agent_rule.delay(str(rule.id), str(row["id"]))
+
+    # --- WebSocket Broadcast ---
+    payloads = row_payloads(updated)
+    if updated:
+        await manager.broadcast(
+            sheet_id,
+            {
+                "event": "rows_updated",
+                "seq": updated[0]["change_seq"],
+                "rows": payloads,
+            },
+        )
+    return FastJSONResponse(payloads)
+
+
 @router.delete("/rows/{row_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_row(row_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
     """Delete a single row."""
-    # Fetch the row first to get sheet_id for broadcast
-    row = await row_service.get_by_id(db, row_id)
-    if not row:
+    deleted = await row_service.delete(db, row_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Row not found")
-    sheet_id = row.sheet_id
-    await row_service.delete(db, row_id)
-    await manager.broadcast(sheet_id, {"event": "row_deleted", "row_id": str(row_id)})
+    sheet_id, seq = deleted
+    await manager.broadcast(
+        sheet_id, {"event": "row_deleted", "seq": seq, "row_id": str(row_id)}
+    )
+
+
+@router.delete("/sheets/{sheet_id}/rows", response_model=RowBulkDeleteResult)
+async def bulk_delete_rows(
+    sheet_id: uuid.UUID,
+    payload: RowBulkDelete,
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete many rows by id and/or filter in one transaction.
+
+    Chunked set-based DELETEs and one "rows_deleted" WebSocket event
+    instead of one request and one event per row.
+    """
+    where, _ = await _compile_query(db, sheet_id, payload.filter, None)
+    try:
+        deleted, seq = await row_service.bulk_delete(
+            db, sheet_id, payload.ids, where
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # --- WebSocket Broadcast ---
+    if deleted:
+        row_ids = (
+            [str(row_id) for row_id in deleted]
+            if len(deleted) <= ROWS_DELETED_EVENT_MAX_IDS
+            else None
+        )
+        await manager.broadcast(
+            sheet_id,
+            {
+                "event": "rows_deleted",
+                "seq": seq,
+                "count": len(deleted),
+                "row_ids": row_ids,
+            },
+        )
+    return {"deleted": len(deleted)}
+
+
+@router.post("/sheets/{sheet_id}/duplicates", response_model=RowDuplicateReport)
+async def find_duplicate_rows(
+    sheet_id: uuid.UUID,
+    payload: RowDuplicateSearch,
+    db: AsyncSession = Depends(get_db),
+):
+    """Find rows that share key columns (e.g. phone or email).
+
+    With action=delete or merge, one row per cluster is kept — see
+    duplicate_service. Resolving broadcasts "rows_updated" (merged cells) and "rows_deleted"
+    like the batch endpoints do.
+    """
+    sheet = await sheet_service.get_by_id(db, sheet_id)
+    if not sheet:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    try:
+        clusters, truncated = await duplicate_service.find_duplicates(
+            db, sheet, payload.keys, payload.normalize
+        )
+        report = {"clusters": clusters, "truncated": truncated}
+        if payload.action == "find":
+            return report
+        merged, deleted, seq = await duplicate_service.resolve(
+            db, sheet_id, clusters, merge=payload.action == "merge"
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # --- WebSocket Broadcast ---
+    if merged:
+        await manager.broadcast(
+            sheet_id,
+            {
+                "event": "rows_updated",
+                "seq": merged[0]["change_seq"],
+                "rows": row_payloads(merged),
+            },
+        )
+    if deleted:
+        row_ids = (
+            [str(row_id) for row_id in deleted]
+            if len(deleted) <= ROWS_DELETED_EVENT_MAX_IDS
+            else None
+        )
+        await manager.broadcast(
+            sheet_id,
+            {
+                "event": "rows_deleted",
+                "seq": seq,
+                "count": len(deleted),
+                "row_ids": row_ids,
+            },
+        )
+    return {**report, "merged": len(merged), "deleted": len(deleted)}
+
+
+@router.get("/sheets/{sheet_id}/changes", response_model=RowChanges)
+async def list_row_changes(
+    sheet_id: uuid.UUID,
+    since: int = Query(..., ge=0, description="change_seq the client is up to date with"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Rows created/updated and ids deleted after change `since`.
+
+    Every row event on the WebSocket carries its `seq`; a client that sees
+    a jump (or reconnects) calls this with the last seq it applied instead
+    of refetching the whole sheet. Answers reset=True (resync required)
+    when it can't return a complete delta: too many changes, or deletes
+    after `since` whose tombstones have already been pruned.
+    """
+    # Read before the changes, like list_rows — a racing write is replayed.
+    change_seq = await row_service.current_change_seq(db, sheet_id)
+    if change_seq is None:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    changes = None
+    if since <= change_seq:
+        changes = await row_service.list_changes(db, sheet_id, since)
+    if changes is None:
+        return {"change_seq": change_seq, "reset": True}
+    rows, deleted_ids = changes
+    return FastJSONResponse(
+        {
+            "change_seq": change_seq,
+            "rows": row_payloads(rows),
+            "deleted_ids": deleted_ids,
+            "reset": False,
+        }
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -134,7 +556,7 @@ async def delete_row(row_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
 
 @router.post(
     "/sheets/{sheet_id}/import-csv",
-    response_model=list[RowResponse],
+    response_model=CsvImportReport,
     status_code=status.HTTP_201_CREATED,
 )
 async def import_csv(
@@ -146,22 +568,52 @@ async def import_csv(
 
     The CSV must have a header row whose column names match the sheet's
     column keys. Each subsequent row becomes a new Row with data as JSONB.
+    The file is parsed and inserted in batches; malformed lines are skipped
+    and listed in the returned report. Files over SYNC_IMPORT_MAX_ROWS data
+    lines get 413 and nothing is imported — send those to
+    POST /sheets/{sheet_id}/import-csv/jobs.
     """
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only .csv files are accepted")
 
-    content = await file.read()
     try:
-        text = content.decode("utf-8-sig")  # utf-8-sig handles BOM from Excel
-    except UnicodeDecodeError:
-        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
-
-    reader = csv.DictReader(io.StringIO(text))
-    row_creates = [RowCreate(data=dict(row)) for row in reader]
-
-    if not row_creates:
+        return await import_service.import_csv(
+            db, sheet_id, file.file, max_rows=import_service.SYNC_IMPORT_MAX_ROWS
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except import_service.CsvTooLarge as exc:
         raise HTTPException(
-            status_code=400, detail="CSV file is empty or has no data rows"
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"{exc}; import it with POST /sheets/{sheet_id}/import-csv/jobs",
         )
 
-    return await row_service.bulk_create(db, sheet_id, row_creates)
+
+@router.post(
+    "/sheets/{sheet_id}/import-csv/jobs",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_import_csv(
+    sheet_id: uuid.UUID,
+    file: UploadFile,
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a CSV import as a background job and return it immediately.
+
+    Poll GET /jobs/{id} or listen for "import_progress" events on the
+    sheet's WebSocket to follow it.
+    """
+    if not file.filename or not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Only .csv files are accepted")
+    if not await sheet_service.get_by_id(db, sheet_id):
+        raise HTTPException(status_code=404, detail="Sheet not found")
+
+    path = await run_in_threadpool(import_service.spool_upload, file.file)
+    job = await job_service.create(
+        db, sheet_id, "csv_import", {"path": path, "filename": file.filename}
+    )
+    # Commit before enqueueing — the worker must be able to see the job row.
+    await db.commit()
+    import_csv_job.delay(str(job.id))
+    return job
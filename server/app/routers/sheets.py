@@ -2,21 +2,29 @@
 Sheet Router — CRUD endpoints for sheets within a workspace.
 """
 
+import re
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import async_session, get_db
 from app.schemas.sheet import (
     SheetCreate,
     SheetUpdate,
     ColumnUpdate,
+    ColumnUpdateResponse,
+    SheetDuplicate,
+    SheetDuplicateResponse,
     SheetResponse,
     SheetListResponse,
     BulkActionRequest,
+    ColumnIndexCreate,
+    ColumnIndexResponse,
 )
-from app.services import sheet_service
+from app.services import export_service, index_service, sheet_service
+from app.tasks.column_tasks import migrate_columns_job
 
 router = APIRouter(tags=["sheets"])
 
@@ -32,7 +40,10 @@ async def create_sheet(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new sheet in a workspace with optional column definitions."""
-    return await sheet_service.create(db, workspace_id, payload)
+    try:
+        return await sheet_service.create(db, workspace_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 @router.get(
@@ -69,17 +80,143 @@ async def update_sheet(
     return sheet
 
 
-@router.put("/sheets/{sheet_id}/columns", response_model=SheetResponse)
+@router.post(
+    "/sheets/{sheet_id}/duplicate",
+    response_model=SheetDuplicateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def duplicate_sheet(
+    sheet_id: uuid.UUID,
+    payload: SheetDuplicate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Copy a sheet with its agent rules and all, filtered or no rows.
+
+    The copy is made inside Postgres in one statement, so even very large
+    sheets clone in a single short transaction. Gets 409 while a column
+    migration is rewriting the source's cells.
+    """
+    try:
+        duplicated = await sheet_service.duplicate(db, sheet_id, payload)
+    except sheet_service.ColumnMigrationRunning as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not duplicated:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    sheet, rows_copied, rules_copied = duplicated
+    response = SheetDuplicateResponse.model_validate(sheet)
+    response.rows_copied = rows_copied
+    response.rules_copied = rules_copied
+    return response
+
+
+@router.put("/sheets/{sheet_id}/columns", response_model=ColumnUpdateResponse)
 async def update_columns(
     sheet_id: uuid.UUID,
     payload: ColumnUpdate,
     db: AsyncSession = Depends(get_db),
 ):
-    """Replace the column schema (add/remove/reorder columns)."""
-    sheet = await sheet_service.update_columns(db, sheet_id, payload)
+    """Replace the column schema (add/remove/rename/reorder columns).
+
+    Every removed column must be listed in `renames` or `drops` (400
+    otherwise). Their cells are rewritten, and new or changed formulas
+    recalculated, by a background job returned as migration_job_id —
+    poll GET /jobs/{id} or listen for "column_migration_progress" events.
+    Another column change while it runs gets 409.
+    """
+    try:
+        updated = await sheet_service.update_columns(db, sheet_id, payload)
+    except sheet_service.ColumnMigrationRunning as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    sheet, job = updated
+    response = ColumnUpdateResponse.model_validate(sheet)
+    if job is not None:
+        # Commit before enqueueing — the worker must be able to see the job row.
+        await db.commit()
+        migrate_columns_job.delay(str(job.id))
+        response.migration_job_id = job.id
+    return response
+
+
+@router.post(
+    "/sheets/{sheet_id}/indexes",
+    response_model=ColumnIndexResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_column_index(
+    sheet_id: uuid.UUID,
+    payload: ColumnIndexCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Build an expression index for a hot column (range filters and sorts).
+
+    Runs CREATE INDEX CONCURRENTLY, so it may take a while on big sheets
+    but never blocks writes.
+    """
+    sheet = await sheet_service.get_by_id(db, sheet_id)
     if not sheet:
         raise HTTPException(status_code=404, detail="Sheet not found")
-    return sheet
+    # CONCURRENTLY waits for every open transaction to finish — including
+    # this request's own, so end it first or the build waits forever.
+    await db.commit()
+    try:
+        name, expression = await index_service.create_column_index(
+            sheet, payload.column
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"name": name, "column": payload.column, "expression": expression}
+
+
+@router.delete(
+    "/sheets/{sheet_id}/indexes/{column}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def drop_column_index(sheet_id: uuid.UUID, column: str):
+    """Drop the expression index(es) built for a column."""
+    dropped = await index_service.drop_column_indexes(sheet_id, column)
+    if not dropped:
+        raise HTTPException(status_code=404, detail="Index not found")
+
+
+@router.get("/sheets/{sheet_id}/export")
+async def export_sheet(
+    sheet_id: uuid.UUID,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|xlsx|parquet)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download the whole sheet as CSV, XLSX or Parquet (streamed).
+
+    Columns follow the sheet's column_schema order. The body generator
+    opens its own session because get_db()'s is closed before streaming.
+    """
+    sheet = await sheet_service.get_by_id(db, sheet_id)
+    if not sheet:
+        raise HTTPException(status_code=404, detail="Sheet not found")
+    try:
+        export_service.check_export(sheet, fmt)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    media_type, extension = export_service.EXPORT_FORMATS[fmt]
+    exporter = export_service.EXPORTERS[fmt]
+
+    async def body():
+        async with async_session() as stream_db:
+            async for chunk in exporter(stream_db, sheet):
+                yield chunk
+
+    filename = re.sub(r"[^A-Za-z0-9._-]+", "_", sheet.name).strip("_") or "sheet"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"'
+        },
+    )
 
 
 @router.delete("/sheets/{sheet_id}", status_code=status.HTTP_204_NO_CONTENT)
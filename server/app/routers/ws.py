@@ -4,9 +4,14 @@ WebSocket Router — real-time sheet updates.
 PROTOCOL:
   Client connects to: ws://localhost:8000/ws/sheet/{sheet_id}
   Server sends JSON events whenever rows change:
-    {"event": "row_updated", "row": {...}}
-    {"event": "row_created", "row": {...}}
-    {"event": "row_deleted", "row_id": "..."}
+    {"event": "row_updated", "seq": 42, "row": {...}}
+    {"event": "row_created", "seq": 43, "row": {...}}
+    {"event": "row_deleted", "seq": 44, "row_id": "..."}
+
+  `seq` is the sheet's change sequence number for that write (see the
+  Sheet model). Numbers are consecutive per sheet, so a client that sees
+  a jump — or reconnects — asks GET /sheets/{id}/changes?since=<last seq>
+  for just what it missed instead of refetching the sheet.
 
   The client keeps the connection open and listens for events.
   No client-to-server messages are needed right now (one-way push).
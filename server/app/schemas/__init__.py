@@ -7,11 +7,37 @@ from app.schemas.sheet import (
     SheetUpdate,
     ColumnUpdate,
     SheetResponse,
+    ColumnUpdateResponse,
+    SheetDuplicate,
+    SheetDuplicateResponse,
     SheetListResponse,
+    ColumnIndexCreate,
+    ColumnIndexResponse,
+)
+from app.schemas.row import (
+    RowCreate,
+    RowUpdate,
+    RowPlacement,
+    RowInsert,
+    RowBulkCreate,
+    RowPatch,
+    RowBatchUpdate,
+    RowBulkDelete,
+    RowDuplicateSearch,
+    RowResponse,
+    RowPage,
+    RowChanges,
+    RowAggregateGroup,
+    RowAggregate,
+    RowBulkDeleteResult,
+    RowDuplicateCluster,
+    RowDuplicateReport,
+    CsvImportError,
+    CsvImportReport,
 )
-from app.schemas.row import RowCreate, RowUpdate, RowBulkCreate, RowResponse
 from app.schemas.agent_rule import AgentRuleCreate, AgentRuleUpdate, AgentRuleResponse
 from app.schemas.agent_log import AgentLogResponse
+from app.schemas.job import JobResponse
 
 __all__ = [
     "WorkspaceCreate",
@@ -22,13 +48,34 @@ __all__ = [
     "SheetUpdate",
     "ColumnUpdate",
     "SheetResponse",
+    "ColumnUpdateResponse",
+    "SheetDuplicate",
+    "SheetDuplicateResponse",
     "SheetListResponse",
+    "ColumnIndexCreate",
+    "ColumnIndexResponse",
     "RowCreate",
     "RowUpdate",
+    "RowPlacement",
+    "RowInsert",
     "RowBulkCreate",
+    "RowPatch",
+    "RowBatchUpdate",
+    "RowBulkDelete",
+    "RowDuplicateSearch",
     "RowResponse",
+    "RowPage",
+    "RowChanges",
+    "RowAggregateGroup",
+    "RowAggregate",
+    "RowBulkDeleteResult",
+    "RowDuplicateCluster",
+    "RowDuplicateReport",
+    "CsvImportError",
+    "CsvImportReport",
     "AgentRuleCreate",
     "AgentRuleUpdate",
     "AgentRuleResponse",
     "AgentLogResponse",
+    "JobResponse",
 ]
@@ -0,0 +1,23 @@
+"""
+Job Schemas — Response-only (jobs are created by the endpoints that start them).
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: uuid.UUID
+    sheet_id: uuid.UUID
+    kind: str
+    status: str
+    progress: dict[str, Any]
+    result: dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
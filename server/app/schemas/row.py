@@ -7,7 +7,8 @@ ROW DATA:
 
   We accept `dict[str, Any]` because column types are dynamic.
   Deep validation (e.g., "score must be a number") happens at the
-  service layer by cross-referencing the sheet's column_schema.
+  service layer against the sheet's column_schema — see
+  services/row_validator.py.
 """
 
 import uuid
@@ -25,11 +26,32 @@ class RowCreate(BaseModel):
         default_factory=dict, examples=[{"name": "Sarthak", "score": 85}]
     )
     row_order: float | None = Field(None, examples=[1.0])
+    # Only on sheets with row_ordering="lexical" (instead of row_order).
+    order_key: str | None = Field(None, min_length=2, max_length=1024)
 
 
 class RowUpdate(BaseModel):
     data: dict[str, Any] | None = Field(None)
     row_order: float | None = Field(None)
+    order_key: str | None = Field(None, min_length=2, max_length=1024)
+    # Apply only if the row is still at this version (else 409).
+    expected_version: int | None = Field(None, ge=1)
+
+
+class RowPlacement(BaseModel):
+    """Where to put a row: right after `after_id` and/or right before `before_id`.
+
+    One anchor is enough; the server looks up the other neighbour.
+    """
+
+    before_id: uuid.UUID | None = None
+    after_id: uuid.UUID | None = None
+
+
+class RowInsert(RowPlacement):
+    """Create a row between two existing rows."""
+
+    data: dict[str, Any] = Field(default_factory=dict)
 
 
 class RowBulkCreate(BaseModel):
@@ -38,6 +60,40 @@ class RowBulkCreate(BaseModel):
     rows: list[RowCreate]
 
 
+class RowPatch(BaseModel):
+    """Partial cell update for one row inside a batch."""
+
+    id: uuid.UUID
+    data: dict[str, Any]
+
+
+class RowBatchUpdate(BaseModel):
+    """For paste-a-block edits — many partial row updates in one request."""
+
+    rows: list[RowPatch] = Field(..., min_length=1, max_length=5000)
+
+
+class RowBulkDelete(BaseModel):
+    """Delete many rows: by id, by filter expressions (?filter= syntax), or both (AND)."""
+
+    ids: list[uuid.UUID] = Field(default_factory=list, max_length=100_000)
+    filter: list[str] = Field(default_factory=list)
+
+
+class RowDuplicateSearch(BaseModel):
+    """Find rows sharing the same values in `keys` (see duplicate_service)."""
+
+    keys: list[str] = Field(..., min_length=1, max_length=5, examples=[["phone"]])
+    # Per key, applied in order: "trim", "lowercase", "digits" (keep 0-9 only).
+    normalize: dict[str, list[str]] = Field(
+        default_factory=dict,
+        examples=[{"phone": ["digits"], "email": ["trim", "lowercase"]}],
+    )
+    # "find" only reports; "delete" keeps the first row of each cluster and
+    # deletes the rest; "merge" first fills the kept row's empty cells.
+    action: str = Field("find", pattern="^(find|delete|merge)$")
+
+
 # ── Response Schemas ─────────────────────────────────────
 
 
@@ -46,7 +102,86 @@ class RowResponse(BaseModel):
     sheet_id: uuid.UUID
     data: dict[str, Any]
     row_order: float
+    order_key: str = ""
+    version: int = 1
+    change_seq: int = 0
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class RowPage(BaseModel):
+    """One keyset page of rows. Pass next_cursor back as `after`.
+
+    The first page also carries the sheet's change_seq, read before the
+    rows: GET /sheets/{id}/changes?since=<it> catches up from there.
+    """
+
+    rows: list[RowResponse]
+    next_cursor: str | None = None
+    change_seq: int | None = None
+
+
+class RowChanges(BaseModel):
+    """Rows written and ids deleted since a change_seq (delta sync).
+
+    reset=True means the server can't give a complete delta — too much
+    changed, or `since` is older than the tombstone retention horizon —
+    so the client must refetch the sheet instead.
+    """
+
+    change_seq: int
+    rows: list[RowResponse] = []
+    deleted_ids: list[uuid.UUID] = []
+    reset: bool = False
+
+
+class RowBulkDeleteResult(BaseModel):
+    deleted: int
+
+
+class RowAggregateGroup(BaseModel):
+    """One group: its group-by values and the metrics, keyed by metric spec."""
+
+    key: dict[str, Any]
+    values: dict[str, Any]
+
+
+class RowAggregate(BaseModel):
+    """A sheet summary, computed as of change_seq."""
+
+    change_seq: int
+    groups: list[RowAggregateGroup]
+    truncated: bool = False
+
+
+class RowDuplicateCluster(BaseModel):
+    """Rows with the same normalized key, in sheet order (the first is kept)."""
+
+    key: dict[str, str]
+    count: int
+    row_ids: list[uuid.UUID]
+
+
+class RowDuplicateReport(BaseModel):
+    clusters: list[RowDuplicateCluster]
+    truncated: bool = False
+    # Filled in by the delete/merge actions.
+    merged: int = 0
+    deleted: int = 0
+
+
+class CsvImportError(BaseModel):
+    """A CSV line that was rejected during import (1-based line number)."""
+
+    line: int
+    error: str
+
+
+class CsvImportReport(BaseModel):
+    inserted: int = 0
+    rejected: int = 0
+    # Capped so a file full of bad lines can't blow up the response.
+    errors: list[CsvImportError] = Field(default_factory=list)
+    errors_truncated: bool = False
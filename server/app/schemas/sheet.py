@@ -5,12 +5,30 @@ COLUMN SCHEMA VALIDATION:
   Each column is defined as a ColumnDef with:
     - key:     Machine-friendly identifier (e.g., "roll_no")
     - label:   Human-friendly display name (e.g., "Roll Number")
-    - type:    One of "string", "number", "dropdown", "boolean"
+    - type:    One of "string", "number", "dropdown", "boolean", "formula"
     - order:   Sort position in the sheet
     - options: Required only for "dropdown" type
+    - formula: Required only for "formula" type, e.g. "score1 + score2"
+               (see services/formula_engine.py). The server fills in
+               `result_type` ("number", "boolean" or "string").
 
   Pydantic validates this structure on every API call, so malformed
   column definitions are rejected before touching the DB.
+
+RENAMES AND DROPS:
+  Cells are only touched when the client says so. A key listed in
+  `renames` (old key → new key) moves its cells to the new key; a key
+  listed in `drops` has its cells deleted. A column that just disappears
+  from ColumnUpdate.columns is rejected (400), so a client that changes a
+  key without sending `renames` neither loses its cells nor leaves them
+  behind under a key no column shows.
+  Renamed and dropped cells are rewritten by a background job (see
+  sheet_service.update_columns).
+
+DUPLICATION:
+  SheetDuplicate copies the sheet inside Postgres (see
+  sheet_service.duplicate); `filters` use the row listing's ?filter=
+  syntax, and include_rows=false copies just the columns and rules.
 """
 
 import uuid
@@ -30,7 +48,7 @@ class ColumnDef(BaseModel):
     col_type: str = Field(
         ...,
         alias="type",
-        pattern="^(string|number|dropdown|boolean)$",
+        pattern="^(string|number|dropdown|boolean|formula)$",
         examples=["dropdown"],
     )
     order: int = Field(0, ge=0)
@@ -38,6 +56,9 @@ class ColumnDef(BaseModel):
         None,
         examples=[["Pending", "Selected", "Rejected"]],
     )
+    formula: str | None = Field(None, max_length=1000, examples=["score1 + score2"])
+    # Set by the server for formula columns; ignored on input.
+    result_type: str | None = None
 
 
 # ── Request Schemas ──────────────────────────────────────
@@ -46,6 +67,8 @@ class ColumnDef(BaseModel):
 class SheetCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=255, examples=["Main Auditions"])
     columns: list[ColumnDef] = Field(default_factory=list)
+    # "lexical" positions rows by string keys that never need renumbering.
+    row_ordering: str = Field("float", pattern="^(float|lexical)$")
 
 
 class SheetUpdate(BaseModel):
@@ -56,6 +79,31 @@ class ColumnUpdate(BaseModel):
     """Add, modify, or reorder columns."""
 
     columns: list[ColumnDef]
+    # Old key → new key for columns whose key changed (cells move with it).
+    renames: dict[str, str] = Field(
+        default_factory=dict, examples=[{"roll": "roll_no"}]
+    )
+    # Removed columns whose cells should be deleted too. Every removed
+    # column must be listed here or in `renames`.
+    drops: list[str] = Field(default_factory=list, examples=[["notes"]])
+
+
+class SheetDuplicate(BaseModel):
+    """Copy a sheet with its rules and (optionally filtered) rows."""
+
+    # Defaults to "<name> (copy)".
+    name: str | None = Field(None, min_length=1, max_length=255)
+    include_rows: bool = True
+    include_rules: bool = True
+    # Same key:op:value specs as ?filter= on row listing; copies matching rows only.
+    filters: list[str] = Field(default_factory=list, examples=[["status:eq:Selected"]])
+
+
+class ColumnIndexCreate(BaseModel):
+    """Build an expression index for a hot column (range filters / sorts)."""
+
+    column: str = Field(..., min_length=1, max_length=100, examples=["score"])
+
 
 class BulkActionRequest(BaseModel):
     """Payload for triggering bulk actions from the frontend."""
@@ -73,12 +121,30 @@ class SheetResponse(BaseModel):
     workspace_id: uuid.UUID
     name: str
     column_schema: list[ColumnDef]
+    schema_version: int = 1
+    row_ordering: str
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class ColumnUpdateResponse(SheetResponse):
+    # Background job rewriting cells of renamed/dropped columns, if any.
+    migration_job_id: uuid.UUID | None = None
+
+
+class SheetDuplicateResponse(SheetResponse):
+    rows_copied: int = 0
+    rules_copied: int = 0
+
+
+class ColumnIndexResponse(BaseModel):
+    name: str
+    column: str
+    expression: str
+
+
 class SheetListResponse(BaseModel):
     id: uuid.UUID
     name: str
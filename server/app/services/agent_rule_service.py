@@ -97,3 +97,27 @@ async def evaluate_rules_for_row(
         if str(cell_value) == rule.trigger_value:
             matched.append(rule)
     return matched
+
+
+async def list_enabled(db: AsyncSession, sheet_id: uuid.UUID) -> list[AgentRule]:
+    """Get only the enabled rules for a sheet (one query per write batch)."""
+    result = await db.execute(
+        select(AgentRule).where(
+            AgentRule.sheet_id == sheet_id, AgentRule.enabled.is_(True)
+        )
+    )
+    return list(result.scalars().all())
+
+
+def match_changed_cells(rules: list[AgentRule], changes: dict) -> list[AgentRule]:
+    """Rules whose trigger column was written in `changes` with the trigger value.
+
+    Pure function — callers load the rules once and reuse them for every
+    row they changed.
+    """
+    return [
+        rule
+        for rule in rules
+        if rule.trigger_column in changes
+        and str(changes[rule.trigger_column]) == str(rule.trigger_value)
+    ]
@@ -0,0 +1,260 @@
+"""
+Aggregate Service — Sheet summaries (count/sum/avg/min/max, group-by) in SQL.
+
+QUERY LANGUAGE (GET /sheets/{id}/aggregate):
+  metric=count            → rows in the group
+  metric=count:score      → rows whose score fits its column type
+  metric=sum:score        → sum / avg need a number column
+  metric=min:status       → min / max on any column, in the column's
+                            order (numbers numerically, dropdowns in
+                            option order, false < true)
+  group_by=status         → one result per distinct value (repeatable)
+  filter=key:op:value     → same filters as listing rows (row_query)
+
+  Cells are read through row_query.typed_value(), so "85" and 85 are the
+  same number, and a cell that doesn't fit its type ("n/a" in a number
+  column) counts as empty — the same way filters and sorts see it.
+  Dropdown results come back as option labels, not positions.
+
+  The whole summary is one SELECT ... GROUP BY over the sheet's rows;
+  only the (at most MAX_GROUPS) result rows leave Postgres.
+
+SNAPSHOTS: the same summary in-process
+  Once a sheet has a columnar snapshot (see snapshot_service — the first
+  request starts building it and is answered in SQL), summaries run on
+  it with Arrow kernels: filter → group_by → aggregate over typed arrays,
+  no JSONB parsed. Anything the snapshot can't answer exactly like SQL
+  (filters listed in snapshot_service.filter_mask, min/max or group-by
+  on text columns, which follow the database collation) still runs in
+  SQL. Sums and averages are float64 in the snapshot, numeric in SQL.
+
+CACHING: keyed by the sheet's change sequence
+  Results are kept in a small in-process LRU keyed by the request and
+  tagged with the sheet's change_seq (see Sheet model) at compute time.
+  Every row write advances change_seq, so a cached result is served only
+  while the sheet is unchanged; the first poll after a write recomputes.
+  The column definitions the request depends on are part of the key, so
+  changing a column's type can't serve results computed with the old one.
+  A repeated dashboard poll costs one primary-key read of the sheet.
+  Alternative: Redis — shared between API processes, but every process
+    would still have to check change_seq, and an extra hop buys little
+    for results this small.
+"""
+
+import json
+from collections import OrderedDict
+from decimal import Decimal
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.row import Row
+from app.models.sheet import Sheet
+from app.services import row_query, snapshot_service
+
+AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max")
+
+# Distinct group-by values returned; past this the result is truncated.
+MAX_GROUPS = 1000
+
+# Cached results kept per API process (least recently used evicted first).
+CACHE_SIZE = 256
+
+_cache: OrderedDict[tuple, tuple[int, dict]] = OrderedDict()
+
+# Snapshot (Arrow) aggregate function for each of AGGREGATE_FUNCTIONS.
+_ARROW_FUNCTIONS = {
+    "count": "count",
+    "sum": "sum",
+    "avg": "mean",
+    "min": "min",
+    "max": "max",
+}
+
+
+def _parse_metric(spec: str, columns: dict[str, dict]) -> tuple[str, str | None]:
+    """'avg:score' → ("avg", "score"); 'count' → ("count", None). Raises ValueError."""
+    fn, _, key = spec.partition(":")
+    if fn not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"Unknown aggregate '{fn}', use one of {AGGREGATE_FUNCTIONS}")
+    if not key:
+        if fn != "count":
+            raise ValueError(f"'{fn}' needs a column, e.g. {fn}:score")
+        return fn, None
+    if fn in ("sum", "avg") and (columns.get(key) or {}).get("type") != "number":
+        raise ValueError(f"'{fn}' needs a number column, '{key}' is not one")
+    return fn, key
+
+
+def _metric_expr(fn: str, key: str | None, columns: dict[str, dict]):
+    if key is None:
+        return func.count()
+    value = row_query.typed_value(key, columns.get(key))
+    col_type = (columns.get(key) or {}).get("type", "string")
+    if col_type == "boolean" and fn in ("min", "max"):
+        # Postgres has no min/max(boolean); bool_and/bool_or are the same.
+        return func.bool_and(value) if fn == "min" else func.bool_or(value)
+    return getattr(func, fn)(value)
+
+
+def _to_json(value, col: dict | None):
+    """A typed SQL result as a JSON-friendly value (dropdown position → label)."""
+    if value is None:
+        return None
+    col_type = (col or {}).get("type", "string")
+    if col_type == "dropdown" and isinstance(value, int):
+        options = list(col.get("options") or [])
+        return options[value - 1] if 0 < value <= len(options) else None
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)  # snapshot numbers, shaped like the Decimal case
+    return value
+
+
+async def _select_from_sql(
+    db: AsyncSession,
+    sheet: Sheet,
+    parsed: list[tuple[str, str | None]],
+    group_by: list[str],
+    where: list,
+    columns: dict[str, dict],
+) -> list[tuple]:
+    """Up to MAX_GROUPS + 1 (group values..., metric values...) rows from SQL."""
+    group_exprs = [
+        row_query.typed_value(col_key, columns.get(col_key)).label(f"g{i}")
+        for i, col_key in enumerate(group_by)
+    ]
+    metric_exprs = [
+        _metric_expr(fn, col_key, columns).label(f"m{i}")
+        for i, (fn, col_key) in enumerate(parsed)
+    ]
+    stmt = select(*group_exprs, *metric_exprs).where(Row.sheet_id == sheet.id, *where)
+    if group_exprs:
+        # Group by output position: the typed expressions carry inline
+        # literals, so repeating them textually is long and error-prone.
+        positions = [literal_column(str(i + 1)) for i in range(len(group_exprs))]
+        stmt = stmt.group_by(*positions).order_by(
+            *(position.asc().nulls_last() for position in positions)
+        )
+    stmt = stmt.limit(MAX_GROUPS + 1)
+    return [tuple(record) for record in (await db.execute(stmt)).all()]
+
+
+def _select_from_snapshot(
+    snapshot: snapshot_service.SheetSnapshot,
+    parsed: list[tuple[str, str | None]],
+    group_by: list[str],
+    filters: list[str],
+) -> list[tuple] | None:
+    """_select_from_sql() on a snapshot; None if it can't match SQL exactly."""
+    columns = snapshot.columns
+    for col_key in group_by:
+        if columns.get(col_key, {}).get("type", "string") == "string":
+            return None
+    for fn, col_key in parsed:
+        if col_key is None:
+            continue
+        col_type = columns.get(col_key, {}).get("type", "string")
+        if col_key not in columns or (fn in ("min", "max") and col_type == "string"):
+            return None
+    table = snapshot.table
+    if filters:
+        mask = snapshot_service.filter_mask(snapshot, filters)
+        if mask is None:
+            return None
+        table = table.filter(mask)
+
+    # Arrow names each output column "<key>_<function>" ("count_all" for rows).
+    names, aggregations = [], []
+    for fn, col_key in parsed:
+        if col_key is None:
+            target, function, name = [], "count_all", "count_all"
+        else:
+            function = _ARROW_FUNCTIONS[fn]
+            target, name = col_key, f"{col_key}_{function}"
+        if name not in names:
+            aggregations.append((target, function))
+        names.append(name)
+    result = table.group_by(group_by).aggregate(aggregations)
+    if group_by:
+        # Nulls sort last by default, like the SQL ORDER BY ... NULLS LAST.
+        result = result.sort_by([(col_key, "ascending") for col_key in group_by])
+    return [
+        (*(record[col_key] for col_key in group_by), *(record[name] for name in names))
+        for record in result.slice(0, MAX_GROUPS + 1).to_pylist()
+    ]
+
+
+def _cache_key(
+    sheet: Sheet, metrics: list[str], group_by: list[str], filters: list[str]
+) -> tuple:
+    columns = row_query.column_types(sheet.column_schema)
+    keys = {spec.partition(":")[2] for spec in metrics}
+    keys |= set(group_by) | {spec.partition(":")[0] for spec in filters}
+    used = json.dumps({key: columns.get(key) for key in sorted(keys)}, sort_keys=True)
+    return (sheet.id, tuple(metrics), tuple(group_by), tuple(filters), used)
+
+
+async def aggregate(
+    db: AsyncSession,
+    sheet: Sheet,
+    metrics: list[str],
+    group_by: list[str],
+    filters: list[str],
+) -> dict:
+    """Compute (or serve from cache) a summary of the sheet's rows.
+
+    Returns {"change_seq", "groups": [{"key": {...}, "values": {...}}],
+    "truncated"} — values are keyed by metric spec. Raises ValueError
+    for an invalid metric, group-by or filter.
+    """
+    if not metrics:
+        raise ValueError("Provide at least one metric")
+    key = _cache_key(sheet, metrics, group_by, filters)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == sheet.change_seq:
+        _cache.move_to_end(key)
+        return cached[1]
+
+    columns = row_query.column_types(sheet.column_schema)
+    parsed = [_parse_metric(spec, columns) for spec in metrics]
+    where = row_query.compile_filters(filters, sheet.column_schema)
+    fetched = None
+    snapshot = await snapshot_service.get(db, sheet)
+    if snapshot is not None:
+        fetched = _select_from_snapshot(snapshot, parsed, group_by, filters)
+    if fetched is None:
+        fetched = await _select_from_sql(db, sheet, parsed, group_by, where, columns)
+
+    groups = []
+    for record in fetched[:MAX_GROUPS]:
+        group_values = record[: len(group_by)]
+        metric_values = record[len(group_by) :]
+        groups.append(
+            {
+                "key": {
+                    col_key: _to_json(value, columns.get(col_key))
+                    for col_key, value in zip(group_by, group_values)
+                },
+                "values": {
+                    spec: _to_json(
+                        value, None if fn == "count" else columns.get(col_key)
+                    )
+                    for spec, (fn, col_key), value in zip(
+                        metrics, parsed, metric_values
+                    )
+                },
+            }
+        )
+    result = {
+        "change_seq": sheet.change_seq,
+        "groups": groups,
+        "truncated": len(fetched) > MAX_GROUPS,
+    }
+
+    _cache[key] = (sheet.change_seq, result)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
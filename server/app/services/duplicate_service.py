@@ -0,0 +1,158 @@
+"""
+Duplicate Service — Find (and optionally merge or delete) duplicate rows.
+
+KEY NORMALIZATION (per key column, applied in order):
+  trim      → surrounding whitespace ignored   " A@x.org "  → "A@x.org"
+  lowercase → case ignored                     "A@x.org"    → "a@x.org"
+  digits    → everything but 0-9 dropped       "+91 98765-43210" → "919876543210"
+  Cells are compared as text (data->>key), so 85 and "85" are the same.
+  A row whose key is empty after normalizing (no phone, a phone with no
+  digits) is never a duplicate — blank sign-up fields don't cluster.
+
+ONE GROUP BY OVER A HASHED KEY:
+  SELECT md5(jsonb_build_array(<normalized keys>)::text) AS hash,
+         count(*), array_agg(id ORDER BY <row position>), ...
+  FROM rows WHERE sheet_id = :s AND <every key non-empty>
+  GROUP BY hash HAVING count(*) > 1
+  ORDER BY count(*) DESC LIMIT MAX_CLUSTERS + 1
+  Grouping by a fixed 32-byte hash instead of the (possibly long) key
+  values keeps Postgres' hash aggregate small, and the array form keeps
+  ("a b", "c") and ("a", "b c") apart. One sequential pass over the
+  sheet's rows; only the duplicate clusters leave Postgres.
+  Alternative: a streaming pass in Python — every row of a 500k-row
+    sheet would cross the wire just to find a few hundred clusters.
+
+RESOLVING: keep the first row of each cluster (in sheet order)
+  "delete" deletes the other rows (row_service.bulk_delete). "merge"
+  first copies each cell the kept row has empty from the first later row
+  that has it (row_service.bulk_update), then deletes the others. Both go
+  through row_service, so they're validated, sequenced and tombstoned
+  like any other write. Only the returned clusters are resolved — with
+  `truncated`, run it again for the rest.
+"""
+
+import uuid
+
+from sqlalchemy import Text, any_, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.row import Row
+from app.models.sheet import Sheet
+from app.schemas.row import RowPatch
+from app.services import row_service
+
+# Clusters returned (and resolved) per request; past this it's truncated.
+MAX_CLUSTERS = 1000
+
+_NORMALIZERS = {
+    "trim": func.btrim,
+    "lowercase": func.lower,
+    "digits": lambda value: func.regexp_replace(value, "[^0-9]", "", "g"),
+}
+
+
+def _is_empty(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _key_expr(key: str, steps: list[str]):
+    """data->>key with the normalization steps applied; NULL when empty."""
+    value = Row.data[key].astext
+    for step in steps:
+        value = _NORMALIZERS[step](value)
+    return func.nullif(value, "")
+
+
+async def find_duplicates(
+    db: AsyncSession,
+    sheet: Sheet,
+    keys: list[str],
+    normalize: dict[str, list[str]],
+    limit: int = MAX_CLUSTERS,
+) -> tuple[list[dict], bool]:
+    """Clusters of rows sharing the same normalized keys, biggest first.
+
+    Returns ([{"key", "count", "row_ids"}], truncated). Raises ValueError
+    for unknown columns or normalization steps.
+    """
+    columns = {col["key"] for col in sheet.column_schema or []}
+    for key in keys:
+        if key not in columns:
+            raise ValueError(f"Unknown column '{key}'")
+    for key, steps in normalize.items():
+        if key not in keys:
+            raise ValueError(f"'{key}' is normalized but not one of the keys")
+        for step in steps:
+            if step not in _NORMALIZERS:
+                raise ValueError(
+                    f"Unknown normalization '{step}', use one of {list(_NORMALIZERS)}"
+                )
+
+    normalized = [_key_expr(key, normalize.get(key, [])) for key in keys]
+    key_hash = func.md5(cast(func.jsonb_build_array(*normalized), Text))
+    size = func.count()
+    stmt = (
+        select(
+            size.label("count"),
+            func.array_agg(aggregate_order_by(Row.id, *row_service.POSITION)),
+            *(func.min(value) for value in normalized),
+        )
+        .where(Row.sheet_id == sheet.id, *(value.is_not(None) for value in normalized))
+        .group_by(key_hash)
+        .having(size > 1)
+        .order_by(size.desc(), key_hash)
+        .limit(limit + 1)
+    )
+    fetched = (await db.execute(stmt)).all()
+    clusters = [
+        {"key": dict(zip(keys, values)), "count": count, "row_ids": row_ids}
+        for count, row_ids, *values in fetched[:limit]
+    ]
+    return clusters, len(fetched) > limit
+
+
+async def _merge_patches(db: AsyncSession, clusters: list[dict]) -> list[RowPatch]:
+    """Per cluster, the cells its first row lacks, taken from the other rows."""
+    ids = [row_id for cluster in clusters for row_id in cluster["row_ids"]]
+    result = await db.execute(
+        select(Row.id, Row.data).where(
+            Row.id == any_(literal(ids, ARRAY(UUID(as_uuid=True))))
+        )
+    )
+    data_by_id = dict(result.all())
+    patches = []
+    for cluster in clusters:
+        keep, *others = cluster["row_ids"]
+        kept = data_by_id.get(keep, {})
+        patch: dict = {}
+        for row_id in others:
+            for key, value in data_by_id.get(row_id, {}).items():
+                if key in patch or _is_empty(value):
+                    continue
+                if _is_empty(kept.get(key)):
+                    patch[key] = value
+        if patch:
+            patches.append(RowPatch(id=keep, data=patch))
+    return patches
+
+
+async def resolve(
+    db: AsyncSession, sheet_id: uuid.UUID, clusters: list[dict], merge: bool
+) -> tuple[list[dict], list[uuid.UUID], int | None]:
+    """Keep each cluster's first row and delete the rest (see RESOLVING).
+
+    Returns (merged rows as RowResponse dicts, deleted ids, the delete's
+    change_seq or None when nothing was deleted). Raises ValueError if a
+    merged cell doesn't fit its column.
+    """
+    merged: list[dict] = []
+    if merge:
+        patches = await _merge_patches(db, clusters)
+        if patches:
+            merged = await row_service.bulk_update(db, sheet_id, patches)
+    extra = [row_id for cluster in clusters for row_id in cluster["row_ids"][1:]]
+    if not extra:
+        return merged, [], None
+    deleted, seq = await row_service.bulk_delete(db, sheet_id, extra)
+    return merged, deleted, seq
@@ -0,0 +1,307 @@
+"""
+Export Service — Stream a sheet out as CSV, XLSX or Parquet.
+
+Every format reads rows through row_service.stream_by_sheet() (server-side
+cursor) and writes them batch by batch, so a million-row export never
+holds the sheet in memory. Columns follow Sheet.column_schema `order`;
+keys in Row.data that aren't in the schema are not exported.
+
+FORMAT NOTES:
+  CSV     — Pure streaming: each batch is encoded and sent immediately.
+            The header row holds column keys (what import_service reads),
+            so an exported file re-imports into the same sheet.
+  Parquet — pyarrow ParquetWriter, one row group per batch. The writer's
+            output sink is drained after every row group, so bytes reach
+            the client while later batches are still being read.
+  XLSX    — The zip container can only be finalised once the last row is
+            written, so XlsxWriter runs in constant_memory mode (rows are
+            flushed to a temp file as they're written) and the finished
+            file is streamed from disk. A worksheet holds 1,048,576 rows,
+            header included; longer sheets continue on "Name (2)", "Name
+            (3)", ... each with its own header. Sheets wider than 16,384
+            columns are rejected up front (check_export). Cell text is
+            written as text — never as a formula or hyperlink — and cut
+            at Excel's 32,767-character cell limit.
+
+  Dict/list cells are written as JSON text in every format, as in the
+  NDJSON download.
+
+  pyarrow and XlsxWriter are imported lazily — they're only needed by the
+  export endpoint and pyarrow in particular is slow to import.
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+import uuid
+from collections.abc import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.models.sheet import Sheet
+from app.services import row_query, row_service
+
+EXPORT_BATCH_SIZE = 5000
+FILE_CHUNK_SIZE = 1024 * 1024
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    ),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+# Excel's worksheet limits.
+XLSX_MAX_ROWS = 1_048_576
+XLSX_MAX_COLUMNS = 16_384
+XLSX_MAX_STRING = 32_767
+
+
+def check_export(sheet: Sheet, fmt: str) -> None:
+    """Raise ValueError if `sheet` can't be exported as `fmt`.
+
+    Called before streaming starts — a failure mid-stream can no longer
+    become an error response.
+    """
+    if fmt == "xlsx" and len(sheet.column_schema or []) > XLSX_MAX_COLUMNS:
+        raise ValueError(
+            f"XLSX holds at most {XLSX_MAX_COLUMNS} columns; "
+            "export this sheet as CSV or Parquet"
+        )
+
+
+def ordered_columns(sheet: Sheet) -> list[dict]:
+    """Column definitions sorted by their `order` field.
+
+    Formula columns come typed by their result (see row_query.column_types).
+    """
+    columns = row_query.column_types(sheet.column_schema).values()
+    return sorted(columns, key=lambda col: col.get("order", 0))
+
+
+async def _batches(
+    db: AsyncSession, sheet_id: uuid.UUID, keys: list[str]
+) -> AsyncIterator[list[list]]:
+    """Yield lists of cell-value rows (in `keys` order), EXPORT_BATCH_SIZE at a time."""
+    batch: list[list] = []
+    async for row in row_service.stream_by_sheet(db, sheet_id, EXPORT_BATCH_SIZE):
+        data = row.data
+        batch.append([data.get(key) for key in keys])
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _as_text(value) -> str:
+    """A cell as text — dict/list cells as JSON, like the NDJSON download."""
+    if isinstance(value, dict | list):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+# ── CSV ──────────────────────────────────────────────────
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    return _as_text(value) if isinstance(value, dict | list) else value
+
+
+def _csv_chunk(rows: list[list]) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows([_csv_cell(value) for value in row] for row in rows)
+    return buf.getvalue().encode()
+
+
+async def export_csv(db: AsyncSession, sheet: Sheet) -> AsyncIterator[bytes]:
+    columns = ordered_columns(sheet)
+    keys = [col["key"] for col in columns]
+    # BOM so Excel opens UTF-8 correctly (mirrors utf-8-sig on import).
+    # Keys, not labels, in the header — see FORMAT NOTES above.
+    yield "﻿".encode() + _csv_chunk([keys])
+    async for rows in _batches(db, sheet.id, keys):
+        yield await run_in_threadpool(_csv_chunk, rows)
+
+
+# ── Parquet ──────────────────────────────────────────────
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents can be taken out incrementally."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buf += data
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+def _to_number(value):
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    return None
+
+
+def _to_text(value):
+    return None if value is None else _as_text(value)
+
+
+def _arrow_schema(columns: list[dict]):
+    import pyarrow as pa
+
+    arrow_types = {"number": pa.float64(), "boolean": pa.bool_()}
+    return pa.schema(
+        [(col["key"], arrow_types.get(col.get("type"), pa.string())) for col in columns]
+    )
+
+
+def _arrow_table(columns: list[dict], schema, rows: list[list]):
+    import pyarrow as pa
+
+    converters = {"number": _to_number, "boolean": _to_bool}
+    arrays = []
+    for i, col in enumerate(columns):
+        convert = converters.get(col.get("type"), _to_text)
+        arrays.append([convert(row[i]) for row in rows])
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(arrays, schema)],
+        schema=schema,
+    )
+
+
+async def export_parquet(db: AsyncSession, sheet: Sheet) -> AsyncIterator[bytes]:
+    import pyarrow.parquet as pq
+
+    columns = ordered_columns(sheet)
+    keys = [col["key"] for col in columns]
+    schema = _arrow_schema(columns)
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in _batches(db, sheet.id, keys):
+            table = await run_in_threadpool(_arrow_table, columns, schema, rows)
+            await run_in_threadpool(writer.write_table, table)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()  # writes the footer
+    yield sink.drain()
+
+
+# ── XLSX ─────────────────────────────────────────────────
+
+
+def _xlsx_cell(value):
+    # XlsxWriter handles str/int/float/bool natively; anything else as text.
+    if value is None or isinstance(value, int | float | bool):
+        return value
+    text = value if isinstance(value, str) else _as_text(value)
+    # Cut here rather than let write_row() stop at the long cell.
+    return text[:XLSX_MAX_STRING]
+
+
+def _xlsx_title(name: str | None, part: int) -> str:
+    """Worksheet name for the `part`-th worksheet of an export."""
+    # Excel: max 31 chars, no []:*?/\ in worksheet names.
+    title = re.sub(r"[\[\]:*?/\\]", " ", name or "").strip() or "Sheet"
+    suffix = f" ({part})" if part > 1 else ""
+    return title[: 31 - len(suffix)].rstrip() + suffix
+
+
+def _write_xlsx_row(worksheet, row: int, cells: list) -> None:
+    if worksheet.write_row(row, 0, cells) != 0:
+        raise ValueError(f"Row {row + 1} doesn't fit in an XLSX worksheet")
+
+
+async def export_xlsx(db: AsyncSession, sheet: Sheet) -> AsyncIterator[bytes]:
+    import xlsxwriter
+
+    columns = ordered_columns(sheet)
+    keys = [col["key"] for col in columns]
+    header = [_xlsx_cell(col["label"]) for col in columns]
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(
+            path,
+            {
+                "constant_memory": True,
+                # Cells are data: "=..." stays text, URLs stay plain strings.
+                "strings_to_formulas": False,
+                "strings_to_urls": False,
+            },
+        )
+
+        def add_worksheet():
+            part = len(workbook.worksheets()) + 1
+            worksheet = workbook.add_worksheet(_xlsx_title(sheet.name, part))
+            _write_xlsx_row(worksheet, 0, header)
+            return worksheet
+
+        worksheet = add_worksheet()
+        next_row = 1
+
+        def write_rows(rows: list[list]) -> None:
+            nonlocal worksheet, next_row
+            for row in rows:
+                if next_row == XLSX_MAX_ROWS:
+                    worksheet = add_worksheet()
+                    next_row = 1
+                _write_xlsx_row(worksheet, next_row, [_xlsx_cell(v) for v in row])
+                next_row += 1
+
+        async for rows in _batches(db, sheet.id, keys):
+            await run_in_threadpool(write_rows, rows)
+        await run_in_threadpool(workbook.close)
+
+        f = await run_in_threadpool(open, path, "rb")
+        try:
+            while chunk := await run_in_threadpool(f.read, FILE_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await run_in_threadpool(f.close)
+    finally:
+        await run_in_threadpool(os.remove, path)
+
+
+EXPORTERS = {
+    "csv": export_csv,
+    "xlsx": export_xlsx,
+    "parquet": export_parquet,
+}
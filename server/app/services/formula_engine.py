@@ -0,0 +1,730 @@
+"""
+Formula Engine — Computed columns, e.g. `total = score1 + score2`.
+
+EXPRESSION LANGUAGE (column "type": "formula" with a `formula` text):
+  score1 + score2                 numbers: + - * /  (x / 0 → empty)
+  score > 80                      comparisons: == != < <= > >=
+  score >= 80 and status == "Selected"       and, or, not
+  "Yes" if eligible else "No"     conditional
+  round(avg, 1)  abs(x)  min(a, b, ...)  max(a, b, ...)
+  coalesce(a, b, ...)  concat(a, b, ...)
+  col("roll no")                  a column whose key isn't a plain name
+  Cells are read by their column's type, like filters read them: number
+  cells and numeric text are numbers, dropdowns are the option text, and
+  a cell that doesn't fit (empty, "n/a" in a number column) is empty. An
+  empty operand makes the result empty, except that and/or use
+  three-valued logic and min/max/coalesce skip empty arguments.
+  Formulas can use other formulas; cycles are rejected.
+
+  Every formula is type-checked when the columns are saved, and its
+  result type (number, boolean or string) is stored on the column as
+  `result_type`. row_query.column_types() hands that type to filters,
+  sorts, aggregates and exports. Computed values are stored in Row.data
+  like any other cell, so reads never evaluate formulas.
+
+PARSED, NEVER EXECUTED:
+  The text is parsed with Python's `ast` module and only the nodes above
+  are accepted: no attribute access, no subscripts, no names other than
+  column keys and the functions listed. compile_formulas() turns a
+  column_schema into a FormulaSet once. The set is cached with the row
+  validator (row_validator.for_sheet), so once per schema version.
+
+DEPENDENCY GRAPH: shared by every row of the sheet
+  A formula can only read cells of its own row, so every row has the same
+  graph: each formula's sources (the columns it reads, directly or
+  through other formulas), with the formulas in dependency order. The
+  graph is built once per schema version. affected() picks the formulas
+  a set of changed keys reaches, so a PATCH to `score1` recomputes
+  `total` and whatever reads `total`, and a PATCH that touches no formula
+  input costs nothing extra.
+
+TWO EVALUATORS, SAME RULES:
+  Each formula compiles to a per-row Python function and a per-batch
+  pyarrow function. Like row_validator, batches of ARROW_MIN_ROWS or more
+  (imports, whole-sheet recalculation) go through the Arrow kernels, one
+  call per operator over the whole column. Smaller batches (cell edits)
+  use the Python function. Both do float64 arithmetic, so a recalculated
+  row and an edited row end up with the same value.
+  Alternative: computing in SQL inside the UPDATE — numeric arithmetic in
+    Postgres carries different digits than float (1 / 3), so the two
+    paths would disagree in the last places.
+
+pyarrow is imported lazily, like in row_validator.
+"""
+
+import ast
+import json
+import math
+import operator
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+NUMBER, BOOLEAN, STRING = "number", "boolean", "string"
+
+# Batches shorter than this are evaluated in Python (pyarrow has a fixed cost).
+ARROW_MIN_ROWS = 256
+
+FUNCTIONS = ("abs", "round", "min", "max", "coalesce", "concat")
+
+# round(x, n) digits allowed either way; past 10 Arrow's kernel rounds
+# differently from the Python evaluator.
+MAX_ROUND_DIGITS = 10
+
+# Same shape as row_validator._NUMBER, applied to trimmed text.
+_NUMBER_RE = re.compile(r"^-?([0-9]+[.]?[0-9]*|[.][0-9]+)$")
+
+# Largest float stored as an int (every integer below it is exact).
+_MAX_EXACT_INT = 2**53
+
+_ARITHMETIC = {
+    ast.Add: ("+", operator.add, "add"),
+    ast.Sub: ("-", operator.sub, "subtract"),
+    ast.Mult: ("*", operator.mul, "multiply"),
+}
+
+# Literal types a formula may contain (exact types: bool is not a number).
+_CONSTANT_TYPES = {bool: BOOLEAN, int: NUMBER, float: NUMBER, str: STRING}
+
+_COMPARISONS = {
+    ast.Eq: ("==", operator.eq, "equal"),
+    ast.NotEq: ("!=", operator.ne, "not_equal"),
+    ast.Lt: ("<", operator.lt, "less"),
+    ast.LtE: ("<=", operator.le, "less_equal"),
+    ast.Gt: (">", operator.gt, "greater"),
+    ast.GtE: (">=", operator.ge, "greater_equal"),
+}
+
+
+def _arrow_type(value_type: str):
+    import pyarrow as pa
+
+    return {NUMBER: pa.float64(), BOOLEAN: pa.bool_()}.get(value_type, pa.string())
+
+
+def _reader(col: dict) -> tuple[str, Callable[[Any], Any]]:
+    """(value type, cell → typed value or None) for a column formulas read."""
+    col_type = col.get("type", "string")
+    if col_type == "formula":
+        col_type = col.get("result_type") or STRING
+    if col_type == NUMBER:
+
+        def read(value):
+            if isinstance(value, str):
+                value = value.strip()
+                if not _NUMBER_RE.match(value):
+                    return None
+            elif isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None
+            try:
+                number = float(value)
+            except OverflowError:
+                return None
+            return number if math.isfinite(number) else None
+
+        return NUMBER, read
+    if col_type == BOOLEAN:
+
+        def read(value):
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+                return value.strip().lower() == "true"
+            return None
+
+        return BOOLEAN, read
+    if col_type == "dropdown":
+        options = frozenset(col.get("options") or ())
+
+        def read(value):
+            if isinstance(value, str) and value.strip() in options:
+                return value.strip()
+            return None
+
+        return STRING, read
+    return STRING, lambda value: value if isinstance(value, str) else None
+
+
+def _finite(value: float | None) -> float | None:
+    return value if value is not None and math.isfinite(value) else None
+
+
+def _to_cell(value, value_type: str):
+    """A computed value as it is stored in Row.data."""
+    if value_type == NUMBER:
+        value = _finite(value)
+        if value is not None and value.is_integer() and abs(value) < _MAX_EXACT_INT:
+            return int(value)
+    return value
+
+
+def _round(value: float, ndigits: int) -> float:
+    """Round half to even at `ndigits`, the way Arrow's round kernel does."""
+    if ndigits >= 0:
+        scale = 10.0**ndigits
+        scaled = value * scale
+    else:
+        scale = 10.0**-ndigits
+        scaled = value / scale
+    if not math.isfinite(scaled) or scaled.is_integer():
+        return value  # Arrow leaves values already at that precision as they are
+    rounded = round(scaled)
+    return rounded / scale if ndigits >= 0 else rounded * scale
+
+
+@dataclass(frozen=True)
+class _Node:
+    """One compiled sub-expression: its type and both evaluators."""
+
+    value_type: str
+    # values (key → typed value) → value or None
+    row: Callable[[dict], Any]
+    # arrays (key → pyarrow Array) → pyarrow Array or Scalar
+    batch: Callable[[dict], Any]
+
+
+class _Compiler:
+    """Type-check one formula's AST and build its _Node (raises ValueError)."""
+
+    def __init__(self, value_types: dict[str, str]):
+        self.value_types = value_types
+        self.refs: set[str] = set()
+
+    def compile(self, text: str) -> _Node:
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError:
+            raise ValueError("invalid syntax")
+        return self.visit(tree.body)
+
+    def visit(self, node: ast.AST) -> _Node:
+        method = getattr(self, f"visit_{type(node).__name__}", None)
+        if method is None:
+            raise ValueError(f"'{ast.unparse(node)}' is not supported")
+        return method(node)
+
+    def expect(self, node: ast.AST, value_type: str, what: str) -> _Node:
+        compiled = self.visit(node)
+        if compiled.value_type != value_type:
+            raise ValueError(
+                f"{what} needs a {value_type}, '{ast.unparse(node)}' is a {compiled.value_type}"
+            )
+        return compiled
+
+    def column(self, key: str) -> _Node:
+        if key not in self.value_types:
+            raise ValueError(f"unknown column '{key}'")
+        self.refs.add(key)
+        return _Node(
+            self.value_types[key],
+            lambda values: values[key],
+            lambda arrays: arrays[key],
+        )
+
+    def visit_Name(self, node: ast.Name) -> _Node:
+        if node.id in FUNCTIONS:
+            raise ValueError(f"'{node.id}' is a function, call it like {node.id}(...)")
+        return self.column(node.id)
+
+    def visit_Constant(self, node: ast.Constant) -> _Node:
+        import pyarrow as pa
+
+        value = node.value
+        value_type = _CONSTANT_TYPES.get(type(value))
+        if value_type is None:
+            raise ValueError(f"'{ast.unparse(node)}' is not supported")
+        if value_type == NUMBER:
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError(f"'{node.value}' is not a finite number")
+        scalar = pa.scalar(value, _arrow_type(value_type))
+        return _Node(value_type, lambda values: value, lambda arrays: scalar)
+
+    def visit_BinOp(self, node: ast.BinOp) -> _Node:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if isinstance(node.op, ast.Div):
+            symbol = "/"
+        elif type(node.op) in _ARITHMETIC:
+            symbol, python_op, arrow_op = _ARITHMETIC[type(node.op)]
+        else:
+            raise ValueError(f"'{ast.unparse(node)}': only + - * / are supported")
+        left = self.expect(node.left, NUMBER, f"'{symbol}'")
+        right = self.expect(node.right, NUMBER, f"'{symbol}'")
+
+        if symbol == "/":
+            empty = pa.scalar(None, pa.float64())
+
+            def row(values):
+                a, b = left.row(values), right.row(values)
+                if a is None or b is None or b == 0:
+                    return None
+                return a / b
+
+            def batch(arrays):
+                b = right.batch(arrays)
+                return pc.if_else(
+                    pc.equal(b, 0.0), empty, pc.divide(left.batch(arrays), b)
+                )
+
+            return _Node(NUMBER, row, batch)
+
+        kernel = getattr(pc, arrow_op)
+
+        def row(values):
+            a, b = left.row(values), right.row(values)
+            return None if a is None or b is None else python_op(a, b)
+
+        return _Node(
+            NUMBER, row, lambda arrays: kernel(left.batch(arrays), right.batch(arrays))
+        )
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> _Node:
+        import pyarrow.compute as pc
+
+        if isinstance(node.op, ast.Not):
+            operand = self.expect(node.operand, BOOLEAN, "'not'")
+            return _Node(
+                BOOLEAN,
+                lambda values: None if (v := operand.row(values)) is None else not v,
+                lambda arrays: pc.invert(operand.batch(arrays)),
+            )
+        if isinstance(node.op, ast.USub):
+            operand = self.expect(node.operand, NUMBER, "'-'")
+            return _Node(
+                NUMBER,
+                lambda values: None if (v := operand.row(values)) is None else -v,
+                lambda arrays: pc.negate(operand.batch(arrays)),
+            )
+        if isinstance(node.op, ast.UAdd):
+            return self.expect(node.operand, NUMBER, "'+'")
+        raise ValueError(f"'{ast.unparse(node)}' is not supported")
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> _Node:
+        import pyarrow.compute as pc
+
+        is_and = isinstance(node.op, ast.And)
+        word = "and" if is_and else "or"
+        operands = [self.expect(value, BOOLEAN, f"'{word}'") for value in node.values]
+        # Three-valued logic: a deciding operand wins over an empty one.
+        decider = not is_and
+        kernel = pc.and_kleene if is_and else pc.or_kleene
+
+        def row(values):
+            result = not decider
+            for operand in operands:
+                value = operand.row(values)
+                if value is decider:
+                    return decider
+                if value is None:
+                    result = None
+            return result
+
+        def batch(arrays):
+            result = operands[0].batch(arrays)
+            for operand in operands[1:]:
+                result = kernel(result, operand.batch(arrays))
+            return result
+
+        return _Node(BOOLEAN, row, batch)
+
+    def visit_Compare(self, node: ast.Compare) -> _Node:
+        import pyarrow.compute as pc
+
+        if len(node.ops) != 1 or type(node.ops[0]) not in _COMPARISONS:
+            raise ValueError(
+                f"'{ast.unparse(node)}': compare two values with one of == != < <= > >="
+            )
+        symbol, python_op, arrow_op = _COMPARISONS[type(node.ops[0])]
+        left = self.visit(node.left)
+        right = self.expect(node.comparators[0], left.value_type, f"'{symbol}'")
+        if left.value_type == BOOLEAN and symbol not in ("==", "!="):
+            raise ValueError(f"'{symbol}' needs numbers or text, not booleans")
+        kernel = getattr(pc, arrow_op)
+
+        def row(values):
+            a, b = left.row(values), right.row(values)
+            return None if a is None or b is None else python_op(a, b)
+
+        return _Node(
+            BOOLEAN, row, lambda arrays: kernel(left.batch(arrays), right.batch(arrays))
+        )
+
+    def visit_IfExp(self, node: ast.IfExp) -> _Node:
+        import pyarrow.compute as pc
+
+        test = self.expect(node.test, BOOLEAN, "'if'")
+        body = self.visit(node.body)
+        orelse = self.expect(node.orelse, body.value_type, "'else'")
+
+        def row(values):
+            condition = test.row(values)
+            if condition is None:
+                return None
+            return body.row(values) if condition else orelse.row(values)
+
+        return _Node(
+            body.value_type,
+            row,
+            lambda arrays: pc.if_else(
+                test.batch(arrays), body.batch(arrays), orelse.batch(arrays)
+            ),
+        )
+
+    def visit_Call(self, node: ast.Call) -> _Node:
+        import pyarrow.compute as pc
+
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name != "col" and name not in FUNCTIONS:
+            raise ValueError(
+                f"'{ast.unparse(node.func)}' is not a function, use one of {FUNCTIONS}"
+            )
+        if node.keywords:
+            raise ValueError(f"{name}() takes no keyword arguments")
+        args = node.args
+        if name == "col":
+            if len(args) != 1 or not isinstance(getattr(args[0], "value", None), str):
+                raise ValueError('col() takes one column key, e.g. col("roll no")')
+            return self.column(args[0].value)
+
+        if name == "abs":
+            if len(args) != 1:
+                raise ValueError("abs() takes one number")
+            value = self.expect(args[0], NUMBER, "abs()")
+            return _Node(
+                NUMBER,
+                lambda values: None if (v := value.row(values)) is None else abs(v),
+                lambda arrays: pc.abs(value.batch(arrays)),
+            )
+
+        if name == "round":
+            if len(args) not in (1, 2):
+                raise ValueError("round() takes a number and optionally a digit count")
+            value = self.expect(args[0], NUMBER, "round()")
+            ndigits = 0
+            if len(args) == 2:
+                digits = args[1]
+                if isinstance(digits, ast.UnaryOp) and isinstance(digits.op, ast.USub):
+                    digits, sign = digits.operand, -1
+                else:
+                    sign = 1
+                raw = getattr(digits, "value", None)
+                if (
+                    isinstance(raw, bool)
+                    or not isinstance(raw, int)
+                    or raw > MAX_ROUND_DIGITS
+                ):
+                    raise ValueError(
+                        f"round()'s digit count must be a whole number from "
+                        f"-{MAX_ROUND_DIGITS} to {MAX_ROUND_DIGITS}"
+                    )
+                ndigits = sign * raw
+
+            def batch(arrays):
+                numbers = value.batch(arrays)
+                if ndigits <= 0:
+                    return pc.round(numbers, ndigits=ndigits, round_mode="half_to_even")
+                # Arrow raises where value * 10**ndigits overflows; _round()
+                # keeps those values as they are.
+                fits = pc.is_finite(pc.multiply(numbers, 10.0**ndigits))
+                rounded = pc.round(
+                    pc.if_else(fits, numbers, 0.0),
+                    ndigits=ndigits,
+                    round_mode="half_to_even",
+                )
+                return pc.if_else(fits, rounded, numbers)
+
+            return _Node(
+                NUMBER,
+                lambda values: (
+                    None if (v := value.row(values)) is None else _round(v, ndigits)
+                ),
+                batch,
+            )
+
+        if not args:
+            raise ValueError(f"{name}() needs at least one argument")
+        if name in ("min", "max"):
+            operands = [self.expect(arg, NUMBER, f"{name}()") for arg in args]
+            pick = min if name == "min" else max
+            kernel = pc.min_element_wise if name == "min" else pc.max_element_wise
+
+            def row(values):
+                present = [
+                    v for v in (o.row(values) for o in operands) if v is not None
+                ]
+                return pick(present) if present else None
+
+            return _Node(
+                NUMBER,
+                row,
+                lambda arrays: kernel(
+                    *(o.batch(arrays) for o in operands), skip_nulls=True
+                ),
+            )
+
+        if name == "coalesce":
+            first = self.visit(args[0])
+            operands = [first] + [
+                self.expect(arg, first.value_type, "coalesce()") for arg in args[1:]
+            ]
+
+            def row(values):
+                for operand in operands:
+                    value = operand.row(values)
+                    if value is not None:
+                        return value
+                return None
+
+            return _Node(
+                first.value_type,
+                row,
+                lambda arrays: pc.coalesce(*(o.batch(arrays) for o in operands)),
+            )
+
+        # concat
+        operands = [self.expect(arg, STRING, "concat()") for arg in args]
+
+        def row(values):
+            parts = [operand.row(values) for operand in operands]
+            return None if any(part is None for part in parts) else "".join(parts)
+
+        return _Node(
+            STRING,
+            row,
+            lambda arrays: pc.binary_join_element_wise(
+                *(o.batch(arrays) for o in operands), ""
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class Formula:
+    key: str
+    text: str
+    result_type: str
+    # Keys the formula reads itself.
+    refs: frozenset[str]
+    # Every key the value depends on, directly or through other formulas.
+    sources: frozenset[str]
+    node: _Node
+
+
+@dataclass(frozen=True)
+class FormulaSet:
+    """The compiled formulas of one column_schema version (see module docstring)."""
+
+    # In dependency order: a formula comes after every formula it reads.
+    formulas: tuple[Formula, ...]
+    # Their keys — cells that are computed, never written directly.
+    keys: frozenset[str]
+    # Key → (value type, cell reader) for every key a formula reads.
+    readers: dict[str, tuple[str, Callable[[Any], Any]]]
+    # Formula key → fingerprint of its text and of how its sources are read.
+    signatures: dict[str, str]
+
+    def affected(self, changed: Iterable[str]) -> tuple[Formula, ...]:
+        """The formulas to recompute when `changed` keys change (in order).
+
+        A changed formula key counts too: it and what reads it are included.
+        """
+        changed = frozenset(changed)
+        return tuple(
+            formula
+            for formula in self.formulas
+            if formula.key in changed or formula.sources & changed
+        )
+
+    def inputs(self, formulas: Iterable[Formula]) -> set[str]:
+        """Stored cells needed to evaluate `formulas` (in order, in one pass)."""
+        formulas = list(formulas)
+        computed = {formula.key for formula in formulas}
+        return set().union(*(formula.refs for formula in formulas)) - computed
+
+    def compute(
+        self, data: dict[str, Any], formulas: Iterable[Formula] | None = None
+    ) -> dict[str, Any]:
+        """Computed cells of one row: {formula key: value}."""
+        formulas = self.formulas if formulas is None else tuple(formulas)
+        values = {
+            key: self.readers[key][1](data.get(key)) for key in self.inputs(formulas)
+        }
+        cells = {}
+        for formula in formulas:
+            value = formula.node.row(values)
+            if formula.result_type == NUMBER:
+                value = _finite(value)
+            values[formula.key] = value
+            cells[formula.key] = _to_cell(value, formula.result_type)
+        return cells
+
+    def compute_batch(
+        self, rows: list[dict[str, Any]], formulas: Iterable[Formula] | None = None
+    ) -> list[dict[str, Any]]:
+        """compute() for many rows, with Arrow kernels for long batches."""
+        formulas = self.formulas if formulas is None else tuple(formulas)
+        if not formulas:
+            return [{} for _ in rows]
+        if len(rows) < ARROW_MIN_ROWS:
+            return [self.compute(row, formulas) for row in rows]
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        arrays = {}
+        for key in self.inputs(formulas):
+            value_type, read = self.readers[key]
+            arrays[key] = pa.array(
+                [read(row.get(key)) for row in rows], type=_arrow_type(value_type)
+            )
+        columns = {}
+        for formula in formulas:
+            result = formula.node.batch(arrays)
+            if isinstance(result, pa.Scalar):  # no column in it, e.g. "1 + 1"
+                result = pa.array([result.as_py()] * len(rows), type=result.type)
+            if formula.result_type == NUMBER:
+                result = pc.if_else(pc.is_finite(result), result, None)
+            arrays[formula.key] = result
+            columns[formula.key] = [
+                _to_cell(value, formula.result_type) for value in result.to_pylist()
+            ]
+        return [
+            {key: values[i] for key, values in columns.items()}
+            for i in range(len(rows))
+        ]
+
+    def apply(self, data: dict[str, Any]) -> dict[str, Any]:
+        """A copy of a new row's data with every formula cell computed."""
+        return {**data, **self.compute(data)} if self.formulas else data
+
+    def apply_batch(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """apply() for many new rows."""
+        if not self.formulas:
+            return rows
+        return [{**row, **cells} for row, cells in zip(rows, self.compute_batch(rows))]
+
+
+def _ordered(keys: list[str], reads: dict[str, set[str]]) -> list[str]:
+    """Formula keys with dependencies first. Raises ValueError on a cycle."""
+    ordered: list[str] = []
+    state: dict[str, str] = {}
+
+    def visit(key: str, path: list[str]) -> None:
+        if state.get(key) == "done":
+            return
+        if state.get(key) == "visiting":
+            cycle = path[path.index(key) :] + [key]
+            if len(cycle) == 2:
+                raise ValueError(f"Formula '{key}' refers to itself")
+            raise ValueError(f"Formulas refer to each other: {' → '.join(cycle)}")
+        state[key] = "visiting"
+        for dependency in sorted(reads[key] & set(keys)):
+            visit(dependency, path + [key])
+        state[key] = "done"
+        ordered.append(key)
+
+    for key in keys:
+        visit(key, [])
+    return ordered
+
+
+def compile_formulas(column_schema: list[dict]) -> FormulaSet:
+    """Parse and type-check every formula column. Raises ValueError.
+
+    Result types are inferred here; formula columns in `column_schema`
+    don't need `result_type` set.
+    """
+    columns = {col["key"]: col for col in column_schema or []}
+    texts = {
+        key: (col.get("formula") or "").strip()
+        for key, col in columns.items()
+        if col.get("type") == "formula"
+    }
+    for key, text in texts.items():
+        if not text:
+            raise ValueError(f"Formula column '{key}' needs a formula")
+    for key, col in columns.items():
+        if key not in texts and col.get("formula"):
+            raise ValueError(f"Column '{key}' has a formula but isn't a formula column")
+
+    # First pass: what each formula reads (types of other formulas unknown yet).
+    reads: dict[str, set[str]] = {}
+    for key, text in texts.items():
+        try:
+            tree = ast.parse(text, mode="eval")
+        except SyntaxError:
+            raise ValueError(f"Formula '{key}': invalid syntax")
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id not in FUNCTIONS + ("col",):
+                names.add(node.id)
+            elif (
+                isinstance(node, ast.Call)
+                and getattr(node.func, "id", None) == "col"
+                and node.args
+                and isinstance(getattr(node.args[0], "value", None), str)
+            ):
+                names.add(node.args[0].value)
+        reads[key] = names
+
+    value_types: dict[str, str] = {}
+    readers: dict[str, tuple[str, Callable[[Any], Any]]] = {}
+    for key, col in columns.items():
+        if key not in texts:
+            readers[key] = _reader(col)
+            value_types[key] = readers[key][0]
+
+    formulas: list[Formula] = []
+    sources: dict[str, frozenset[str]] = {}
+    signatures: dict[str, str] = {}
+    for key in _ordered(list(texts), reads):
+        compiler = _Compiler(value_types)
+        try:
+            node = compiler.compile(texts[key])
+        except ValueError as exc:
+            raise ValueError(f"Formula '{key}': {exc}")
+        result_type = node.value_type
+        value_types[key] = result_type
+        readers[key] = _reader({"type": result_type})
+        sources[key] = frozenset(compiler.refs).union(
+            *(sources[ref] for ref in compiler.refs if ref in sources)
+        )
+        signatures[key] = json.dumps(
+            [
+                texts[key],
+                result_type,
+                {
+                    ref: signatures.get(ref)
+                    or [columns[ref].get("type"), columns[ref].get("options")]
+                    for ref in sorted(compiler.refs)
+                },
+            ]
+        )
+        formulas.append(
+            Formula(
+                key=key,
+                text=texts[key],
+                result_type=result_type,
+                refs=frozenset(compiler.refs),
+                sources=sources[key],
+                node=node,
+            )
+        )
+
+    used = set().union(*sources.values()) if sources else set()
+    return FormulaSet(
+        formulas=tuple(formulas),
+        keys=frozenset(texts),
+        readers={key: reader for key, reader in readers.items() if key in used},
+        signatures=signatures,
+    )
+
+
+def changed_formulas(old: FormulaSet, new: FormulaSet) -> list[str]:
+    """Formula keys of `new` whose values may differ from what `old` stored."""
+    return [
+        key
+        for key, signature in new.signatures.items()
+        if old.signatures.get(key) != signature
+    ]
@@ -0,0 +1,219 @@
+"""
+Import Service — Incremental CSV import.
+
+PIPELINE:
+  UploadFile (spooled to disk by Starlette)
+    → TextIOWrapper (utf-8-sig, decodes ~8KB at a time)
+    → csv.reader (one record at a time, handles quoted newlines)
+    → batches of IMPORT_BATCH_SIZE rows
+    → row_service.bulk_create (one INSERT ... RETURNING per batch)
+
+  Parsing is blocking CPU work, so each batch is parsed in the threadpool.
+  While batch N is being inserted, batch N+1 is already being parsed:
+
+    parse[1] ─┬─ insert[1] ─┬─ insert[2] ─ ...
+              └─ parse[2] ──┴─ parse[3] ── ...
+
+  Peak memory is ~2 batches regardless of file size. The raw upload and
+  the created rows are never held in full.
+
+ERROR HANDLING:
+  A bad line (wrong number of fields, or a cell that doesn't fit its
+  column — see services/row_validator.py) is skipped and reported with
+  its line number; the rest of the file still imports. Cells are checked
+  column by column over the whole batch in the parser thread, so
+  validation overlaps with the previous batch's INSERT. Formula columns
+  are computed there too, as Arrow columns over the batch. A decode error
+  aborts the whole import since we can't resynchronise inside a broken
+  byte stream — the caller's transaction rolls back.
+
+BACKGROUND IMPORTS:
+  spool_upload() copies the upload to JOB_UPLOAD_DIR so a Celery worker
+  can run import_csv() on it later (see app/tasks/import_tasks.py). The
+  worker passes `on_batch` to commit and report progress after each batch.
+
+SIZE LIMIT: synchronous imports are capped
+  The synchronous endpoint imports in one transaction, and every batch
+  takes the sheet's lock (row_service.next_change_seq) until it commits,
+  so a big file would block every other writer of the sheet for the whole
+  upload. It passes max_rows=SYNC_IMPORT_MAX_ROWS: past that many data
+  lines import_csv() raises CsvTooLarge before inserting more, the
+  transaction rolls back, and the client is pointed at the job endpoint,
+  which commits per batch.
+  Alternative: commit per batch here too — but then a request that fails
+    halfway returns an error and still leaves half the file imported.
+"""
+
+import asyncio
+import csv
+import io
+import os
+import shutil
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.schemas.row import CsvImportError, CsvImportReport, RowCreate
+from app.services import row_service, row_validator
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# Data lines the synchronous endpoint accepts (see SIZE LIMIT above).
+SYNC_IMPORT_MAX_ROWS = 50_000
+
+
+class CsvTooLarge(Exception):
+    """import_csv() was given more data lines than its max_rows."""
+
+    def __init__(self, max_rows: int):
+        super().__init__(f"CSV has more than {max_rows} rows")
+        self.max_rows = max_rows
+
+
+@dataclass
+class _ParsedBatch:
+    rows: list[RowCreate] = field(default_factory=list)
+    errors: list[CsvImportError] = field(default_factory=list)
+    done: bool = False
+
+
+def _parse_batch(
+    reader,
+    header: list[str],
+    batch_size: int,
+    validator: row_validator.RowValidator,
+) -> _ParsedBatch:
+    """Pull up to batch_size valid records off the reader (runs in a thread)."""
+    batch = _ParsedBatch()
+    records: list[dict] = []
+    lines: list[int] = []
+    while len(records) < batch_size:
+        try:
+            record = next(reader)
+        except StopIteration:
+            batch.done = True
+            break
+        except UnicodeDecodeError:
+            raise ValueError(f"File must be UTF-8 encoded (line {reader.line_num + 1})")
+        except csv.Error as exc:
+            batch.errors.append(CsvImportError(line=reader.line_num, error=str(exc)))
+            continue
+        if not record:
+            continue  # blank line
+        if len(record) != len(header):
+            batch.errors.append(
+                CsvImportError(
+                    line=reader.line_num,
+                    error=f"Expected {len(header)} fields, got {len(record)}",
+                )
+            )
+            continue
+        records.append(dict(zip(header, record)))
+        lines.append(reader.line_num)
+
+    coerced, errors = validator.validate_batch(records)
+    kept = []
+    for i, data in enumerate(coerced):
+        if i in errors:
+            batch.errors.append(CsvImportError(line=lines[i], error=errors[i]))
+        else:
+            kept.append(data)
+    # model_construct: already checked by the validator, skip Pydantic.
+    batch.rows = [
+        RowCreate.model_construct(data=data)
+        for data in validator.formulas.apply_batch(kept)
+    ]
+    batch.errors.sort(key=lambda error: error.line)
+    return batch
+
+
+async def import_csv(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    file: BinaryIO,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_batch: Callable[[CsvImportReport], Awaitable[None]] | None = None,
+    max_rows: int | None = None,
+) -> CsvImportReport:
+    """Stream a CSV file into a sheet, batch by batch.
+
+    The header row's names become the data keys. Raises ValueError if the
+    sheet doesn't exist or the file is empty or not UTF-8, and CsvTooLarge
+    if it has more than `max_rows` data lines (nothing past them is
+    inserted). `on_batch` is awaited with the running report after each
+    batch is written.
+    """
+    validator = await row_validator.load(db, sheet_id)
+    if validator is None:
+        raise ValueError("Sheet not found")
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    report = CsvImportReport()
+    pending: asyncio.Future | None = None
+    try:
+        reader = csv.reader(text)
+        try:
+            header = await run_in_threadpool(next, reader, None)
+        except UnicodeDecodeError:
+            raise ValueError("File must be UTF-8 encoded")
+        if not header:
+            raise ValueError("CSV file is empty or has no data rows")
+
+        pending = asyncio.ensure_future(
+            run_in_threadpool(_parse_batch, reader, header, batch_size, validator)
+        )
+        while pending is not None:
+            batch = await pending
+            pending = None
+            if not batch.done:
+                # Start parsing the next batch while this one is inserted.
+                pending = asyncio.ensure_future(
+                    run_in_threadpool(
+                        _parse_batch, reader, header, batch_size, validator
+                    )
+                )
+
+            lines = len(batch.rows) + len(batch.errors)
+            if (
+                max_rows is not None
+                and report.inserted + report.rejected + lines > max_rows
+            ):
+                raise CsvTooLarge(max_rows)
+            report.rejected += len(batch.errors)
+            room = MAX_REPORTED_ERRORS - len(report.errors)
+            report.errors.extend(batch.errors[:room])
+            report.errors_truncated |= len(batch.errors) > room
+
+            if batch.rows:
+                await row_service.bulk_create(db, sheet_id, batch.rows, validate=False)
+                report.inserted += len(batch.rows)
+            if on_batch is not None:
+                await on_batch(report)
+    finally:
+        # The parser thread may still be reading — let it finish before we
+        # hand the file back, otherwise it reads from a detached wrapper.
+        if pending is not None:
+            await asyncio.gather(pending, return_exceptions=True)
+        # Detach so closing the wrapper doesn't close the UploadFile.
+        text.detach()
+
+    if report.inserted == 0 and report.rejected == 0:
+        raise ValueError("CSV file is empty or has no data rows")
+    return report
+
+
+def spool_upload(file: BinaryIO) -> str:
+    """Copy an upload to JOB_UPLOAD_DIR for a worker; returns the path.
+
+    Blocking file I/O — call it through run_in_threadpool.
+    """
+    os.makedirs(settings.JOB_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(settings.JOB_UPLOAD_DIR, f"{uuid.uuid4()}.csv")
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file, out, length=1024 * 1024)
+    return path
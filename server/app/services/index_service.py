@@ -0,0 +1,90 @@
+"""
+Index Service — Per-sheet expression indexes for hot columns.
+
+The GIN index on rows.data covers equality filters for every column, but
+range filters and (typed) sorts need a B-tree on the exact expression the
+query uses. For a hot column we build:
+
+  CREATE INDEX CONCURRENTLY ix_rows_<sheet>_<key>_<expr>
+    ON rows ((<row_query.typed_value(key)>), order_key, row_order, id)
+    WHERE sheet_id = '<sheet uuid>'
+
+  - Partial (WHERE sheet_id = ...) so it only covers that sheet's rows.
+  - The expression comes from row_query.typed_value(), the same builder the
+    filters use, so the planner sees identical expressions.
+  - Trailing (order_key, row_order, id) — the row position — are the sort
+    tie-breakers, so a sorted page is one ordered index range scan (no
+    sort step) and range filters still use the leading expression.
+  - The name hashes the expression too: if the column's type or dropdown
+    options change, a new index is built instead of silently keeping one
+    the queries no longer match.
+  - CONCURRENTLY doesn't block writes while building, but can't run inside
+    a transaction, hence the dedicated AUTOCOMMIT connection.
+"""
+
+import hashlib
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.core.database import engine
+from app.models.sheet import Sheet
+from app.services import row_query
+
+
+def _short_hash(value: str, length: int) -> str:
+    return hashlib.md5(value.encode()).hexdigest()[:length]
+
+
+def _name_prefix(sheet_id: uuid.UUID, key: str | None = None) -> str:
+    prefix = f"ix_rows_{_short_hash(str(sheet_id), 12)}_"
+    return prefix if key is None else f"{prefix}{_short_hash(key, 8)}_"
+
+
+def expression_sql(key: str, col: dict | None) -> str:
+    """Render row_query.typed_value() as literal SQL for DDL."""
+    expr = row_query.typed_value(key, col)
+    compiled = expr.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    # Index expressions are written against the bare table.
+    return str(compiled).replace("rows.data", "data")
+
+
+async def create_column_index(sheet: Sheet, key: str) -> tuple[str, str]:
+    """Build (if missing) the expression index for one column.
+
+    Returns (index_name, expression). Raises ValueError for unknown keys.
+    """
+    col = row_query.column_types(sheet.column_schema).get(key)
+    if col is None:
+        raise ValueError(f"Column '{key}' is not in the sheet's schema")
+    expression = expression_sql(key, col)
+    index_columns = f"({expression}), order_key, row_order, id"
+    name = _name_prefix(sheet.id, key) + _short_hash(index_columns, 8)
+    ddl = (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+        f"ON rows ({index_columns}) WHERE sheet_id = '{sheet.id}'"
+    )
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql(ddl)
+    return name, expression
+
+
+async def drop_column_indexes(sheet_id: uuid.UUID, key: str) -> list[str]:
+    """Drop every expression index built for a column; returns their names."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        result = await conn.execute(
+            text(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE tablename = 'rows' AND indexname LIKE :prefix"
+            ),
+            {"prefix": _name_prefix(sheet_id, key) + "%"},
+        )
+        names = list(result.scalars().all())
+        for name in names:
+            await conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    return names
@@ -0,0 +1,65 @@
+"""
+Job Service — Bookkeeping for background jobs.
+
+The worker owns a job once it is queued: it moves the status forward,
+bumps progress counters and stores the final result. Each transition is
+committed straight away so GET /jobs/{id} sees it while the job runs.
+"""
+
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+
+
+async def create(db: AsyncSession, sheet_id: uuid.UUID, kind: str, params: dict) -> Job:
+    """Record a new pending job."""
+    job = Job(
+        sheet_id=sheet_id, kind=kind, status="pending", params=params, progress={}
+    )
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    return job
+
+
+async def get_by_id(db: AsyncSession, job_id: uuid.UUID) -> Job | None:
+    return await db.get(Job, job_id)
+
+
+async def get_active(db: AsyncSession, sheet_id: uuid.UUID, kind: str) -> Job | None:
+    """The sheet's pending or running job of this kind, if there is one."""
+    result = await db.execute(
+        select(Job)
+        .where(
+            Job.sheet_id == sheet_id,
+            Job.kind == kind,
+            Job.status.in_(("pending", "running")),
+        )
+        .order_by(Job.created_at)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def set_status(
+    db: AsyncSession,
+    job: Job,
+    status: str,
+    *,
+    progress: dict | None = None,
+    result: dict | None = None,
+    error: str | None = None,
+) -> Job:
+    """Move a job to a new status and commit immediately."""
+    job.status = status
+    if progress is not None:
+        job.progress = progress
+    if result is not None:
+        job.result = result
+    if error is not None:
+        job.error = error
+    await db.commit()
+    return job
@@ -0,0 +1,158 @@
+"""
+Order Keys — Lexicographic fractional indexing for Row.order_key.
+
+Sheets created with row_ordering="lexical" position rows by a base-62
+string instead of a float. Between any two keys there is always another
+key, so inserting or moving a row writes exactly one row and the sheet
+never needs renumbering (unlike floats, which run out of precision).
+
+KEY FORMAT (the scheme popularised by Figma / rocicorp fractional-indexing):
+  <integer part><fraction>
+    integer part: a head letter encoding its length, then digits
+                  "a0", "a1" … "az", "b00" … (a–z grow upwards,
+                  A–Z mirror them for keys before "a0")
+    fraction:     optional base-62 digits, never ending in "0"
+  Appending increments the integer part, so N appends give keys of
+  O(log N) length. Inserting between two neighbours extends the fraction
+  by about one character per 6 bisections at the same spot.
+
+  Keys compare with plain byte order — the column uses COLLATE "C" so
+  Postgres sorts them exactly like Python's str comparison.
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """A fraction strictly between fractions a and b (b=None: no upper bound)."""
+    if b is not None and a >= b:
+        raise ValueError(f"{a!r} is not below {b!r}")
+    if a.endswith("0") or (b is not None and b.endswith("0")):
+        raise ValueError("Fraction has a trailing zero")
+    if b:
+        # Skip the shared prefix (a is padded with zeros for the comparison).
+        n = 0
+        while (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[round((digit_a + digit_b) / 2)]
+    # Consecutive digits: keep a's digit and bisect one level deeper.
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid order key {key!r}")
+    return key[:length]
+
+
+def validate(key: str) -> None:
+    """Raise ValueError unless `key` is a well-formed order key."""
+    if not key or key == _SMALLEST_INTEGER:
+        raise ValueError(f"Invalid order key {key!r}")
+    integer = _integer_part(key)
+    if any(ch not in DIGITS for ch in key[1:]) or key[len(integer) :].endswith("0"):
+        raise ValueError(f"Invalid order key {key!r}")
+
+
+def _increment_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = DIGITS.index(digits[i]) + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = "0"
+    # Carried out of every digit: move to the next (longer/shorter) head.
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append("0")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """A key strictly between a and b. None means "start"/"end" of the sheet."""
+    if a is not None:
+        validate(a)
+    if b is not None:
+        validate(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} is not below {b!r}")
+    if a is None and b is None:
+        return "a" + DIGITS[0]
+    if a is None:
+        integer_b = _integer_part(b)
+        fraction_b = b[len(integer_b) :]
+        if integer_b == _SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if integer_b < b:
+            return integer_b
+        result = _decrement_integer(integer_b)
+        if result is None:
+            raise ValueError("Cannot decrement any more")
+        return result
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a) :]
+    if b is None:
+        result = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if result is None else result
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b) :])
+    result = _increment_integer(integer_a)
+    if result is None:
+        raise ValueError("Cannot increment any more")
+    if result < b:
+        return result
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_after(a: str | None, count: int) -> list[str]:
+    """`count` consecutive keys after a (bulk appends)."""
+    keys: list[str] = []
+    for _ in range(count):
+        a = key_between(a, None)
+        keys.append(a)
+    return keys
@@ -0,0 +1,243 @@
+"""
+Row Query — Compile filter specs into SQL predicates over Row.data.
+
+FILTER LANGUAGE:
+  Each filter is one `filter=` query parameter of the form key:op:value
+    status:eq:Selected        → cell equals value
+    status:in:Pending,Selected → cell equals any of the comma-separated values
+    score:gte:80              → range (also gt, lt, lte)
+    name:contains:sar         → case-insensitive substring
+  Multiple filters are ANDed. Values are typed using the column's `type`
+  in Sheet.column_schema (unknown keys are treated as strings).
+
+HOW EACH OPERATOR HITS AN INDEX:
+  eq / in   → JSONB containment:  data @> '{"status": "Selected"}'
+              Served by the GIN (jsonb_path_ops) index on rows.data.
+              Numbers/booleans also match their string form ("85"), since
+              CSV imports store every cell as text.
+  gt/lt/... → Compared on typed_value(), a NULL-safe typed expression
+              (e.g. numeric for number columns). Served by a per-sheet
+              expression index on that exact expression, created via
+              POST /sheets/{id}/indexes (see index_service).
+  contains  → data->>'key' ILIKE '%value%'. A sequential scan within the
+              sheet (the sheet_id index still narrows it down).
+
+  Column keys, regexes and dropdown options are rendered as inline SQL
+  literals (literal_execute) rather than bind params. Postgres only uses
+  an expression index when the query's expression is *textually* the same
+  constant expression as the index, and a $1 placeholder never is.
+
+SORTING:
+  `sort=key:asc|desc` orders by the same typed_value() expression, so
+  numbers sort numerically and dropdowns in option order. Ties are broken
+  by the row position (order_key, row_order, id), which keeps keyset
+  pagination stable; desc reverses the tie-breakers too. Cells that
+  don't fit the type (empty, "n/a" in a number column) sort last in both
+  directions, like in a spreadsheet. The per-column index built by
+  index_service is (typed_value, order_key, row_order, id), so it serves
+  the ORDER BY ... LIMIT of a sorted page directly, in either direction.
+"""
+
+import math
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import Integer, Numeric, String, Text, bindparam, case, func, or_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.row import Row
+
+FILTER_OPS = ("eq", "in", "gt", "gte", "lt", "lte", "contains")
+SORT_DIRECTIONS = ("asc", "desc")
+
+# Plain decimal numbers, optionally padded — what ::numeric accepts and what
+# a number looks like after CSV import. No backslashes, so the pattern
+# renders identically as an inline literal everywhere.
+_NUMERIC_PATTERN = "^[[:space:]]*-?([0-9]+[.]?[0-9]*|[.][0-9]+)[[:space:]]*$"
+
+# Filter numbers are limited to 1e-1000 .. 1e1000 in magnitude.
+MAX_FILTER_EXPONENT = 1000
+
+
+def _const(value, type_) -> ColumnElement:
+    """A constant rendered inline in the SQL text (see module docstring)."""
+    return bindparam(None, value, type_=type_, literal_execute=True)
+
+
+def column_types(column_schema: list[dict]) -> dict[str, dict]:
+    """Map column key → column definition.
+
+    Formula columns get their result_type as `type`, so their computed
+    cells filter, sort and aggregate as numbers, booleans or text.
+    """
+    columns = {}
+    for col in column_schema or []:
+        if col.get("type") == "formula":
+            col = {**col, "type": col.get("result_type") or "string"}
+        columns[col["key"]] = col
+    return columns
+
+
+def cell_text(key: str) -> ColumnElement:
+    """data->>'key' — the cell as text (NULL if missing)."""
+    return Row.data.op("->>", return_type=Text)(_const(key, String))
+
+
+def typed_value(key: str, col: dict | None) -> ColumnElement:
+    """The cell cast according to its column type, NULL when it doesn't fit.
+
+    number   → numeric (non-numeric text → NULL instead of a cast error)
+    boolean  → boolean ("true"/"false", any case)
+    dropdown → 1-based position in `options`, so it orders like the list
+    string   → text
+    Every branch is IMMUTABLE, so it can back an expression index.
+    """
+    text = cell_text(key)
+    col_type = (col or {}).get("type", "string")
+    if col_type == "number":
+        return case(
+            (text.op("~")(_const(_NUMERIC_PATTERN, String)), text.cast(Numeric)),
+            else_=None,
+        )
+    if col_type == "boolean":
+        lowered = func.lower(text)
+        return case(
+            (lowered == _const("true", String), True),
+            (lowered == _const("false", String), False),
+            else_=None,
+        )
+    if col_type == "dropdown":
+        options = _const(list(col.get("options") or []), ARRAY(Text))
+        return func.array_position(options, text, type_=Integer)
+    return text
+
+
+def typed_literal(raw: str, col: dict | None):
+    """Parse a filter value into the Python type typed_value() compares with."""
+    col_type = (col or {}).get("type", "string")
+    if col_type == "number":
+        try:
+            number = Decimal(raw.strip())
+        except InvalidOperation:
+            raise ValueError(f"'{raw}' is not a number")
+        # Infinity/NaN never match a stored cell (see _NUMERIC_PATTERN), and
+        # huge exponents would overflow the numeric comparison.
+        if not number.is_finite() or abs(number.adjusted()) > MAX_FILTER_EXPONENT:
+            raise ValueError(f"'{raw}' is not a finite number in range")
+        return number
+    if col_type == "boolean":
+        lowered = raw.strip().lower()
+        if lowered not in ("true", "false"):
+            raise ValueError(f"'{raw}' is not a boolean")
+        return lowered == "true"
+    if col_type == "dropdown":
+        options = list(col.get("options") or [])
+        if raw not in options:
+            raise ValueError(f"'{raw}' is not one of {options}")
+        return options.index(raw) + 1
+    return raw
+
+
+def _equals(key: str, raw: str, col: dict | None) -> ColumnElement:
+    """GIN-servable equality: data @> {key: value} (plus the typed form)."""
+    candidates: list = [raw]
+    col_type = (col or {}).get("type", "string")
+    if col_type == "number":
+        number = typed_literal(raw, col)
+        if number == number.to_integral():
+            candidates.append(int(number))
+        elif math.isfinite(float(number)):
+            candidates.append(float(number))
+    elif col_type == "boolean":
+        candidates.append(typed_literal(raw, col))
+    clauses = [Row.data.contains({key: value}) for value in candidates]
+    return clauses[0] if len(clauses) == 1 else or_(*clauses)
+
+
+def compile_filter(spec: str, columns: dict[str, dict]) -> ColumnElement:
+    """Compile one key:op:value filter into a WHERE clause. Raises ValueError."""
+    parts = spec.split(":", 2)
+    if len(parts) != 3 or not parts[0]:
+        raise ValueError(f"Invalid filter '{spec}', expected key:op:value")
+    key, op, raw = parts
+    if op not in FILTER_OPS:
+        raise ValueError(f"Unknown filter operator '{op}', use one of {FILTER_OPS}")
+    col = columns.get(key)
+
+    if op == "eq":
+        return _equals(key, raw, col)
+    if op == "in":
+        return or_(*(_equals(key, value, col) for value in raw.split(",")))
+    if op == "contains":
+        escaped = raw.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return cell_text(key).ilike(f"%{escaped}%", escape="\\")
+
+    expr = typed_value(key, col)
+    value = typed_literal(raw, col)
+    if op == "gt":
+        return expr > value
+    if op == "gte":
+        return expr >= value
+    if op == "lt":
+        return expr < value
+    return expr <= value
+
+
+def compile_filters(specs: list[str], column_schema: list[dict]) -> list[ColumnElement]:
+    """Compile every filter spec against a sheet's column schema."""
+    columns = column_types(column_schema)
+    return [compile_filter(spec, columns) for spec in specs]
+
+
+# What typed_value() yields per column type, as it comes back from a cursor
+# (numbers are written as text; see row_service.encode_sorted_cursor).
+_SORT_VALUE_TYPES = {
+    "number": (str, int, float),
+    "boolean": (bool,),
+    "dropdown": (int,),
+}
+
+
+@dataclass(frozen=True)
+class RowSort:
+    """A compiled sort: the typed expression plus its direction."""
+
+    key: str
+    col_type: str
+    expr: ColumnElement
+    descending: bool
+
+    def restore(self, value):
+        """Turn a sort value read back from a JSON cursor into its SQL type.
+
+        Raises TypeError or ValueError if the cursor can't have held it.
+        """
+        if value is None:
+            return None
+        types = _SORT_VALUE_TYPES.get(self.col_type, (str,))
+        # bool is an int subclass: only a boolean column takes one.
+        if not isinstance(value, types) or (
+            isinstance(value, bool) and bool not in types
+        ):
+            raise TypeError(f"Not a {self.col_type} sort value: {value!r}")
+        if self.col_type == "number":
+            return Decimal(value)
+        if isinstance(value, str) and "\x00" in value:
+            raise ValueError("Text sort values can't contain NUL")
+        return value
+
+
+def compile_sort(spec: str, column_schema: list[dict]) -> RowSort:
+    """Compile a key[:asc|desc] sort spec. Raises ValueError."""
+    key, _, direction = spec.partition(":")
+    direction = direction or "asc"
+    if not key or direction not in SORT_DIRECTIONS:
+        raise ValueError(f"Invalid sort '{spec}', expected key:asc or key:desc")
+    col = column_types(column_schema).get(key)
+    return RowSort(
+        key=key,
+        col_type=(col or {}).get("type", "string"),
+        expr=typed_value(key, col),
+        descending=direction == "desc",
+    )
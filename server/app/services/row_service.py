@@ -6,46 +6,513 @@ ORDERING ALGORITHM: Fractional indexing
     Between row_order 1.0 and 2.0 → new row gets 1.5
     Between 1.5 and 2.0 → 1.75
 
-  This is O(1) — no need to update any other rows.
+  This is O(1) — no need to update any other rows. move() and
+  create_between() take neighbour ids instead of numbers: the server reads
+  the anchor row(s) by primary key and finds the missing neighbour with
+  one seek on the position index, so clients never need the full list.
 
   Problem: After many insertions, floats lose precision (~15 decimal digits).
-  Solution: Periodic rebalancing (re-number all rows as 1.0, 2.0, 3.0...).
-  We implement get_next_order() to append at the end by default.
+  Solution: Rebalancing. Whenever a row is placed at an explicit row_order,
+  order_gap_too_small() checks its neighbours; if a gap is below
+  REBALANCE_MIN_RELATIVE_GAP the router queues a background job that runs
+  rebalance_orders() (renumber as whole numbers, see REBALANCING below).
+  Appends take the next value of Sheet.next_row_order (see APPENDS below).
+
+  Sheets with row_ordering="lexical" use Row.order_key strings instead
+  (services/order_keys.py) and never need rebalancing.
 
   Alternative: Array-based ordering (store row IDs in an ordered array on
   the sheet). Simpler reads but requires updating the entire array on every
   insert/reorder.
+
+APPENDS: Per-sheet counter, UPDATE ... RETURNING
+  reserve_orders() claims a block of row_orders in one statement:
+    UPDATE sheets SET next_row_order = next_row_order + :n
+    WHERE id = :sheet_id RETURNING next_row_order
+  O(1) instead of MAX(row_order) over the sheet, and collision-free: the
+  UPDATE row-locks the sheet, so a concurrent append waits for this
+  transaction and then sees the advanced counter. The counter is kept
+  above every row_order — explicit positions raise it (raise_order_counter())
+  and rebalancing reserves its new range from it. Lexical appends take
+  the same lock before reading the last key.
+  Alternative: a Postgres SEQUENCE per sheet — lock-free, but thousands
+    of sheets would mean thousands of sequences, and it can't be raised
+    atomically when a row is placed past it.
+
+REBALANCING: Descending chunked renumber above the current max
+  rebalance_orders() reserves N row_orders above every existing row from
+  the append counter, then walks the sheet from the last row backwards,
+  moving REBALANCE_CHUNK rows per transaction into that range:
+    chunk 1: the last rows     → the top of the new range
+    chunk 2: the rows before   → just below them, ...
+  Rows already moved sit at or above `lowest` (the last value assigned)
+  and every row below it is still to move, so the sheet reads in the
+  correct order between any two commits, and each transaction only locks
+  one chunk of rows briefly.
+  Each chunk takes the sheet lock (next_change_seq) before reading, and
+  move()/create_between() take it before picking neighbours, so a
+  midpoint is always computed between two chunks. One that lands between
+  the moved and unmoved rows is simply below `lowest` and moves with the
+  next chunk. If such rows fill up the range — the next chunk would no
+  longer fit above the rows left behind it — a fresh range is reserved
+  and the walk starts over from the top.
+
+KEY REWRITE: Chunked keyset walk over (change_seq, id)
+  rewrite_keys() applies a column rename/drop to the stored cells (see
+  sheet_service.update_columns). It walks the sheet in REWRITE_CHUNK-row
+  steps along the (sheet_id, change_seq) index and rewrites only the
+  rows in each step that still hold an old key:
+    UPDATE rows SET data = <new key := old key unless set> - <old keys>
+    WHERE id = ANY(:chunk) AND data ?| <old keys>
+  one transaction per chunk with a pause in between, so row and sheet
+  locks are held for one chunk at a time and edits keep flowing. Rows it
+  rewrites get a new change_seq and are seen once more at the end of the
+  walk (already clean, so not rewritten); rows users edit meanwhile are
+  picked up the same way. A value written under the new key wins over the
+  old one, and re-running the rewrite is harmless.
+
+PAGINATION: Keyset on the row position (order_key, row_order, id)
+  list_page() returns `limit` rows plus an opaque cursor encoding the last
+  row's position (see POSITION). The next page seeks past it with a
+  row-value comparison, which the (sheet_id, order_key, row_order, id)
+  index serves directly:
+    WHERE sheet_id = :s AND (order_key, row_order, id) > (:key, :order, :id)
+    ORDER BY order_key, row_order, id LIMIT :limit
+  With ?sort= the sort value is prepended to the key and the cursor carries
+  it too (see _list_sorted_page()).
+  Pages are read as plain column tuples (_RETURNING_COLUMNS), not ORM
+  objects: nothing is added to the session's identity map, and the router
+  encodes them straight to JSON (see app/core/serialization.py).
+
+STREAMING: Server-side cursor
+  stream_by_sheet() is for clients that really need the whole sheet. It
+  runs the same ordered SELECT through a server-side cursor and pulls
+  `batch_size` rows per round trip, so memory stays flat no matter how
+  many rows the sheet has.
+
+BULK INSERT: Multi-row INSERT ... RETURNING
+  bulk_create() sends BULK_INSERT_BATCH rows per statement and builds the
+  response payloads from the RETURNING tuples. A 10k-row import is 10
+  round trips instead of 10k INSERTs + 10k refresh SELECTs.
+  Alternative: COPY into a staging table — faster still for millions of
+  rows, but needs raw-connection access and an extra INSERT ... SELECT.
+
+SINGLE-ROW UPDATE: UPDATE ... RETURNING with a JSONB merge
+  update() is one statement, one round trip:
+    UPDATE rows SET data = data || :patch, updated_at = now()
+    WHERE id = :id RETURNING rows.*
+  `||` merges inside the row lock, so two users editing different cells of
+  the same row both keep their edit (a read-merge-write in Python would
+  let the second write drop the first cell). It is preceded by one
+  indexed, unlocked lookup of the row's sheet (schema_version, ordering
+  mode): the patch is validated with the compiled validator for that
+  version (see services/row_validator.py) and positions are checked
+  against the mode.
+  The sequence bump (see CHANGE SEQUENCE below) rides along as a CTE:
+    WITH seq AS (UPDATE sheets SET change_seq = change_seq + 1
+                 WHERE id = :s AND schema_version = :seen
+                   AND EXISTS (SELECT FROM rows WHERE <row matches>)
+                 RETURNING change_seq)
+    UPDATE rows SET ..., change_seq = (SELECT change_seq FROM seq)
+    WHERE <row matches> AND EXISTS (SELECT FROM seq)
+  The EXISTS on seq is uncorrelated, so Postgres checks it as a one-time
+  filter before scanning rows: the sheet is locked before the row, the
+  same order as every other writer. A schema change since the lookup
+  fires nothing and update() starts over with the new validator.
+  Every write also sets version = version + 1; with expected_version the
+  WHERE clause adds `AND version = :expected`, and only when that matches
+  nothing does a second query tell "missing" (None) from "stale"
+  (RowVersionConflict). A stale version is caught by the CTE's EXISTS
+  and consumes no sequence number; only when a concurrent write lands
+  between the bump and the row check is one number skipped, which
+  clients treat as a missed event and catch up on.
+
+BATCH UPDATE: UPDATE ... FROM (VALUES ...)
+  bulk_update() applies many partial cell patches in one statement:
+    UPDATE rows SET data = rows.data || v.patch
+    FROM (VALUES (:id1, :patch1), (:id2, :patch2), ...) AS v(id, patch)
+    WHERE rows.id = v.id AND rows.sheet_id = :sheet_id
+  The JSONB `||` merge happens in Postgres, so no row is read first.
+
+FORMULAS: computed on write, only where an input changed
+  Formula cells (see services/formula_engine.py) are stored like other
+  cells. create()/bulk_create() compute every formula of the new rows.
+  update()/bulk_update() ask the sheet's FormulaSet which formulas read a
+  patched key. Only when some do, they read just those formulas' other
+  inputs from the stored rows and add the recomputed cells to the patch
+  (_with_formulas). A patch that feeds no formula keeps the
+  single-statement paths above. bulk_update() locks the sheet first
+  (next_change_seq); every writer locks the sheet before touching rows,
+  so no input can change between that read and the UPDATE. update()
+  takes no lock up front and pins the row's version instead: if another
+  write got in between, its UPDATE matches nothing and it starts over.
+  recalculate_formulas() redoes given formulas for a whole sheet after a
+  column change, a committed chunk at a time like rewrite_keys(). Each
+  chunk is evaluated as Arrow columns, and only rows whose stored value
+  differs are written.
+
+BULK DELETE: Chunked DELETE ... RETURNING id
+  bulk_delete() never loads rows. Ids go in BULK_DELETE_BATCH-sized
+  arrays, one bind parameter per statement:
+    DELETE FROM rows WHERE sheet_id = :s AND id = ANY(:ids) RETURNING id
+  A filter deletes BULK_DELETE_BATCH matching rows per statement until a
+  statement comes back short:
+    DELETE FROM rows WHERE id IN (
+      SELECT id FROM rows WHERE sheet_id = :s AND <filters> LIMIT :n
+    ) RETURNING id
+  Every chunk runs in the request's transaction, so the delete is still
+  all-or-nothing. Chunking keeps each statement and its RETURNING list
+  small. Each chunk's DELETE is a CTE feeding the RowTombstone INSERT, so
+  tombstones cost no extra round trip.
+
+CHANGE SEQUENCE: One number per write, taken before touching rows
+  Every write function starts with next_change_seq():
+    UPDATE sheets SET change_seq = change_seq + 1 WHERE id = :s RETURNING change_seq
+  and stamps the rows it writes (Row.change_seq) or deletes (RowTombstone)
+  with it. list_changes() then answers "what changed since N" with one
+  range scan per table. The sheet row stays locked until commit, so
+  numbers commit in order and writes to one sheet serialise (they already
+  did for appends). Taking the sheet lock before any row lock keeps the
+  lock order the same everywhere, so two writers can't deadlock.
+  update() takes no lock up front: it advances the sequence in a CTE of
+  its own UPDATE that only fires if the row still matches (see
+  SINGLE-ROW UPDATE), so the sheet is locked only from the bump on.
+  Alternative: a global Postgres SEQUENCE — no lock, but numbers commit
+    out of order (a reader can see 6 before 5 commits and skip 5 forever),
+    and they aren't consecutive per sheet, so clients can't spot a missed
+    event.
+
+TOMBSTONE RETENTION: Pruned in batches, horizon raised in the same statement
+  prune_tombstones() deletes up to TOMBSTONE_PRUNE_BATCH tombstones older
+  than the cutoff and raises each sheet's tombstone_horizon to the highest
+  change_seq it removed — one statement, so no reader sees the tombstones
+  gone without the horizon moved. list_changes() reads the horizon *after*
+  the tombstones: a prune that committed before that read is then always
+  seen, and a `since` below the horizon gets None (refetch) rather than a
+  delta with deletes missing.
 """
 
+import asyncio
+import base64
+import json
+import math
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from datetime import datetime
 
-from sqlalchemy import select, func as sa_func
+from sqlalchemy import (
+    and_,
+    any_,
+    case,
+    column,
+    insert,
+    literal,
+    not_,
+    select,
+    tuple_,
+    values,
+)
+from sqlalchemy import delete as sa_delete, func as sa_func, update as sa_update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TEXT, UUID
+from sqlalchemy.engine import Row as SqlRow
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
 from app.models.row import Row
-from app.schemas.row import RowCreate, RowUpdate
+from app.models.row_tombstone import RowTombstone
+from app.models.sheet import Sheet
+from app.schemas.row import RowCreate, RowInsert, RowPatch, RowPlacement, RowUpdate
+from app.services import formula_engine, order_keys, row_validator
 from app.services.agent_rule_service import evaluate_rules_for_row
+from app.services.row_query import RowSort
 from app.core.worker import execute_agent_rule
 
+# Rows per INSERT statement. 4 bind params per row keeps us far below
+# Postgres' 65535-parameter limit while amortising round trips.
+BULK_INSERT_BATCH = 1000
+
+# Rows per DELETE statement in bulk_delete().
+BULK_DELETE_BATCH = 5000
+
+# A float-ordered sheet is rebalanced once two neighbouring row_orders are
+# closer than this fraction of their magnitude. Doubles carry ~2^-52 of
+# relative precision, so this leaves ~20 more midpoint splits of headroom.
+REBALANCE_MIN_RELATIVE_GAP = 1e-9
+
+# Rows renumbered per transaction by rebalance_orders().
+REBALANCE_CHUNK = 1000
+
+# Rows checked per transaction by rewrite_keys(), and the pause between
+# chunks that leaves room for interactive writes to the same sheet.
+REWRITE_CHUNK = 1000
+REWRITE_PAUSE_SECONDS = 0.05
+
+# list_changes() gives up past this many changed (or deleted) rows — a
+# client that far behind is better off refetching the sheet.
+CHANGES_LIMIT = 5000
+
+# Tombstones older than this are pruned (see TOMBSTONE RETENTION), in
+# batches of TOMBSTONE_PRUNE_BATCH per statement.
+TOMBSTONE_RETENTION_DAYS = 30
+TOMBSTONE_PRUNE_BATCH = 5000
+
+# Total order of rows in a sheet, for both ordering modes (see Row model).
+POSITION = (Row.order_key, Row.row_order, Row.id)
+
+# Columns returned by set-based writes and read by listings — exactly the
+# RowResponse fields, in order.
+_RETURNING_COLUMNS = (
+    Row.id,
+    Row.sheet_id,
+    Row.data,
+    Row.row_order,
+    Row.order_key,
+    Row.version,
+    Row.change_seq,
+    Row.created_at,
+    Row.updated_at,
+)
+
+
+# update() retries this often when a concurrent write invalidates what it
+# read (the sheet's schema, or a formula's stored inputs) before giving up.
+UPDATE_ATTEMPTS = 5
+
+# Returned by _try_update() when update() should start over.
+_RETRY = object()
+
+
+class RowVersionConflict(Exception):
+    """update() was given an expected_version the row no longer has."""
 
-async def get_next_order(db: AsyncSession, sheet_id: uuid.UUID) -> float:
-    """Get the next row_order value (max + 1)."""
+    def __init__(self, current_version: int):
+        super().__init__(f"Row is at version {current_version}")
+        self.current_version = current_version
+
+
+async def next_change_seq(db: AsyncSession, sheet_id: uuid.UUID) -> int:
+    """Advance the sheet's change sequence and return the new number.
+
+    Locks the sheet row until commit. Raises ValueError if the sheet
+    doesn't exist.
+    """
+    seq = await db.scalar(
+        sa_update(Sheet)
+        .where(Sheet.id == sheet_id)
+        .values(change_seq=Sheet.change_seq + 1)
+        .returning(Sheet.change_seq)
+        .execution_options(synchronize_session=False)
+    )
+    if seq is None:
+        raise ValueError("Sheet not found")
+    return seq
+
+
+async def current_change_seq(db: AsyncSession, sheet_id: uuid.UUID) -> int | None:
+    """The sheet's last change sequence number (None if it doesn't exist)."""
+    return await db.scalar(select(Sheet.change_seq).where(Sheet.id == sheet_id))
+
+
+async def list_changes(
+    db: AsyncSession, sheet_id: uuid.UUID, since: int, limit: int = CHANGES_LIMIT
+) -> tuple[list[SqlRow], list[uuid.UUID]] | None:
+    """Rows written and ids of rows deleted after change number `since`.
+
+    A row written several times appears once, as it is now (as a
+    _RETURNING_COLUMNS tuple). Returns None if either list would exceed
+    `limit`, or if tombstones after `since` may have been pruned (the
+    caller should refetch).
+    """
+    result = await db.execute(
+        select(*_RETURNING_COLUMNS)
+        .where(Row.sheet_id == sheet_id, Row.change_seq > since)
+        .order_by(Row.change_seq, Row.id)
+        .limit(limit + 1)
+    )
+    rows = list(result.all())
     result = await db.execute(
-        select(sa_func.coalesce(sa_func.max(Row.row_order), 0.0)).where(
-            Row.sheet_id == sheet_id
+        select(RowTombstone.row_id)
+        .where(RowTombstone.sheet_id == sheet_id, RowTombstone.change_seq > since)
+        .order_by(RowTombstone.change_seq)
+        .limit(limit + 1)
+    )
+    deleted = list(result.scalars().all())
+    if len(rows) > limit or len(deleted) > limit:
+        return None
+    # After the tombstones — see TOMBSTONE RETENTION.
+    horizon = await db.scalar(
+        select(Sheet.tombstone_horizon).where(Sheet.id == sheet_id)
+    )
+    if horizon is not None and since < horizon:
+        return None
+    return rows, deleted
+
+
+async def prune_tombstones(
+    db: AsyncSession, cutoff: datetime, limit: int = TOMBSTONE_PRUNE_BATCH
+) -> int:
+    """Delete up to `limit` tombstones older than `cutoff`; returns how many.
+
+    Raises tombstone_horizon on every sheet that lost tombstones (see
+    TOMBSTONE RETENTION). Call repeatedly until it returns less than `limit`.
+    """
+    expired = (
+        select(RowTombstone.row_id).where(RowTombstone.deleted_at < cutoff).limit(limit)
+    )
+    gone = (
+        sa_delete(RowTombstone)
+        .where(RowTombstone.row_id.in_(expired))
+        .returning(RowTombstone.sheet_id, RowTombstone.change_seq)
+        .cte("gone")
+    )
+    pruned = (
+        select(gone.c.sheet_id, sa_func.max(gone.c.change_seq).label("change_seq"))
+        .group_by(gone.c.sheet_id)
+        .subquery()
+    )
+    horizon = (
+        sa_update(Sheet)
+        .where(Sheet.id == pruned.c.sheet_id)
+        .values(
+            tombstone_horizon=sa_func.greatest(
+                Sheet.tombstone_horizon, pruned.c.change_seq
+            ),
+            # Housekeeping, not an edit: keep the onupdate from firing.
+            updated_at=Sheet.updated_at,
         )
+        .returning(Sheet.id)
+        .cte("horizon")
     )
-    return result.scalar_one() + 1.0
+    return await db.scalar(select(sa_func.count()).select_from(gone).add_cte(horizon))
 
 
-async def create(db: AsyncSession, sheet_id: uuid.UUID, payload: RowCreate) -> Row:
-    """Create a row. If no row_order given, append at end."""
-    order = (
-        payload.row_order
-        if payload.row_order is not None
-        else await get_next_order(db, sheet_id)
+async def reserve_orders(db: AsyncSession, sheet_id: uuid.UUID, count: int = 1) -> float:
+    """Claim `count` consecutive append row_orders; returns the first one.
+
+    Raises ValueError if the sheet doesn't exist.
+    """
+    result = await db.execute(
+        sa_update(Sheet)
+        .where(Sheet.id == sheet_id)
+        .values(next_row_order=Sheet.next_row_order + count)
+        .returning(Sheet.next_row_order)
+        .execution_options(synchronize_session=False)
+    )
+    end = result.scalar_one_or_none()
+    if end is None:
+        raise ValueError("Sheet not found")
+    return end - count
+
+
+async def raise_order_counter(
+    db: AsyncSession, sheet_id: uuid.UUID, row_order: float
+) -> None:
+    """Keep the append counter above a row placed at an explicit row_order."""
+    await db.execute(
+        sa_update(Sheet)
+        .where(Sheet.id == sheet_id, Sheet.next_row_order <= row_order)
+        .values(next_row_order=math.floor(row_order) + 1.0)
+        .execution_options(synchronize_session=False)
     )
-    row = Row(sheet_id=sheet_id, data=payload.data, row_order=order)
+
+
+async def get_last_order_key(db: AsyncSession, sheet_id: uuid.UUID) -> str | None:
+    """The greatest order_key in a lexical sheet (None if it has no rows).
+
+    Locks the sheet row first so concurrent appends can't pick the same key.
+    """
+    await db.execute(select(Sheet.id).where(Sheet.id == sheet_id).with_for_update())
+    result = await db.execute(
+        select(sa_func.max(Row.order_key)).where(Row.sheet_id == sheet_id)
+    )
+    return result.scalar_one() or None
+
+
+async def _get_sheet(db: AsyncSession, sheet_id: uuid.UUID) -> Sheet:
+    sheet = await db.get(Sheet, sheet_id)
+    if sheet is None:
+        raise ValueError("Sheet not found")
+    return sheet
+
+
+def _validate_batch(sheet: Sheet, rows: list[dict], labels: list | None = None) -> list[dict]:
+    """Coerced copies of many rows' data. Raises ValueError naming bad rows."""
+    coerced, errors = row_validator.for_sheet(sheet).validate_batch(rows)
+    if errors:
+        raise ValueError(row_validator.describe_errors(errors, labels))
+    return coerced
+
+
+async def _with_formulas(
+    db: AsyncSession,
+    formulas: formula_engine.FormulaSet,
+    patches: dict[uuid.UUID, dict],
+) -> dict[uuid.UUID, dict]:
+    """Validated partial updates plus the formula cells they change.
+
+    Only formulas reading a patched key are recomputed; the inputs a patch
+    doesn't carry are read from the stored row. Those reads must not go
+    stale before the UPDATE: call it with the sheet locked (after
+    next_change_seq, as every writer locks the sheet first), or pin the
+    rows' versions in the UPDATE as update() does.
+    """
+    affected = formulas.affected(set().union(*patches.values()))
+    if not affected:
+        return patches
+    ids = list(patches)
+    needed = sorted(formulas.inputs(affected))
+    stored: dict[uuid.UUID, dict] = {}
+    if needed:
+        result = await db.execute(
+            select(Row.id, *(Row.data[key] for key in needed)).where(
+                Row.id == any_(literal(ids, ARRAY(UUID(as_uuid=True))))
+            )
+        )
+        stored = {row_id: dict(zip(needed, cells)) for row_id, *cells in result.all()}
+    rows = [{**stored.get(row_id, {}), **patches[row_id]} for row_id in ids]
+    computed = formulas.compute_batch(rows, affected)
+    return {row_id: {**patches[row_id], **cells} for row_id, cells in zip(ids, computed)}
+
+
+async def _is_lexical(db: AsyncSession, sheet_id: uuid.UUID) -> bool:
+    sheet = await db.get(Sheet, sheet_id)
+    return sheet is not None and sheet.row_ordering == "lexical"
+
+
+def _check_position(lexical: bool, row_order: float | None, order_key: str | None):
+    """Reject the position field that doesn't belong to the sheet's mode."""
+    if lexical and row_order is not None:
+        raise ValueError("This sheet uses lexical ordering; position rows with order_key")
+    if not lexical and order_key is not None:
+        raise ValueError("This sheet uses float ordering; position rows with row_order")
+    if order_key is not None:
+        order_keys.validate(order_key)
+
+
+async def create(db: AsyncSession, sheet_id: uuid.UUID, payload: RowCreate) -> Row:
+    """Create a row. If no position given, append at end.
+
+    Raises ValueError if the sheet doesn't exist, a cell doesn't fit its
+    column, or the position doesn't fit the sheet's ordering mode.
+    """
+    sheet = await _get_sheet(db, sheet_id)
+    lexical = sheet.row_ordering == "lexical"
+    _check_position(lexical, payload.row_order, payload.order_key)
+    validator = row_validator.for_sheet(sheet)
+    data = validator.formulas.apply(validator.validate(payload.data))
+    seq = await next_change_seq(db, sheet_id)
+    if lexical:
+        key = payload.order_key or order_keys.key_between(
+            await get_last_order_key(db, sheet_id), None
+        )
+        row = Row(sheet_id=sheet_id, data=data, row_order=0.0, order_key=key)
+    elif payload.row_order is not None:
+        await raise_order_counter(db, sheet_id, payload.row_order)
+        row = Row(sheet_id=sheet_id, data=data, row_order=payload.row_order)
+    else:
+        order = await reserve_orders(db, sheet_id)
+        row = Row(sheet_id=sheet_id, data=data, row_order=order)
+    row.change_seq = seq
     db.add(row)
     await db.flush()
     await db.refresh(row)
@@ -53,25 +520,101 @@ async def create(db: AsyncSession, sheet_id: uuid.UUID, payload: RowCreate) -> R
 
 
 async def bulk_create(
-    db: AsyncSession, sheet_id: uuid.UUID, rows: list[RowCreate]
-) -> list[Row]:
-    """Create many rows at once (CSV import)."""
-    base_order = await get_next_order(db, sheet_id)
-    new_rows = []
-    for i, row_data in enumerate(rows):
-        row = Row(
-            sheet_id=sheet_id,
-            data=row_data.data,
-            row_order=row_data.row_order
-            if row_data.row_order is not None
-            else base_order + i,
-        )
-        db.add(row)
-        new_rows.append(row)
-    await db.flush()
-    for row in new_rows:
-        await db.refresh(row)
-    return new_rows
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    rows: list[RowCreate],
+    validate: bool = True,
+) -> list[dict]:
+    """Create many rows at once (CSV import).
+
+    Returns plain dicts shaped like RowResponse, built straight from the
+    RETURNING tuples — no ORM objects, no per-row refresh. Raises
+    ValueError if the sheet doesn't exist, a cell doesn't fit its column
+    (nothing is inserted) or a position doesn't fit the sheet's ordering
+    mode. Pass validate=False for data already run through row_validator,
+    formula cells included (formulas.apply_batch).
+    """
+    if not rows:
+        return []
+    sheet = await _get_sheet(db, sheet_id)
+    lexical = sheet.row_ordering == "lexical"
+    for row_data in rows:
+        _check_position(lexical, row_data.row_order, row_data.order_key)
+    data = [row_data.data for row_data in rows]
+    if validate:
+        data = row_validator.for_sheet(sheet).formulas.apply_batch(
+            _validate_batch(sheet, data)
+        )
+    seq = await next_change_seq(db, sheet_id)
+    if lexical:
+        last_key = await get_last_order_key(db, sheet_id)
+        appended = iter(order_keys.keys_after(last_key, len(rows)))
+    else:
+        base_order = await reserve_orders(db, sheet_id, len(rows))
+        explicit = [r.row_order for r in rows if r.row_order is not None]
+        if explicit:
+            await raise_order_counter(db, sheet_id, max(explicit))
+    created: list[dict] = []
+    for start in range(0, len(rows), BULK_INSERT_BATCH):
+        values = []
+        for i, row_data in enumerate(rows[start : start + BULK_INSERT_BATCH]):
+            value = {
+                "id": uuid.uuid4(),
+                "sheet_id": sheet_id,
+                "data": data[start + i],
+                "change_seq": seq,
+            }
+            if lexical:
+                value["row_order"] = 0.0
+                value["order_key"] = row_data.order_key or next(appended)
+            elif row_data.row_order is not None:
+                value["row_order"] = row_data.row_order
+            else:
+                value["row_order"] = base_order + start + i
+            values.append(value)
+        result = await db.execute(
+            insert(Row).values(values).returning(*_RETURNING_COLUMNS)
+        )
+        created.extend(dict(m) for m in result.mappings())
+    return created
+
+
+async def bulk_update(
+    db: AsyncSession, sheet_id: uuid.UUID, patches: list[RowPatch]
+) -> list[dict]:
+    """Merge many partial cell updates into rows of one sheet in one UPDATE.
+
+    Patches for the same row id are folded together first (later wins),
+    since UPDATE ... FROM applies only one source row per target row.
+    Ids that don't belong to the sheet are skipped. Formulas reading a
+    patched cell are recomputed. Returns the updated rows as
+    RowResponse-shaped dicts. Raises ValueError if the sheet
+    doesn't exist or a cell doesn't fit its column (nothing is updated).
+    """
+    merged: dict[uuid.UUID, dict] = {}
+    for patch in patches:
+        merged.setdefault(patch.id, {}).update(patch.data)
+    sheet = await _get_sheet(db, sheet_id)
+    ids = list(merged)
+    merged = dict(zip(ids, _validate_batch(sheet, list(merged.values()), ids)))
+    seq = await next_change_seq(db, sheet_id)
+    merged = await _with_formulas(db, row_validator.for_sheet(sheet).formulas, merged)
+
+    patch_table = values(
+        column("id", UUID(as_uuid=True)), column("patch", JSONB), name="patch"
+    ).data(list(merged.items()))
+    result = await db.execute(
+        sa_update(Row)
+        .where(Row.id == patch_table.c.id, Row.sheet_id == sheet_id)
+        .values(
+            data=Row.data.op("||")(patch_table.c.patch),
+            version=Row.version + 1,
+            change_seq=seq,
+        )
+        .returning(*_RETURNING_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    return [dict(m) for m in result.mappings()]
 
 
 async def list_by_sheet(db: AsyncSession, sheet_id: uuid.UUID) -> list[Row]:
@@ -82,38 +625,742 @@ async def list_by_sheet(db: AsyncSession, sheet_id: uuid.UUID) -> list[Row]:
     return list(result.scalars().all())
 
 
+def _pack_cursor(position: list) -> str:
+    raw = json.dumps(position, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _unpack_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(position, list) or len(position) != size:
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def _position(order_key, row_order, row_id) -> tuple[str, float, uuid.UUID]:
+    # Cursors come back from clients: anything encode_cursor() wouldn't
+    # have written must fail here as a 400, not in uuid.UUID() or Postgres
+    # (which rejects NUL in text).
+    if not isinstance(order_key, str) or not isinstance(row_id, str):
+        raise ValueError("Invalid cursor")
+    if "\x00" in order_key:
+        raise ValueError("Invalid cursor")
+    try:
+        return order_key, float(row_order), uuid.UUID(row_id)
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_cursor(row: Row) -> str:
+    """Pack a row's keyset position into an opaque, URL-safe token."""
+    return _pack_cursor([row.order_key, row.row_order, str(row.id)])
+
+
+def decode_cursor(cursor: str) -> tuple[str, float, uuid.UUID]:
+    """Inverse of encode_cursor(). Raises ValueError on a malformed token."""
+    return _position(*_unpack_cursor(cursor, 3))
+
+
+def encode_sorted_cursor(sort_value, row: Row) -> str:
+    """Like encode_cursor(), prefixed with the row's sort value (may be None)."""
+    return _pack_cursor([sort_value, row.order_key, row.row_order, str(row.id)])
+
+
+def decode_sorted_cursor(cursor: str) -> tuple:
+    """Inverse of encode_sorted_cursor() → (raw sort_value, *position)."""
+    sort_value, *position = _unpack_cursor(cursor, 4)
+    return (sort_value, *_position(*position))
+
+
+async def list_page(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    limit: int,
+    after: str | None = None,
+    where: Sequence[ColumnElement] = (),
+    sort: RowSort | None = None,
+) -> tuple[list[SqlRow], str | None]:
+    """Get one page of rows in sheet order (POSITION), or by `sort` first.
+
+    `where` takes extra predicates, e.g. from row_query.compile_filters().
+    Returns (rows, next_cursor): rows are _RETURNING_COLUMNS tuples (with
+    attribute access), next_cursor is None on the last page.
+    We fetch limit + 1 rows so we know whether another page exists
+    without a separate COUNT(*).
+    """
+    if sort is not None:
+        return await _list_sorted_page(db, sheet_id, limit, after, where, sort)
+
+    stmt = select(*_RETURNING_COLUMNS).where(Row.sheet_id == sheet_id, *where)
+    if after is not None:
+        stmt = stmt.where(tuple_(*POSITION) > decode_cursor(after))
+    stmt = stmt.order_by(*POSITION).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    rows = list(result.all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+async def _list_sorted_page(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    limit: int,
+    after: str | None,
+    where: Sequence[ColumnElement],
+    sort: RowSort,
+) -> tuple[list[SqlRow], str | None]:
+    """Keyset page ordered by (sort value, *POSITION), NULL values last.
+
+    `desc` reverses the whole key (ties too) so every page is a single
+    row-comparison range that an index on (typed_value, *POSITION) can
+    seek into, scanned forwards or backwards. Rows are read as two
+    segments: first those with a sort value, then those without one.
+    The second query only runs once the first runs out. An OR-ed
+    "or value IS NULL" keyset predicate would defeat the seek on every page.
+    """
+    after_value = after_position = None
+    if after is not None:
+        raw_value, *after_position = decode_sorted_cursor(after)
+        try:
+            after_value = sort.restore(raw_value)
+        except (TypeError, ValueError, ArithmeticError) as exc:
+            raise ValueError("Invalid cursor") from exc
+    base = select(*_RETURNING_COLUMNS, sort.expr).where(
+        Row.sheet_id == sheet_id, *where
+    )
+
+    def segment(stmt, keys: tuple, bound: tuple | None, limit: int):
+        if bound is not None:
+            position = tuple_(*keys)
+            stmt = stmt.where(position < bound if sort.descending else position > bound)
+        order = [key.desc() if sort.descending else key.asc() for key in keys]
+        return stmt.order_by(*order).limit(limit)
+
+    fetched: list = []
+    if after is None or after_value is not None:
+        stmt = segment(
+            base.where(sort.expr.is_not(None)),
+            (sort.expr, *POSITION),
+            None if after is None else (after_value, *after_position),
+            limit + 1,
+        )
+        fetched.extend((await db.execute(stmt)).all())
+    if len(fetched) <= limit:
+        stmt = segment(
+            base.where(sort.expr.is_(None)),
+            POSITION,
+            tuple(after_position) if after is not None and after_value is None else None,
+            limit + 1 - len(fetched),
+        )
+        fetched.extend((await db.execute(stmt)).all())
+
+    # The sort value is the last column; row_payload() reads the others.
+    if len(fetched) <= limit:
+        return fetched, None
+    last = fetched[limit - 1]
+    return fetched[:limit], encode_sorted_cursor(last[-1], last)
+
+
+async def stream_by_sheet(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    batch_size: int = 1000,
+    where: Sequence[ColumnElement] = (),
+    sort: RowSort | None = None,
+) -> AsyncIterator[SqlRow]:
+    """Yield every (matching) row in a sheet, in list_page() order.
+
+    Rows are _RETURNING_COLUMNS tuples, like list_page()'s.
+    """
+    order: list = list(POSITION)
+    if sort is not None:
+        keys = (sort.expr, *POSITION)
+        order = [key.desc() if sort.descending else key.asc() for key in keys]
+        order[0] = order[0].nulls_last()
+    result = await db.stream(
+        select(*_RETURNING_COLUMNS)
+        .where(Row.sheet_id == sheet_id, *where)
+        .order_by(*order)
+        .execution_options(yield_per=batch_size)
+    )
+    async for row in result:
+        yield row
+
+
 async def get_by_id(db: AsyncSession, row_id: uuid.UUID) -> Row | None:
     return await db.get(Row, row_id)
 
 
 async def update(db: AsyncSession, row_id: uuid.UUID, payload: RowUpdate) -> Row | None:
-    """Update row data and/or order. Returns old data for rule comparison."""
-    row = await db.get(Row, row_id)
-    if not row:
+    """Update row data and/or order in one UPDATE ... RETURNING (see SINGLE-ROW UPDATE).
+
+    Raises ValueError if a cell doesn't fit its column or the position
+    doesn't fit the sheet's ordering mode, and RowVersionConflict if
+    expected_version is stale.
+    """
+    for _ in range(UPDATE_ATTEMPTS):
+        outcome = await _try_update(db, row_id, payload)
+        if outcome is not _RETRY:
+            return outcome
+    # Other writers kept getting in between; report it like a stale version.
+    current = await db.scalar(select(Row.version).where(Row.id == row_id))
+    if current is None:
         return None
-    update_data = payload.model_dump(exclude_unset=True)
-    if "data" in update_data and update_data["data"] is not None:
-        # Merge new data into existing (partial cell updates)
-        merged = {**row.data, **update_data["data"]}
-        row.data = merged
-    if "row_order" in update_data and update_data["row_order"] is not None:
-        row.row_order = update_data["row_order"]
-    await db.flush()
-    await db.refresh(row)
-    
+    raise RowVersionConflict(current)
+
+
+async def _try_update(db: AsyncSession, row_id: uuid.UUID, payload: RowUpdate):
+    """One attempt of update(): the row, None, or _RETRY."""
+    update_data = payload.model_dump(exclude_unset=True, exclude_none=True)
+    # One indexed join for the sheet's mode and schema version; the compiled
+    # validator for that version is usually cached already. No lock here —
+    # the UPDATE below re-checks what it relies on.
+    found = (
+        await db.execute(
+            select(Row.sheet_id, Row.version, Sheet.schema_version, Sheet.row_ordering)
+            .join(Sheet, Sheet.id == Row.sheet_id)
+            .where(Row.id == row_id)
+        )
+    ).one_or_none()
+    if found is None:
+        return None
+    sheet_id, seen_version, schema_version, row_ordering = found
+    _check_position(row_ordering == "lexical", payload.row_order, payload.order_key)
+    matches = [Row.id == row_id]
+    if payload.expected_version is not None:
+        matches.append(Row.version == payload.expected_version)
+    if "data" in update_data:
+        validator = await row_validator.load(db, sheet_id, schema_version)
+        update_data["data"] = validator.validate(update_data["data"])
+        if validator.formulas.affected(update_data["data"]):
+            # The patch feeds a formula (see FORMULAS above): read the
+            # row's other inputs and add the results. They were read at
+            # seen_version, so the UPDATE only applies at that version.
+            patches = await _with_formulas(
+                db, validator.formulas, {row_id: update_data["data"]}
+            )
+            update_data["data"] = patches[row_id]
+            matches.append(Row.version == seen_version)
+
+    # Advance the sheet's change sequence in the same statement, only if
+    # the row matches and the schema the patch was validated against is
+    # still current. The row UPDATE only runs if the CTE did (see
+    # SINGLE-ROW UPDATE for why the sheet is locked before the row).
+    seq = (
+        sa_update(Sheet)
+        .where(
+            Sheet.id == sheet_id,
+            Sheet.schema_version == schema_version,
+            select(Row.id).where(*matches).exists(),
+        )
+        .values(change_seq=Sheet.change_seq + 1)
+        .returning(Sheet.change_seq)
+        .cte("seq")
+    )
+    bumped = select(seq.c.change_seq).exists()
+    stmt = sa_update(Row).where(*matches, bumped).add_cte(seq)
+    change_seq = select(seq.c.change_seq).scalar_subquery()
+    values: dict = {
+        "updated_at": sa_func.now(),
+        "version": Row.version + 1,
+        "change_seq": change_seq,
+    }
+    if "data" in update_data:
+        # Merge new cells into existing ones inside Postgres (partial update)
+        values["data"] = Row.data.op("||")(literal(update_data["data"], JSONB))
+    for field in ("row_order", "order_key"):
+        if field in update_data:
+            values[field] = update_data[field]
+    result = await db.execute(
+        stmt.values(**values)
+        .returning(Row)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    row = result.scalar_one_or_none()
+    if not row:
+        current = await db.scalar(select(Row.version).where(Row.id == row_id))
+        if current is None:
+            return None
+        if (
+            payload.expected_version is not None
+            and current != payload.expected_version
+        ):
+            raise RowVersionConflict(current)
+        # The schema changed, or another write moved the row past the
+        # version its formula inputs were read at: start over.
+        return _RETRY
+    if "row_order" in update_data:
+        await raise_order_counter(db, row.sheet_id, row.row_order)
+
     # Phase 3: Evaluate Agent Rules and trigger Celery tasks
-    if "data" in update_data and update_data["data"] is not None:
+    if "data" in update_data:
         matched_rules = await evaluate_rules_for_row(db, row.sheet_id, row.data)
         for rule in matched_rules:
             execute_agent_rule.delay(str(row.id), str(rule.id))
-            
+
     return row
 
 
-async def delete(db: AsyncSession, row_id: uuid.UUID) -> bool:
+async def _neighbour(
+    db: AsyncSession, anchor: Row, following: bool, exclude_id: uuid.UUID | None
+) -> Row | None:
+    """The row right after (or before) `anchor` — one index seek."""
+    position = tuple_(*POSITION)
+    anchor_position = (anchor.order_key, anchor.row_order, anchor.id)
+    stmt = select(Row).where(Row.sheet_id == anchor.sheet_id)
+    if exclude_id is not None:
+        stmt = stmt.where(Row.id != exclude_id)
+    if following:
+        stmt = stmt.where(position > anchor_position).order_by(*POSITION)
+    else:
+        order = [key.desc() for key in POSITION]
+        stmt = stmt.where(position < anchor_position).order_by(*order)
+    result = await db.execute(stmt.limit(1))
+    return result.scalar_one_or_none()
+
+
+async def _anchor(db: AsyncSession, sheet_id: uuid.UUID, row_id: uuid.UUID) -> Row:
+    row = await db.get(Row, row_id)
+    if row is None or row.sheet_id != sheet_id:
+        raise ValueError(f"Row {row_id} is not in this sheet")
+    return row
+
+
+async def position_between(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    placement: RowPlacement,
+    moving_id: uuid.UUID | None = None,
+) -> dict:
+    """Column values that place a row between the given neighbours.
+
+    Only the missing neighbour is looked up (skipping the row being moved).
+    Returns {"row_order": ..., "order_key": ...} for the sheet's mode.
+    Raises ValueError for bad anchors.
+    """
+    if placement.before_id is None and placement.after_id is None:
+        raise ValueError("Provide before_id and/or after_id")
+    if moving_id is not None and moving_id in (placement.before_id, placement.after_id):
+        raise ValueError("A row can't be placed next to itself")
+    lower = upper = None
+    if placement.after_id is not None:
+        lower = await _anchor(db, sheet_id, placement.after_id)
+    if placement.before_id is not None:
+        upper = await _anchor(db, sheet_id, placement.before_id)
+    if lower is None:
+        lower = await _neighbour(db, upper, following=False, exclude_id=moving_id)
+    elif upper is None:
+        upper = await _neighbour(db, lower, following=True, exclude_id=moving_id)
+    elif (lower.order_key, lower.row_order, lower.id) >= (
+        upper.order_key,
+        upper.row_order,
+        upper.id,
+    ):
+        raise ValueError("after_id must come before before_id")
+
+    if await _is_lexical(db, sheet_id):
+        key = order_keys.key_between(
+            lower.order_key if lower else None, upper.order_key if upper else None
+        )
+        return {"row_order": 0.0, "order_key": key}
+    if lower is None:
+        return {"row_order": upper.row_order - 1.0, "order_key": ""}
+    if upper is None:
+        return {"row_order": await reserve_orders(db, sheet_id), "order_key": ""}
+    return {"row_order": (lower.row_order + upper.row_order) / 2, "order_key": ""}
+
+
+async def move(
+    db: AsyncSession, row_id: uuid.UUID, placement: RowPlacement
+) -> Row | None:
+    """Move a row next to the given neighbour(s). None if the row doesn't exist."""
     row = await db.get(Row, row_id)
     if not row:
-        return False
-    await db.delete(row)
+        return None
+    seq = await next_change_seq(db, row.sheet_id)
+    position = await position_between(db, row.sheet_id, placement, moving_id=row.id)
+    row.row_order = position["row_order"]
+    row.order_key = position["order_key"]
+    row.version = Row.version + 1
+    row.change_seq = seq
     await db.flush()
-    return True
+    await db.refresh(row)
+    return row
+
+
+async def create_between(
+    db: AsyncSession, sheet_id: uuid.UUID, payload: RowInsert
+) -> Row:
+    """Create a row between the given neighbour(s)."""
+    validator = row_validator.for_sheet(await _get_sheet(db, sheet_id))
+    data = validator.formulas.apply(validator.validate(payload.data))
+    seq = await next_change_seq(db, sheet_id)
+    position = await position_between(db, sheet_id, payload)
+    row = Row(sheet_id=sheet_id, data=data, change_seq=seq, **position)
+    db.add(row)
+    await db.flush()
+    await db.refresh(row)
+    return row
+
+
+async def _delete_with_tombstones(
+    db: AsyncSession, sheet_id: uuid.UUID, seq: int, where: Sequence[ColumnElement]
+) -> list[uuid.UUID]:
+    """DELETE matching rows and write their tombstones in one statement."""
+    gone = (
+        sa_delete(Row)
+        .where(Row.sheet_id == sheet_id, *where)
+        .returning(Row.id)
+        .cte("gone")
+    )
+    result = await db.execute(
+        insert(RowTombstone)
+        .from_select(
+            ["row_id", "sheet_id", "change_seq"],
+            select(gone.c.id, literal(sheet_id, UUID(as_uuid=True)), literal(seq)),
+        )
+        .add_cte(gone)
+        .returning(RowTombstone.row_id)
+    )
+    return list(result.scalars().all())
+
+
+async def delete(db: AsyncSession, row_id: uuid.UUID) -> tuple[uuid.UUID, int] | None:
+    """Delete one row. Returns (sheet_id, change_seq), or None if it didn't exist."""
+    sheet_id = await db.scalar(select(Row.sheet_id).where(Row.id == row_id))
+    if sheet_id is None:
+        return None
+    seq = await next_change_seq(db, sheet_id)
+    if not await _delete_with_tombstones(db, sheet_id, seq, [Row.id == row_id]):
+        return None
+    return sheet_id, seq
+
+
+async def bulk_delete(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    ids: Sequence[uuid.UUID] = (),
+    where: Sequence[ColumnElement] = (),
+) -> tuple[list[uuid.UUID], int]:
+    """Delete rows of a sheet by id and/or filter.
+
+    With both, only listed rows that also match the filters are deleted.
+    Returns (deleted ids, change_seq). Raises ValueError if neither is
+    given or the sheet doesn't exist.
+    """
+    if not ids and not where:
+        raise ValueError("Provide ids and/or filter")
+    seq = await next_change_seq(db, sheet_id)
+    deleted: list[uuid.UUID] = []
+    if ids:
+        for start in range(0, len(ids), BULK_DELETE_BATCH):
+            chunk = literal(
+                list(ids[start : start + BULK_DELETE_BATCH]), ARRAY(UUID(as_uuid=True))
+            )
+            deleted.extend(
+                await _delete_with_tombstones(
+                    db, sheet_id, seq, [Row.id == any_(chunk), *where]
+                )
+            )
+        return deleted, seq
+
+    matching = (
+        select(Row.id)
+        .where(Row.sheet_id == sheet_id, *where)
+        .limit(BULK_DELETE_BATCH)
+    )
+    while True:
+        chunk = await _delete_with_tombstones(
+            db, sheet_id, seq, [Row.id.in_(matching)]
+        )
+        deleted.extend(chunk)
+        if len(chunk) < BULK_DELETE_BATCH:
+            return deleted, seq
+
+
+async def order_gap_too_small(db: AsyncSession, row: Row) -> bool:
+    """Whether a float-positioned row sits too close to a neighbour.
+
+    Two index probes, one each side of the row. Call it after placing a
+    row at an explicit row_order; appends always leave a gap of 1.
+    """
+    if row.order_key:
+        return False
+    same_sheet = (Row.sheet_id == row.sheet_id, Row.order_key == "", Row.id != row.id)
+    below = select(sa_func.max(Row.row_order)).where(
+        *same_sheet, Row.row_order <= row.row_order
+    )
+    above = select(sa_func.min(Row.row_order)).where(
+        *same_sheet, Row.row_order >= row.row_order
+    )
+    result = await db.execute(select(below.scalar_subquery(), above.scalar_subquery()))
+    threshold = max(1.0, abs(row.row_order)) * REBALANCE_MIN_RELATIVE_GAP
+    return any(
+        neighbour is not None and abs(row.row_order - neighbour) <= threshold
+        for neighbour in result.one()
+    )
+
+
+async def smallest_order_gap(db: AsyncSession, sheet_id: uuid.UUID) -> float | None:
+    """Smallest gap between neighbouring row_orders, relative to their size.
+
+    Compare with REBALANCE_MIN_RELATIVE_GAP. None for lexical or tiny sheets.
+    """
+    previous = sa_func.lag(Row.row_order).over(order_by=POSITION)
+    gaps = (
+        select(
+            ((Row.row_order - previous) / sa_func.greatest(1.0, sa_func.abs(Row.row_order)))
+            .label("gap")
+        )
+        .where(Row.sheet_id == sheet_id, Row.order_key == "")
+        .subquery()
+    )
+    result = await db.execute(select(sa_func.min(gaps.c.gap)))
+    return result.scalar_one()
+
+
+async def rebalance_orders(
+    db: AsyncSession, sheet_id: uuid.UUID, chunk_size: int = REBALANCE_CHUNK
+) -> int:
+    """Renumber a float-ordered sheet to whole numbers above every row.
+
+    Commits after every chunk (see REBALANCING above); returns the number
+    of row updates made (a row moved twice after a restart counts twice).
+    """
+    moved = 0
+    while True:
+        result = await db.execute(
+            select(sa_func.count()).where(Row.sheet_id == sheet_id, Row.order_key == "")
+        )
+        total = result.scalar_one()
+        if not total:
+            return moved
+        base = await reserve_orders(db, sheet_id, total)
+        await db.commit()
+        # Every float row below `lowest` is still to be moved.
+        lowest = base + total
+        while True:
+            # Sheet lock first: placements compute their midpoints under the
+            # same lock, so they only ever see the state between two chunks.
+            seq = await next_change_seq(db, sheet_id)
+            waiting = (
+                Row.sheet_id == sheet_id,
+                Row.order_key == "",
+                Row.row_order < lowest,
+            )
+            last_first = (Row.row_order.desc(), Row.id.desc())
+            below = await db.scalar(
+                select(Row.row_order)
+                .where(*waiting)
+                .order_by(*last_first)
+                .offset(chunk_size)
+                .limit(1)
+            )
+            if below is not None and lowest - chunk_size <= below:
+                # Rows placed meanwhile used up the range: start over above them.
+                await db.commit()
+                break
+            chunk = (
+                select(Row.id, Row.row_order)
+                .where(*waiting)
+                .order_by(*last_first)
+                .limit(chunk_size)
+                .subquery()
+            )
+            ranked = select(
+                chunk.c.id,
+                sa_func.row_number()
+                .over(order_by=(chunk.c.row_order.desc(), chunk.c.id.desc()))
+                .label("rank"),
+            ).subquery()
+            # The rank-th row of the chunk goes to lowest - rank.
+            result = await db.execute(
+                sa_update(Row)
+                .where(Row.id == ranked.c.id)
+                .values(
+                    row_order=lowest - ranked.c.rank,
+                    version=Row.version + 1,
+                    change_seq=seq,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if not result.rowcount:
+                return moved
+            moved += result.rowcount
+            lowest -= result.rowcount
+
+
+def _rewritten_data(renames: dict[str, str], removed: list[str]) -> ColumnElement:
+    """Row.data with every rename applied and the old keys removed."""
+    data = Row.data
+    for old, new in renames.items():
+        # A value already written under the new key wins.
+        data = case(
+            (
+                and_(Row.data.has_key(old), not_(Row.data.has_key(new))),
+                sa_func.jsonb_set(data, literal([new], ARRAY(TEXT)), Row.data[old]),
+            ),
+            else_=data,
+        )
+    return data.op("-")(literal(removed, ARRAY(TEXT)))
+
+
+async def count_rows(db: AsyncSession, sheet_id: uuid.UUID) -> int:
+    return await db.scalar(
+        select(sa_func.count()).select_from(Row).where(Row.sheet_id == sheet_id)
+    )
+
+
+async def count_rows_with_keys(
+    db: AsyncSession, sheet_id: uuid.UUID, keys: list[str]
+) -> int:
+    """How many of the sheet's rows hold at least one of `keys`."""
+    return await db.scalar(
+        select(sa_func.count()).where(
+            Row.sheet_id == sheet_id, Row.data.has_any(literal(keys, ARRAY(TEXT)))
+        )
+    )
+
+
+async def rewrite_keys(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    renames: dict[str, str],
+    drops: list[str],
+    chunk_size: int = REWRITE_CHUNK,
+    pause: float = REWRITE_PAUSE_SECONDS,
+    on_chunk: Callable[[int], Awaitable[None]] | None = None,
+) -> int:
+    """Rename and drop keys in every row's data (see KEY REWRITE above).
+
+    Commits after every chunk and awaits `on_chunk` with the running count
+    of rewritten rows. Returns that count.
+    """
+    removed = sorted(set(renames) | set(drops))
+    if not removed:
+        return 0
+    old_keys = literal(removed, ARRAY(TEXT))
+    new_data = _rewritten_data(renames, removed)
+    after = (-1, uuid.UUID(int=0))
+    rewritten = 0
+    while True:
+        result = await db.execute(
+            select(Row.id, Row.change_seq, Row.data.has_any(old_keys))
+            .where(
+                Row.sheet_id == sheet_id,
+                tuple_(Row.change_seq, Row.id) > tuple_(*after),
+            )
+            .order_by(Row.change_seq, Row.id)
+            .limit(chunk_size)
+        )
+        chunk = result.all()
+        if not chunk:
+            await db.commit()
+            break
+        after = (chunk[-1].change_seq, chunk[-1].id)
+        stale = [row_id for row_id, _, has_old_keys in chunk if has_old_keys]
+        if stale:
+            seq = await next_change_seq(db, sheet_id)
+            result = await db.execute(
+                sa_update(Row)
+                .where(
+                    Row.id == any_(literal(stale, ARRAY(UUID(as_uuid=True)))),
+                    Row.data.has_any(old_keys),
+                )
+                .values(data=new_data, version=Row.version + 1, change_seq=seq)
+                .execution_options(synchronize_session=False)
+            )
+            rewritten += result.rowcount
+        await db.commit()
+        if stale:
+            if on_chunk is not None:
+                await on_chunk(rewritten)
+            await asyncio.sleep(pause)
+    return rewritten
+
+
+async def recalculate_formulas(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    keys: list[str],
+    chunk_size: int = REWRITE_CHUNK,
+    pause: float = REWRITE_PAUSE_SECONDS,
+    on_chunk: Callable[[int], Awaitable[None]] | None = None,
+) -> int:
+    """Recompute formula columns `keys` (and what reads them) in every row.
+
+    Walks the rows written up to now by (change_seq, id). Rows written
+    later already have the current formulas, and rows this rewrites get
+    a new change_seq, so neither is read twice. Each chunk is read and
+    written with the sheet locked and then committed (see FORMULAS above).
+    Awaits `on_chunk` with the running count of rows checked. Returns how
+    many rows got new values.
+    """
+    sheet = await _get_sheet(db, sheet_id)
+    formulas = row_validator.for_sheet(sheet).formulas
+    affected = formulas.affected(keys)
+    if not affected:
+        return 0
+    outputs = [formula.key for formula in affected]
+    needed = sorted(formulas.inputs(affected) | set(outputs))
+    until = await current_change_seq(db, sheet_id)
+    after = (-1, uuid.UUID(int=0))
+    checked = updated = 0
+    while True:
+        await db.execute(select(Sheet.id).where(Sheet.id == sheet_id).with_for_update())
+        result = await db.execute(
+            select(Row.id, Row.change_seq, *(Row.data[key] for key in needed))
+            .where(
+                Row.sheet_id == sheet_id,
+                Row.change_seq <= until,
+                tuple_(Row.change_seq, Row.id) > tuple_(*after),
+            )
+            .order_by(Row.change_seq, Row.id)
+            .limit(chunk_size)
+        )
+        chunk = result.all()
+        if not chunk:
+            await db.commit()
+            break
+        after = (chunk[-1].change_seq, chunk[-1].id)
+        stored = [dict(zip(needed, cells)) for _, _, *cells in chunk]
+        patches = [
+            (row.id, cells)
+            for row, data, cells in zip(
+                chunk, stored, formulas.compute_batch(stored, affected)
+            )
+            if any(
+                data[key] != cells[key] or type(data[key]) is not type(cells[key])
+                for key in outputs
+            )
+        ]
+        if patches:
+            seq = await next_change_seq(db, sheet_id)
+            patch_table = values(
+                column("id", UUID(as_uuid=True)), column("patch", JSONB), name="patch"
+            ).data(patches)
+            await db.execute(
+                sa_update(Row)
+                .where(Row.id == patch_table.c.id, Row.sheet_id == sheet_id)
+                .values(
+                    data=Row.data.op("||")(patch_table.c.patch),
+                    version=Row.version + 1,
+                    change_seq=seq,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            updated += len(patches)
+        await db.commit()
+        checked += len(chunk)
+        if on_chunk is not None:
+            await on_chunk(checked)
+        await asyncio.sleep(pause)
+    return updated
@@ -0,0 +1,311 @@
+"""
+Row Validator — Check and coerce row data against a sheet's column_schema.
+
+RULES (per column type):
+  string   → any single value; numbers and booleans are stored as text
+  number   → a JSON number, or text that looks like one ("85", " -1.5 "),
+             stored as a number (int when it has no decimal point)
+  boolean  → true/false, or the text "true"/"false" in any case → bool
+  dropdown → one of the column's `options` (surrounding spaces ignored)
+  Empty cells (null, or text that is only whitespace) are kept as they
+  are for every type, and objects/lists are rejected everywhere. Keys
+  that aren't in the schema pass through unchanged, so a CSV with extra
+  headers still imports. The text forms accepted are the ones
+  row_query.typed_value() reads, so every accepted cell filters and
+  sorts as its column type.
+  Formula cells are computed, never taken from input: values sent for a
+  formula column are dropped, and callers fill them in with
+  `formulas` (services/formula_engine.py), compiled alongside.
+
+COMPILED ONCE, CACHED PER SCHEMA VERSION:
+  compile_validator() turns column_schema into one _Column per typed
+  column (option sets built, patterns precompiled) once. Validators are
+  cached per (sheet_id, schema_version): Sheet.schema_version is bumped
+  every time the columns change, so a cached validator is never stale and
+  nothing has to invalidate it. A cell edit whose sheet version is cached
+  validates without loading column_schema at all.
+
+BATCHES: one column at a time
+  validate_batch() pivots a batch into one list per column and coerces
+  each list in one call — no per-cell Pydantic model. A long column of
+  text (every CSV import batch) goes through pyarrow compute kernels: the
+  trim, pattern match, option lookup and number casts each run once over
+  the whole column in native code. Short or mixed-type columns (JSON from
+  the API) take a plain Python loop with the same rules.
+  Alternative: a Pydantic model generated per sheet — one model
+    instance per row, and its error handling is per field, not per column.
+"""
+
+import math
+import re
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sheet import Sheet
+from app.services import formula_engine
+
+# Same shapes as row_query._NUMERIC_PATTERN, applied to trimmed text.
+_INTEGER = r"^-?[0-9]+$"
+_NUMBER = r"^-?([0-9]+[.]?[0-9]*|[.][0-9]+)$"
+_INTEGER_RE = re.compile(_INTEGER)
+_NUMBER_RE = re.compile(_NUMBER)
+
+# Columns shorter than this are coerced in Python (pyarrow has a fixed cost).
+ARROW_MIN_VALUES = 256
+
+# Compiled validators kept per API process (least recently used evicted first).
+CACHE_SIZE = 1024
+
+# How many rejected rows describe_errors() spells out.
+MAX_DESCRIBED_ERRORS = 5
+
+_cache: OrderedDict[tuple[uuid.UUID, int], "RowValidator"] = OrderedDict()
+
+
+class _Invalid(ValueError):
+    """A single cell that doesn't fit its column."""
+
+
+@dataclass(frozen=True)
+class _Column:
+    key: str
+    col_type: str
+    options: frozenset[str] = frozenset()
+    option_list: tuple[str, ...] = ()
+
+    def _reject(self, value) -> _Invalid:
+        if self.col_type == "number":
+            reason = "is not a number"
+        elif self.col_type == "boolean":
+            reason = "is not true or false"
+        elif self.col_type == "dropdown":
+            reason = f"is not one of {list(self.option_list)}"
+        else:
+            reason = "is not a single value"
+        return _Invalid(f"'{self.key}': {value!r} {reason}")
+
+    def coerce(self, value):
+        """The value to store for one cell. Raises _Invalid."""
+        if value is None:
+            return None
+        if isinstance(value, (dict, list)):
+            raise self._reject(value)
+        if isinstance(value, str):
+            text = value.strip()
+            if not text:
+                return value
+        if self.col_type == "string":
+            if isinstance(value, bool):
+                return "true" if value else "false"
+            return value if isinstance(value, str) else str(value)
+        if self.col_type == "number":
+            if isinstance(value, bool):
+                raise self._reject(value)
+            if isinstance(value, (int, float)):
+                if isinstance(value, float) and not math.isfinite(value):
+                    raise self._reject(value)
+                return value
+            if _INTEGER_RE.match(text):
+                return int(text)
+            if _NUMBER_RE.match(text):
+                return float(text)
+            raise self._reject(value)
+        if self.col_type == "boolean":
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and text.lower() in ("true", "false"):
+                return text.lower() == "true"
+            raise self._reject(value)
+        # dropdown
+        if isinstance(value, str) and text in self.options:
+            return text
+        raise self._reject(value)
+
+    def coerce_column(self, values: list) -> tuple[list, dict[int, str]]:
+        """Coerce a whole column; returns (values, {position: error})."""
+        if len(values) >= ARROW_MIN_VALUES and all(
+            value is None or isinstance(value, str) for value in values
+        ):
+            try:
+                return self._coerce_text_column(values)
+            except OverflowError:
+                pass  # an integer beyond int64 — Python ints have no limit
+        coerced, errors = [], {}
+        for i, value in enumerate(values):
+            try:
+                coerced.append(self.coerce(value))
+            except _Invalid as exc:
+                coerced.append(value)
+                errors[i] = str(exc)
+        return coerced, errors
+
+    def _coerce_text_column(self, values: list) -> tuple[list, dict[int, str]]:
+        """coerce_column() for text, with pyarrow kernels over the column."""
+        if self.col_type == "string":
+            return values, {}
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        column = pa.array(values, type=pa.string())
+        trimmed = pc.utf8_trim_whitespace(column)
+        empty = pc.fill_null(pc.equal(trimmed, ""), True)
+
+        if self.col_type == "number":
+            is_integer = pc.fill_null(
+                pc.match_substring_regex(trimmed, _INTEGER), False
+            )
+            is_number = pc.fill_null(pc.match_substring_regex(trimmed, _NUMBER), False)
+            try:
+                integers = pc.cast(pc.if_else(is_integer, trimmed, None), pa.int64())
+            except pa.ArrowInvalid as exc:
+                raise OverflowError(str(exc))
+            decimals = pc.cast(
+                pc.if_else(pc.and_not(is_number, is_integer), trimmed, None),
+                pa.float64(),
+            )
+            valid = pc.or_(is_number, empty)
+            coerced = [
+                integer
+                if integer is not None
+                else decimal
+                if decimal is not None
+                else raw
+                for integer, decimal, raw in zip(
+                    integers.to_pylist(), decimals.to_pylist(), values
+                )
+            ]
+        elif self.col_type == "boolean":
+            lowered = pc.utf8_lower(trimmed)
+            is_true = pc.fill_null(pc.equal(lowered, "true"), False)
+            is_false = pc.fill_null(pc.equal(lowered, "false"), False)
+            valid = pc.or_(pc.or_(is_true, is_false), empty)
+            coerced = pc.if_else(
+                pc.or_(is_true, is_false), is_true, pa.nulls(len(values), pa.bool_())
+            ).to_pylist()
+            coerced = [
+                raw if flag is None else flag for flag, raw in zip(coerced, values)
+            ]
+        else:
+            options = pa.array(self.option_list, type=pa.string())
+            is_option = pc.is_in(trimmed, value_set=options)
+            valid = pc.or_(is_option, empty)
+            coerced = pc.if_else(is_option, trimmed, column).to_pylist()
+
+        invalid = pc.indices_nonzero(pc.invert(valid)).to_pylist()
+        errors = {i: str(self._reject(values[i])) for i in invalid}
+        return coerced, errors
+
+
+@dataclass(frozen=True)
+class RowValidator:
+    """Compiled checks for one version of a sheet's column_schema."""
+
+    columns: dict[str, _Column]
+    formulas: formula_engine.FormulaSet
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        """A checked, coerced copy of one row's data. Raises ValueError."""
+        computed = self.formulas.keys
+        coerced = {key: value for key, value in data.items() if key not in computed}
+        for key, value in coerced.items():
+            column = self.columns.get(key)
+            if column is not None:
+                coerced[key] = column.coerce(value)
+        return coerced
+
+    def validate_batch(
+        self, rows: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], dict[int, str]]:
+        """Check many rows column by column.
+
+        Returns coerced copies of every row and {row index: error} for the
+        rows that failed (first failing column wins).
+        """
+        computed = self.formulas.keys
+        coerced = [
+            {key: value for key, value in row.items() if key not in computed}
+            for row in rows
+        ]
+        errors: dict[int, str] = {}
+        for key, column in self.columns.items():
+            positions = [i for i, row in enumerate(rows) if key in row]
+            if not positions:
+                continue
+            values, column_errors = column.coerce_column(
+                [rows[i][key] for i in positions]
+            )
+            for i, value in zip(positions, values):
+                coerced[i][key] = value
+            for j, error in column_errors.items():
+                errors.setdefault(positions[j], error)
+        return coerced, errors
+
+
+def compile_validator(column_schema: list[dict]) -> RowValidator:
+    """Build a RowValidator for a column_schema (see RULES above).
+
+    Raises ValueError for an invalid formula (sheet_service checks them
+    before a schema is saved).
+    """
+    columns = {}
+    for col in column_schema or []:
+        if col.get("type") == "formula":
+            continue
+        options = tuple(col.get("options") or ())
+        columns[col["key"]] = _Column(
+            key=col["key"],
+            col_type=col.get("type", "string"),
+            options=frozenset(options),
+            option_list=options,
+        )
+    return RowValidator(
+        columns=columns, formulas=formula_engine.compile_formulas(column_schema)
+    )
+
+
+def for_sheet(sheet: Sheet) -> RowValidator:
+    """The validator for a loaded sheet's current columns (cached)."""
+    key = (sheet.id, sheet.schema_version)
+    validator = _cache.get(key)
+    if validator is None:
+        validator = compile_validator(sheet.column_schema)
+        _cache[key] = validator
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+    return validator
+
+
+async def load(
+    db: AsyncSession, sheet_id: uuid.UUID, schema_version: int | None = None
+) -> RowValidator | None:
+    """The validator for a sheet by id (None if it doesn't exist).
+
+    With the sheet's current schema_version, a cached validator is
+    returned without loading the sheet.
+    """
+    if schema_version is not None:
+        validator = _cache.get((sheet_id, schema_version))
+        if validator is not None:
+            _cache.move_to_end((sheet_id, schema_version))
+            return validator
+    sheet = await db.get(Sheet, sheet_id)
+    return for_sheet(sheet) if sheet is not None else None
+
+
+def describe_errors(errors: dict[int, str], labels: list | None = None) -> str:
+    """One message for rejected rows: 'Row 3: 'score': 'abc' is not a number; ...'.
+
+    Rows are numbered from 1, or named by `labels` (e.g. row ids).
+    """
+    parts = [
+        f"Row {labels[i] if labels else i + 1}: {errors[i]}"
+        for i in sorted(errors)[:MAX_DESCRIBED_ERRORS]
+    ]
+    if len(errors) > MAX_DESCRIBED_ERRORS:
+        parts.append(f"and {len(errors) - MAX_DESCRIBED_ERRORS} more")
+    return "; ".join(parts)
@@ -0,0 +1,111 @@
+"""
+Search Service — Ranked full-text / fuzzy search across a sheet's cells.
+
+MATCHING (any of):
+  1. Words: every query word, the last one as a prefix (still typing)
+       'Sarthak sh' → search_vector @@ to_tsquery('simple', 'sarthak & sh:*')
+     Query and vector are tokenised alike: punctuation splits words, so
+     "sarthak.s@mail" matches the email sarthak.s@mail.org.
+     GIN index ix_rows_search_vector. 'simple' = no stemming/stop words,
+     which suits names, emails and codes better than an English config.
+  2. Substrings: search_text LIKE '%9876%' (phone/email fragments)
+  3. Typos: 'sartak' <% search_text (pg_trgm word similarity)
+  2 and 3 are served by the trigram index ix_rows_search_text_trgm, so they
+  are only used when pg_trgm is installed. Without it, a substring match
+  would scan every row of the sheet, so search stays word/prefix-only.
+
+RANKING:
+  ts_rank() on the vector, plus word_similarity() when pg_trgm is there.
+  Pages are keyset-paginated on (-rank, *row position) with the same
+  opaque cursor shape as row_service, so "page 2" costs what page 1 does.
+"""
+
+import re
+import uuid
+
+from sqlalchemy import Float, String, bindparam, func, or_, select, text, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.engine import Row as SqlRow
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.row import Row
+from app.services.row_service import (
+    _RETURNING_COLUMNS,
+    POSITION,
+    decode_sorted_cursor,
+    encode_sorted_cursor,
+)
+
+# Letters/digits only — the same split Row.search_vector is built with.
+_TOKEN = re.compile(r"[^\W_]+")
+
+_trigram_available: bool | None = None
+
+
+async def trigram_available(db: AsyncSession) -> bool:
+    """Whether pg_trgm is installed (checked once per process)."""
+    global _trigram_available
+    if _trigram_available is None:
+        result = await db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        )
+        _trigram_available = result.scalar() is not None
+    return _trigram_available
+
+
+def prefix_tsquery(query: str) -> str | None:
+    """'Sarthak sh' → "sarthak & sh:*" (None if nothing searchable)."""
+    tokens = _TOKEN.findall(query.lower())
+    if not tokens:
+        return None
+    return " & ".join(tokens[:-1] + [tokens[-1] + ":*"])
+
+
+async def search(
+    db: AsyncSession,
+    sheet_id: uuid.UUID,
+    query: str,
+    limit: int,
+    after: str | None = None,
+) -> tuple[list[SqlRow], str | None]:
+    """One page of rows matching `query`, best match first.
+
+    Returns (rows, next_cursor) like row_service.list_page(): rows are
+    _RETURNING_COLUMNS tuples with the sort key as an extra last column,
+    which row_payload() ignores. Raises
+    ValueError for an unusable query or a malformed cursor.
+    """
+    tsquery_text = prefix_tsquery(query)
+    if tsquery_text is None:
+        raise ValueError("Search query has no searchable characters")
+    tsquery = func.to_tsquery(text("'simple'::regconfig"), tsquery_text)
+    matches = [Row.search_vector.op("@@")(tsquery)]
+    rank = func.ts_rank(Row.search_vector, tsquery, type_=Float)
+
+    if await trigram_available(db):
+        needle = query.strip().lower()
+        escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        matches.append(Row.search_text.like(f"%{escaped}%", escape="\\"))
+        matches.append(bindparam("needle", needle, String).op("<%")(Row.search_text))
+        rank = rank + func.word_similarity(needle, Row.search_text, type_=Float)
+
+    # ts_rank() is float4, which the driver rounds on the way out; as float8
+    # the value in the cursor compares equal to the row it came from.
+    rank = rank.cast(DOUBLE_PRECISION)
+    sort_key = (-rank).label("sort_key")
+    stmt = select(*_RETURNING_COLUMNS, sort_key).where(
+        Row.sheet_id == sheet_id, or_(*matches)
+    )
+    if after is not None:
+        after_key, *after_position = decode_sorted_cursor(after)
+        if not isinstance(after_key, (int, float)):
+            raise ValueError("Invalid cursor")
+        bound = (float(after_key), *after_position)
+        stmt = stmt.where(tuple_(-rank, *POSITION) > bound)
+    stmt = stmt.order_by(sort_key, *POSITION).limit(limit + 1)
+
+    fetched = list((await db.execute(stmt)).all())
+    if len(fetched) <= limit:
+        return fetched, None
+    last = fetched[limit - 1]
+    return fetched[:limit], encode_sorted_cursor(last.sort_key, last)
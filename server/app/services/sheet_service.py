@@ -1,25 +1,110 @@
 """
 Sheet Service — Business logic for sheets and their columns.
+
+COLUMN CHANGES: new schema now, cells rewritten in the background
+  update_columns() diffs the old and new column_schema: keys listed in
+  `renames` move their cells to the new key and keys listed in `drops`
+  lose their cells. A key that disappears without being listed in either
+  is a 400 naming it — neither deleting its cells (a key change the
+  client didn't declare must not delete data) nor keeping them as
+  orphans no column shows. The new schema is saved straight away and a
+  "column_migration" Job rewrites the stored cells afterwards
+  (row_service.rewrite_keys, run by app/tasks/column_tasks.py), chunk by
+  chunk, so a large sheet stays writable meanwhile. Only one migration
+  per sheet runs at a time — another column change while one is pending
+  or running raises ColumnMigrationRunning, since renames that overlap
+  (a → b, then b → c) would depend on which job finished first. The
+  check runs with the sheet row locked (SELECT ... FOR UPDATE), so two
+  concurrent column changes can't both see no job and both start one.
+  Alternative: one UPDATE over the whole sheet in the request — simple,
+    but it row-locks every row of the sheet until it commits.
+
+FORMULA COLUMNS:
+  Formulas are compiled when the columns are saved, so a bad formula is a
+  400 and never stored, and each formula column gets its `result_type`.
+  Formulas whose values may change — new ones, edited ones, and ones
+  whose inputs changed type — are recalculated for every existing row by
+  the same job, after any renames (row_service.recalculate_formulas).
+  Rows written in the meantime already get the new formulas.
+
+DUPLICATION: one INSERT ... SELECT statement
+  duplicate() copies the sheet, its rows (all, filtered, or none) and its
+  agent rules with a single statement of data-modifying CTEs:
+    WITH new_sheet    AS (INSERT INTO sheets ... SELECT ... RETURNING id),
+         copied_rows  AS (INSERT INTO rows ... SELECT ... RETURNING id),
+         copied_rules AS (INSERT INTO agent_rules ... SELECT ... RETURNING id)
+    SELECT id, (SELECT count(*) FROM copied_rows), ... FROM new_sheet
+  No row data passes through Python, and every part reads the same
+  snapshot, so the copy is consistent without locking the source against
+  writes. Copied rows get new ids, version 1 and change_seq 0 and keep
+  their positions; the search columns are generated by Postgres. Expression
+  indexes (index_service) and agent logs are not copied. Duplicating
+  during a column migration raises ColumnMigrationRunning — the rows
+  would be copied half rewritten.
+  Alternative: list the rows and bulk-insert them — every cell makes a
+    round trip through the API process for no gain.
 """
 
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.agent_rule import AgentRule
+from app.models.job import Job
+from app.models.row import Row
 from app.models.sheet import Sheet
-from app.schemas.sheet import SheetCreate, SheetUpdate, ColumnUpdate
+from app.schemas.sheet import (
+    ColumnDef,
+    SheetCreate,
+    SheetDuplicate,
+    SheetUpdate,
+    ColumnUpdate,
+)
+from app.services import formula_engine, job_service, row_query, row_validator
+
+COLUMN_MIGRATION_JOB = "column_migration"
+
+
+class ColumnMigrationRunning(Exception):
+    """A column change arrived while the sheet's cells are still being rewritten."""
+
+    def __init__(self, job_id: uuid.UUID):
+        super().__init__(f"Column migration {job_id} is still running")
+        self.job_id = job_id
+
+
+def _column_schema(
+    columns: list[ColumnDef],
+) -> tuple[list[dict], formula_engine.FormulaSet]:
+    """ColumnDefs → column_schema dicts with formula result types filled in.
+
+    Also returns the compiled formulas. Raises ValueError for an invalid
+    formula.
+    """
+    # Convert ColumnDef Pydantic models → dicts for JSONB storage
+    schema = [col.model_dump(by_alias=True) for col in columns]
+    formulas = formula_engine.compile_formulas(schema)
+    result_types = {formula.key: formula.result_type for formula in formulas.formulas}
+    for col in schema:
+        col["result_type"] = result_types.get(col["key"])
+    return schema, formulas
 
 
 async def create(
     db: AsyncSession, workspace_id: uuid.UUID, payload: SheetCreate
 ) -> Sheet:
-    """Create a new sheet with initial column schema."""
+    """Create a new sheet with initial column schema.
+
+    Raises ValueError for an invalid formula column.
+    """
+    column_schema, _ = _column_schema(payload.columns)
     sheet = Sheet(
         workspace_id=workspace_id,
         name=payload.name,
-        # Convert ColumnDef Pydantic models → dicts for JSONB storage
-        column_schema=[col.model_dump(by_alias=True) for col in payload.columns],
+        column_schema=column_schema,
+        row_ordering=payload.row_ordering,
     )
     db.add(sheet)
     await db.flush()
@@ -55,17 +140,190 @@ async def update(
     return sheet
 
 
+async def duplicate(
+    db: AsyncSession, sheet_id: uuid.UUID, payload: SheetDuplicate
+) -> tuple[Sheet, int, int] | None:
+    """Copy a sheet inside Postgres (see DUPLICATION above).
+
+    Returns the new sheet and how many rows and rules were copied. Raises
+    ValueError for invalid filters and ColumnMigrationRunning if the
+    source's cells are being rewritten.
+    """
+    source = await db.get(Sheet, sheet_id)
+    if not source:
+        return None
+    running = await job_service.get_active(db, sheet_id, COLUMN_MIGRATION_JOB)
+    if running is not None:
+        raise ColumnMigrationRunning(running.id)
+    where = row_query.compile_filters(payload.filters, source.column_schema)
+    name = payload.name or f"{source.name} (copy)"[:255]
+    new_id = uuid.uuid4()
+    new_sheet_id = literal(new_id, UUID(as_uuid=True))
+
+    new_sheet = (
+        insert(Sheet)
+        .from_select(
+            [
+                Sheet.id,
+                Sheet.workspace_id,
+                Sheet.name,
+                Sheet.column_schema,
+                Sheet.row_ordering,
+                Sheet.next_row_order,
+            ],
+            select(
+                new_sheet_id,
+                Sheet.workspace_id,
+                literal(name),
+                Sheet.column_schema,
+                Sheet.row_ordering,
+                Sheet.next_row_order,
+            ).where(Sheet.id == sheet_id),
+            include_defaults=False,
+        )
+        .returning(Sheet.id)
+        .cte("new_sheet")
+    )
+    counts = []
+    if payload.include_rows:
+        copied_rows = (
+            insert(Row)
+            .from_select(
+                [Row.id, Row.sheet_id, Row.data, Row.row_order, Row.order_key],
+                select(
+                    func.gen_random_uuid(),
+                    new_sheet_id,
+                    Row.data,
+                    Row.row_order,
+                    Row.order_key,
+                ).where(Row.sheet_id == sheet_id, *where),
+                include_defaults=False,
+            )
+            .returning(Row.id)
+            .cte("copied_rows")
+        )
+        counts.append(select(func.count()).select_from(copied_rows).scalar_subquery())
+    else:
+        counts.append(literal(0))
+    if payload.include_rules:
+        copied_rules = (
+            insert(AgentRule)
+            .from_select(
+                [
+                    AgentRule.id,
+                    AgentRule.sheet_id,
+                    AgentRule.trigger_column,
+                    AgentRule.trigger_value,
+                    AgentRule.action_type,
+                    AgentRule.action_config,
+                    AgentRule.enabled,
+                ],
+                select(
+                    func.gen_random_uuid(),
+                    new_sheet_id,
+                    AgentRule.trigger_column,
+                    AgentRule.trigger_value,
+                    AgentRule.action_type,
+                    AgentRule.action_config,
+                    AgentRule.enabled,
+                ).where(AgentRule.sheet_id == sheet_id),
+                include_defaults=False,
+            )
+            .returning(AgentRule.id)
+            .cte("copied_rules")
+        )
+        counts.append(select(func.count()).select_from(copied_rules).scalar_subquery())
+    else:
+        counts.append(literal(0))
+
+    result = await db.execute(select(new_sheet.c.id, *counts))
+    copied = result.one_or_none()
+    if copied is None:
+        return None  # source deleted since it was loaded
+    sheet = await db.get(Sheet, new_id)
+    return sheet, copied[1], copied[2]
+
+
+def diff_columns(
+    old_schema: list[dict],
+    new_keys: list[str],
+    renames: dict[str, str],
+    drops: list[str],
+) -> tuple[dict[str, str], list[str]]:
+    """(renames, dropped keys) for replacing old_schema. Raises ValueError.
+
+    Every old key must stay in new_keys, be renamed or be dropped.
+    """
+    old_keys = {col["key"] for col in old_schema or []}
+    kept = set(new_keys)
+    for key in drops:
+        if key not in old_keys:
+            raise ValueError(f"Can't drop '{key}': no such column")
+        if key in kept:
+            raise ValueError(f"'{key}' is dropped but still listed in columns")
+        if key in renames:
+            raise ValueError(f"'{key}' can't be both renamed and dropped")
+    for old, new in renames.items():
+        if old not in old_keys:
+            raise ValueError(f"Can't rename '{old}': no such column")
+        if old in kept:
+            raise ValueError(f"'{old}' is renamed but still listed in columns")
+        if new not in kept:
+            raise ValueError(f"Rename target '{new}' is not listed in columns")
+        if new in old_keys:
+            raise ValueError(f"Can't rename '{old}' to '{new}': that column exists")
+    if len(set(renames.values())) != len(renames):
+        raise ValueError("Two columns can't be renamed to the same key")
+    undeclared = sorted(old_keys - kept - set(renames) - set(drops))
+    if undeclared:
+        raise ValueError(
+            f"Columns removed without a rename or drop: {', '.join(undeclared)} — "
+            "list them in `renames` (key changed) or `drops` (delete their cells)"
+        )
+    return dict(renames), sorted(set(drops))
+
+
 async def update_columns(
     db: AsyncSession, sheet_id: uuid.UUID, payload: ColumnUpdate
-) -> Sheet | None:
-    """Replace the entire column schema."""
-    sheet = await db.get(Sheet, sheet_id)
+) -> tuple[Sheet, Job | None] | None:
+    """Replace the entire column schema (see COLUMN CHANGES above).
+
+    Returns the sheet and the migration job to enqueue once committed
+    (None when no cells need rewriting or recalculating). Raises
+    ValueError for invalid renames or formulas and ColumnMigrationRunning
+    if a migration is in progress.
+    """
+    # Locked until commit: the job check below must not race another change.
+    sheet = await db.get(Sheet, sheet_id, with_for_update=True)
     if not sheet:
         return None
-    sheet.column_schema = [col.model_dump(by_alias=True) for col in payload.columns]
+    running = await job_service.get_active(db, sheet_id, COLUMN_MIGRATION_JOB)
+    if running is not None:
+        raise ColumnMigrationRunning(running.id)
+    renames, drops = diff_columns(
+        sheet.column_schema,
+        [col.key for col in payload.columns],
+        payload.renames,
+        payload.drops,
+    )
+    column_schema, formulas = _column_schema(payload.columns)
+    recalculate = formula_engine.changed_formulas(
+        row_validator.for_sheet(sheet).formulas, formulas
+    )
+    sheet.column_schema = column_schema
+    # New version → row_validator compiles the new columns on next use.
+    sheet.schema_version = Sheet.schema_version + 1
     await db.flush()
     await db.refresh(sheet)
-    return sheet
+    job = None
+    if renames or drops or recalculate:
+        job = await job_service.create(
+            db,
+            sheet_id,
+            COLUMN_MIGRATION_JOB,
+            {"renames": renames, "drops": drops, "recalculate": recalculate},
+        )
+    return sheet, job
 
 
 async def delete(db: AsyncSession, sheet_id: uuid.UUID) -> bool:
@@ -0,0 +1,301 @@
+"""
+Snapshot Service — Columnar in-memory copies of sheets for analytics.
+
+A SheetSnapshot is one pyarrow Table per sheet: an id column plus one
+typed array per column_schema key. Postgres computes the arrays with
+row_query.typed_value(), the expression filters and sorts use:
+  number   → float64 (text that isn't a plain number → null)
+  boolean  → bool
+  dropdown → int32 1-based position in `options` (other values → null)
+  string   → the cell's text
+so aggregate_service gets the same answer from a snapshot as from SQL,
+with Arrow compute kernels instead of a JSONB pass per query. Typing in
+SQL also keeps the build fast: only flat typed tuples leave Postgres, no
+JSONB is decoded in Python.
+
+LIFECYCLE: built lazily, kept fresh from the change sequence
+  get() builds a snapshot the first time a sheet is analysed, streaming
+  the typed tuples through a server-side cursor. It is tagged with the
+  sheet's change_seq and schema_version (see Sheet model). Every
+  row_service write advances change_seq, so on the next get():
+    same change_seq     → served as is
+    behind by a little  → patched from row_service.list_changes(): rows
+                          written or deleted since are dropped by id and
+                          the written ones re-read and appended
+    behind by a lot,    → rebuilt (list_changes() gives up past
+    or columns changed    CHANGES_LIMIT, same as client delta sync)
+  row_service needs no hooks: a write doesn't touch the snapshot, it just
+  makes the next read apply the delta. Patching is idempotent, so a
+  snapshot tagged a little too early (writes committed mid-build) is
+  corrected by the next delta rather than corrupted.
+
+MEMORY: LRU with a byte budget
+  Snapshots are kept per API process in an LRU of at most
+  MEMORY_BUDGET_BYTES (Arrow buffer sizes); the least recently used are
+  evicted first. Sheets over MAX_ROWS rows, or whose snapshot alone is
+  over the budget, are never snapshotted (again) — their analytics stay
+  in SQL.
+  Alternative: Redis or a Parquet file per sheet — shared between
+    processes, but every read would pay for deserialising the table,
+    which is most of what the snapshot saves.
+
+pyarrow is imported lazily, like in export_service.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Float, any_, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session
+from app.models.row import Row
+from app.models.sheet import Sheet
+from app.services import row_query, row_service
+
+# Total Arrow bytes of snapshots kept per API process.
+MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+
+# Bigger sheets aren't snapshotted (building one would take too long).
+MAX_ROWS = 1_000_000
+
+# Rows per round trip while building.
+BUILD_BATCH_SIZE = 5000
+
+# Row ids are kept as 16 raw bytes under this (non-column-key) name.
+ID_COLUMN = "__id"
+
+logger = logging.getLogger(__name__)
+
+_cache: OrderedDict[uuid.UUID, "SheetSnapshot"] = OrderedDict()
+# Builds in progress (holding the task keeps it from being collected).
+_building: dict[uuid.UUID, asyncio.Task] = {}
+# Sheets found to be over MAX_ROWS or MEMORY_BUDGET_BYTES — not retried
+# until the process restarts.
+_oversized: set[uuid.UUID] = set()
+
+
+@dataclass
+class SheetSnapshot:
+    sheet_id: uuid.UUID
+    schema_version: int
+    change_seq: int
+    # Column definitions the table was typed with (key → column_schema entry).
+    columns: dict[str, dict]
+    table: Any  # pyarrow.Table
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+
+def _arrow_type(col: dict | None):
+    import pyarrow as pa
+
+    col_type = (col or {}).get("type", "string")
+    if col_type == "number":
+        return pa.float64()
+    if col_type == "boolean":
+        return pa.bool_()
+    if col_type == "dropdown":
+        return pa.int32()
+    return pa.string()
+
+
+def _typed_select(columns: dict[str, dict]):
+    """SELECT id, <typed_value() per column> FROM rows."""
+    exprs = []
+    for key, col in columns.items():
+        expr = row_query.typed_value(key, col)
+        if col.get("type") == "number":
+            expr = expr.cast(Float)  # numeric → float8, no Decimal objects
+        exprs.append(expr)
+    return select(func.uuid_send(Row.id), *exprs)
+
+
+def _to_table(records: list, columns: dict[str, dict]):
+    """Typed tuples from _typed_select() → a pyarrow Table."""
+    import pyarrow as pa
+
+    values = list(zip(*records)) if records else [()] * (len(columns) + 1)
+    arrays = {ID_COLUMN: pa.array(values[0], pa.binary(16))}
+    for (key, col), column in zip(columns.items(), values[1:]):
+        arrays[key] = pa.array(column, type=_arrow_type(col))
+    return pa.table(arrays)
+
+
+async def _build(db: AsyncSession, sheet: Sheet) -> SheetSnapshot | None:
+    """Read the whole sheet into a snapshot (None if it has over MAX_ROWS rows)."""
+    import pyarrow as pa
+
+    count = await db.scalar(
+        select(func.count()).select_from(Row).where(Row.sheet_id == sheet.id)
+    )
+    if count > MAX_ROWS:
+        return None
+    columns = row_query.column_types(sheet.column_schema)
+    # Core connection, not the ORM session: plain tuples, no ORM row loading.
+    conn = await db.connection()
+    result = await conn.stream(
+        _typed_select(columns)
+        .where(Row.sheet_id == sheet.id)
+        .execution_options(yield_per=BUILD_BATCH_SIZE)
+    )
+    tables = [_to_table([], columns)]
+    async for batch in result.partitions():
+        tables.append(_to_table(batch, columns))
+    return SheetSnapshot(
+        sheet_id=sheet.id,
+        schema_version=sheet.schema_version,
+        change_seq=sheet.change_seq,
+        columns=columns,
+        table=pa.concat_tables(tables).combine_chunks(),
+    )
+
+
+async def _patch(
+    db: AsyncSession, snapshot: SheetSnapshot, sheet: Sheet
+) -> SheetSnapshot | None:
+    """Apply the writes since the snapshot's change_seq (None: too many, rebuild)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    changes = await row_service.list_changes(db, sheet.id, snapshot.change_seq)
+    if changes is None:
+        return None
+    rows, deleted_ids = changes
+    stale = [row.id.bytes for row in rows] + [row_id.bytes for row_id in deleted_ids]
+    table = snapshot.table
+    if stale:
+        keep = pc.invert(
+            pc.is_in(table[ID_COLUMN], value_set=pa.array(stale, pa.binary(16)))
+        )
+        table = table.filter(keep)
+    if rows:
+        ids = literal([row.id for row in rows], ARRAY(UUID(as_uuid=True)))
+        result = await db.execute(
+            _typed_select(snapshot.columns).where(Row.id == any_(ids))
+        )
+        written = _to_table(result.all(), snapshot.columns)
+        table = pa.concat_tables([table, written]).combine_chunks()
+    return SheetSnapshot(
+        sheet_id=sheet.id,
+        schema_version=sheet.schema_version,
+        change_seq=sheet.change_seq,
+        columns=snapshot.columns,
+        table=table,
+    )
+
+
+def _store(snapshot: SheetSnapshot) -> bool:
+    """Cache the snapshot, evicting LRU ones over budget; False if it alone is."""
+    if snapshot.nbytes > MEMORY_BUDGET_BYTES:
+        # Storing it would evict every other snapshot and then itself.
+        _cache.pop(snapshot.sheet_id, None)
+        _oversized.add(snapshot.sheet_id)
+        return False
+    _cache[snapshot.sheet_id] = snapshot
+    _cache.move_to_end(snapshot.sheet_id)
+    total = sum(cached.nbytes for cached in _cache.values())
+    while total > MEMORY_BUDGET_BYTES:
+        _, evicted = _cache.popitem(last=False)
+        total -= evicted.nbytes
+    return True
+
+
+async def _build_in_background(sheet_id: uuid.UUID) -> None:
+    try:
+        async with async_session() as db:
+            sheet = await db.get(Sheet, sheet_id)
+            if sheet is None:
+                return
+            snapshot = await _build(db, sheet)
+        if snapshot is None:
+            _oversized.add(sheet_id)
+        else:
+            _store(snapshot)
+    except Exception as exc:
+        logger.warning(f"Could not build snapshot of sheet {sheet_id}: {exc}")
+    finally:
+        _building.pop(sheet_id, None)
+
+
+async def get(db: AsyncSession, sheet: Sheet) -> SheetSnapshot | None:
+    """The sheet's snapshot as of sheet.change_seq (see LIFECYCLE above).
+
+    None while there isn't one yet — a build is started in the background
+    and the caller should use SQL this time — or if the sheet is too big.
+    """
+    snapshot = _cache.get(sheet.id)
+    if snapshot is not None and snapshot.schema_version == sheet.schema_version:
+        if snapshot.change_seq == sheet.change_seq:
+            _cache.move_to_end(sheet.id)
+            return snapshot
+        snapshot = await _patch(db, snapshot, sheet)
+        if snapshot is not None:
+            _store(snapshot)
+            return snapshot
+    _cache.pop(sheet.id, None)
+    if sheet.id not in _building and sheet.id not in _oversized:
+        _building[sheet.id] = asyncio.create_task(_build_in_background(sheet.id))
+    return None
+
+
+def filter_mask(snapshot: SheetSnapshot, specs: list[str]):
+    """Evaluate ?filter= specs on the snapshot as a boolean mask.
+
+    Matches what row_query.compile_filters() selects for cells stored the
+    way row_validator stores them (call it first — it raises ValueError
+    for invalid filters). Returns None when a filter can't be evaluated
+    here: unknown keys, and filters whose SQL result depends on the raw
+    JSON (eq on numbers) or on the database collation (text ranges).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    mask = pa.array([True] * snapshot.table.num_rows, pa.bool_())
+    for spec in specs:
+        key, op, raw = spec.split(":", 2)
+        col = snapshot.columns.get(key)
+        if col is None:
+            return None
+        col_type = col.get("type", "string")
+        values = snapshot.table[key]
+        if op in ("eq", "in"):
+            if col_type == "number":
+                # SQL matches the JSON number or its exact text, e.g. "85".
+                return None
+            wanted = raw.split(",") if op == "in" else [raw]
+            if col_type == "dropdown":
+                options = list(col.get("options") or [])
+                wanted = [options.index(v) + 1 for v in wanted if v in options]
+            elif col_type == "boolean":
+                # SQL matches JSON true/false, or the exact text "true"/"false".
+                if any(v not in ("true", "false") for v in wanted):
+                    return None
+                wanted = [v == "true" for v in wanted]
+            matched = pc.is_in(values, value_set=pa.array(wanted, values.type))
+        elif op == "contains":
+            if col_type != "string":
+                return None
+            matched = pc.match_substring(values, raw, ignore_case=True)
+        else:
+            if col_type == "string":
+                return None  # text order follows the database collation
+            value = row_query.typed_literal(raw, col)
+            if col_type == "number":
+                value = float(value)
+            compare = {
+                "gt": pc.greater,
+                "gte": pc.greater_equal,
+                "lt": pc.less,
+                "lte": pc.less_equal,
+            }[op]
+            matched = compare(values, value)
+        mask = pc.and_(mask, pc.fill_null(matched, False))
+    return mask
@@ -0,0 +1,113 @@
+"""
+Celery Task Definitions for column migrations.
+
+PUT /sheets/{id}/columns saves the new column_schema straight away and
+queues this job when columns were renamed or dropped, or formulas added
+or changed (see sheet_service COLUMN CHANGES and FORMULA COLUMNS). The
+task first drops the expression indexes built for the removed keys (no
+query can use them any more, and every rewritten row would otherwise
+update them), then moves or removes the matching keys in every row's
+data via row_service.rewrite_keys(), one committed chunk at a time, then
+recomputes the changed formulas via row_service.recalculate_formulas().
+
+Progress goes to the Job row and, as "column_migration_progress" events,
+to the sheet's WebSocket room. The rewrite is idempotent, so a failed job
+keeps the chunks done so far and re-running it is safe.
+"""
+
+import logging
+import uuid
+from typing import Any
+
+from app.core.celery_app import celery_app
+from app.core.database import async_session
+from app.services import index_service, job_service, row_service
+from app.tasks.runner import fail, notify, run_task
+
+logger = logging.getLogger(__name__)
+
+# Big sheets take a while by design (chunks are paced), so this task gets
+# a longer limit than the app-wide default.
+MIGRATION_TIME_LIMIT = 3600
+
+EVENT = "column_migration_progress"
+
+
+@celery_app.task(
+    name="app.tasks.column_tasks.migrate_columns_job",
+    time_limit=MIGRATION_TIME_LIMIT,
+    soft_time_limit=MIGRATION_TIME_LIMIT - 30,
+)
+def migrate_columns_job(job_id_str: str) -> dict[str, Any]:
+    """Background job created by PUT /sheets/{sheet_id}/columns."""
+    return run_task(_migrate_columns_async(uuid.UUID(job_id_str)))
+
+
+async def _migrate_columns_async(job_id: uuid.UUID) -> dict[str, Any]:
+    async with async_session() as db:
+        job = await job_service.get_by_id(db, job_id)
+        if not job:
+            return {"status": "skipped", "reason": "Job deleted"}
+        renames: dict[str, str] = job.params["renames"]
+        drops: list[str] = job.params["drops"]
+        recalculate: list[str] = job.params.get("recalculate", [])
+        removed = sorted(set(renames) | set(drops))
+
+        total = (
+            await row_service.count_rows_with_keys(db, job.sheet_id, removed)
+            if removed
+            else 0
+        )
+        progress = {"rows_total": total, "rows_rewritten": 0}
+        if recalculate:
+            progress["rows_to_recalculate"] = await row_service.count_rows(
+                db, job.sheet_id
+            )
+            progress["rows_recalculated"] = 0
+        await job_service.set_status(db, job, "running", progress=progress)
+        await notify(job, EVENT)
+
+        async def report(**done: int) -> None:
+            progress.update(done)
+            await job_service.set_status(db, job, "running", progress=dict(progress))
+            await notify(job, EVENT)
+
+        async def on_chunk(rewritten: int) -> None:
+            await report(rows_rewritten=rewritten)
+
+        async def on_recalculated(checked: int) -> None:
+            await report(rows_recalculated=checked)
+
+        dropped_indexes = []
+        for key in removed:
+            try:
+                dropped_indexes += await index_service.drop_column_indexes(
+                    job.sheet_id, key
+                )
+            except Exception as exc:
+                logger.warning(f"Could not drop indexes on '{key}': {exc}")
+
+        try:
+            rewritten = await row_service.rewrite_keys(
+                db, job.sheet_id, renames, drops, on_chunk=on_chunk
+            )
+            progress["rows_rewritten"] = rewritten
+            recalculated = 0
+            if recalculate:
+                recalculated = await row_service.recalculate_formulas(
+                    db, job.sheet_id, recalculate, on_chunk=on_recalculated
+                )
+        except Exception as exc:
+            logger.exception(f"Column migration job {job_id} failed")
+            return await fail(db, job, EVENT, exc)
+
+        result = {
+            "rows_rewritten": rewritten,
+            "formula_rows_updated": recalculated,
+            "dropped_indexes": dropped_indexes,
+        }
+        await job_service.set_status(
+            db, job, "succeeded", progress=dict(progress), result=result
+        )
+        await notify(job, EVENT)
+        return {"status": "succeeded", **result}
@@ -0,0 +1,132 @@
+"""
+Celery Task Definitions for background CSV imports.
+
+The API spools the upload to disk and creates a Job row; this task streams
+the file into the sheet via import_service, committing after every batch.
+Progress goes to two places:
+  - the Job row (for GET /jobs/{id} polling)
+  - the sheet's WebSocket room, via Redis pub/sub ("import_progress" events)
+
+Committing per batch means a failed job keeps the rows imported before the
+failure — the job's progress counters say exactly how many.
+
+TIME LIMIT: a big file takes a while (every batch is its own commit), so
+this task gets a longer limit than the app-wide default, like the column
+migration. At the soft limit the job is marked failed — keeping the rows
+committed so far — and the spooled file is removed; the hard limit only
+backs that up.
+"""
+
+import logging
+import os
+import uuid
+from typing import Any
+
+from celery.exceptions import SoftTimeLimitExceeded
+from starlette.concurrency import run_in_threadpool
+
+from app.core.celery_app import celery_app
+from app.core.database import async_session
+from app.schemas.row import CsvImportReport
+from app.services import import_service, job_service
+from app.tasks.runner import fail, notify, run_task
+
+logger = logging.getLogger(__name__)
+
+
+IMPORT_TIME_LIMIT = 3600
+
+TIMED_OUT = (
+    f"Import stopped after {IMPORT_TIME_LIMIT - 30} seconds; "
+    "rows imported before that were kept"
+)
+
+
+@celery_app.task(
+    name="app.tasks.import_tasks.import_csv_job",
+    time_limit=IMPORT_TIME_LIMIT,
+    soft_time_limit=IMPORT_TIME_LIMIT - 30,
+)
+def import_csv_job(job_id_str: str) -> dict[str, Any]:
+    """Background job created by POST /sheets/{sheet_id}/import-csv/jobs."""
+    job_id = uuid.UUID(job_id_str)
+    try:
+        return run_task(_import_csv_job_async(job_id))
+    except SoftTimeLimitExceeded:
+        # The signal lands wherever the worker is; outside the import's own
+        # try (e.g. in the event loop itself) it ends up here instead.
+        logger.error(f"CSV import job {job_id} hit its time limit")
+        return run_task(_time_out(job_id))
+
+
+def _remove_spool(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _progress(report: CsvImportReport) -> dict[str, int]:
+    return {
+        "rows_parsed": report.inserted + report.rejected,
+        "rows_inserted": report.inserted,
+        "rows_rejected": report.rejected,
+    }
+
+
+EVENT = "import_progress"
+
+
+async def _import_csv_job_async(job_id: uuid.UUID) -> dict[str, Any]:
+    async with async_session() as db:
+        job = await job_service.get_by_id(db, job_id)
+        if not job:
+            return {"status": "skipped", "reason": "Job deleted"}
+        path = job.params["path"]
+
+        await job_service.set_status(db, job, "running")
+        await notify(job, EVENT)
+
+        async def on_batch(report: CsvImportReport) -> None:
+            # This commit also makes the batch's rows durable.
+            await job_service.set_status(db, job, "running", progress=_progress(report))
+            await notify(job, EVENT)
+
+        try:
+            f = await run_in_threadpool(open, path, "rb")
+            try:
+                report = await import_service.import_csv(
+                    db, job.sheet_id, f, on_batch=on_batch
+                )
+            finally:
+                await run_in_threadpool(f.close)
+        except SoftTimeLimitExceeded:
+            logger.error(f"CSV import job {job_id} hit its time limit")
+            return await fail(db, job, EVENT, TimeoutError(TIMED_OUT))
+        except Exception as exc:
+            logger.exception(f"CSV import job {job_id} failed")
+            return await fail(db, job, EVENT, exc)
+        finally:
+            await run_in_threadpool(_remove_spool, path)
+
+        await job_service.set_status(
+            db,
+            job,
+            "succeeded",
+            progress=_progress(report),
+            result=report.model_dump(),
+        )
+        await notify(job, EVENT)
+        return {"status": "succeeded", **_progress(report)}
+
+
+async def _time_out(job_id: uuid.UUID) -> dict[str, Any]:
+    """Fail a job whose time limit struck outside _import_csv_job_async's try."""
+    async with async_session() as db:
+        job = await job_service.get_by_id(db, job_id)
+        if not job:
+            return {"status": "skipped", "reason": "Job deleted"}
+        await run_in_threadpool(_remove_spool, job.params["path"])
+        if job.status in ("succeeded", "failed"):
+            return {"status": job.status}
+        return await fail(db, job, EVENT, TimeoutError(TIMED_OUT))
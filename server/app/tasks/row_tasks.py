@@ -0,0 +1,91 @@
+"""
+Celery Task Definitions for row maintenance.
+
+rebalance_sheet_orders renumbers a float-ordered sheet whose row_order
+midpoints have become too close (see row_service REBALANCING). The API
+queues it whenever a row is placed at an explicit row_order next to a
+neighbour that is too close.
+
+Only one rebalance per sheet runs at a time: the task holds a Postgres
+advisory lock keyed by the sheet for its whole run, on the same
+connection that does the chunked UPDATEs. A duplicate task skips instead
+of waiting, and a task that finds the gaps already healthy does nothing.
+When rows were moved, a "rows_rebalanced" event tells open clients to
+refetch (every row_order in the sheet changed).
+
+prune_tombstones runs daily from Celery beat (see core/celery_app.py) and
+deletes row tombstones past row_service.TOMBSTONE_RETENTION_DAYS, one
+batch per transaction so it never holds many sheet locks for long.
+"""
+
+import logging
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.celery_app import celery_app
+from app.core.database import async_session, engine
+from app.core.ws_manager import publish_sheet_event
+from app.models.sheet import Sheet
+from app.services import row_service
+from app.tasks.runner import run_task
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.row_tasks.rebalance_sheet_orders")
+def rebalance_sheet_orders(sheet_id_str: str) -> dict[str, Any]:
+    """Renumber a sheet's row_order values if their gaps have collapsed."""
+    return run_task(_rebalance_async(uuid.UUID(sheet_id_str)))
+
+
+async def _rebalance_async(sheet_id: uuid.UUID) -> dict[str, Any]:
+    lock_key = func.hashtext(f"rebalance:{sheet_id}")
+    async with engine.connect() as conn:
+        locked = (
+            await conn.execute(select(func.pg_try_advisory_lock(lock_key)))
+        ).scalar()
+        await conn.commit()
+        if not locked:
+            return {"status": "skipped", "reason": "Rebalance already running"}
+        try:
+            async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                sheet = await db.get(Sheet, sheet_id)
+                if not sheet or sheet.row_ordering != "float":
+                    return {"status": "skipped", "reason": "Not a float-ordered sheet"}
+                gap = await row_service.smallest_order_gap(db, sheet_id)
+                if gap is None or gap > row_service.REBALANCE_MIN_RELATIVE_GAP:
+                    return {"status": "skipped", "reason": "Gaps are healthy"}
+                moved = await row_service.rebalance_orders(db, sheet_id)
+        finally:
+            await conn.execute(select(func.pg_advisory_unlock(lock_key)))
+            await conn.commit()
+    logger.info(f"Rebalanced {moved} rows of sheet {sheet_id}")
+    try:
+        await publish_sheet_event(sheet_id, {"event": "rows_rebalanced"})
+    except Exception as exc:
+        logger.warning(f"Could not publish rebalance of sheet {sheet_id}: {exc}")
+    return {"status": "succeeded", "rows_moved": moved}
+
+
+@celery_app.task(name="app.tasks.row_tasks.prune_tombstones")
+def prune_tombstones() -> dict[str, Any]:
+    """Delete row tombstones older than the retention period."""
+    return run_task(_prune_async())
+
+
+async def _prune_async() -> dict[str, Any]:
+    cutoff = datetime.now(UTC) - timedelta(days=row_service.TOMBSTONE_RETENTION_DAYS)
+    pruned = 0
+    while True:
+        async with async_session() as db:
+            count = await row_service.prune_tombstones(db, cutoff)
+            await db.commit()
+        pruned += count
+        if count < row_service.TOMBSTONE_PRUNE_BATCH:
+            break
+    logger.info(f"Pruned {pruned} row tombstones deleted before {cutoff}")
+    return {"status": "succeeded", "tombstones_pruned": pruned}
@@ -0,0 +1,68 @@
+"""
+Shared plumbing for the async Celery tasks.
+
+Every task body is a coroutine run with asyncio.run() in the worker.
+run_task() does that and disposes the engine's pool afterwards: pooled
+connections belong to that asyncio.run() loop, and the next task must
+not inherit sockets from a closed loop.
+
+Background jobs (a Job row plus progress events on the sheet's WebSocket
+room) also share how they report: notify() pushes the job's state as an
+event, and fail() records a failure after the job's transaction was
+rolled back.
+"""
+
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.core.ws_manager import publish_sheet_event
+from app.models.job import Job
+from app.services import job_service
+
+logger = logging.getLogger(__name__)
+
+
+def run_task(body: Coroutine[Any, Any, dict[str, Any]]) -> dict[str, Any]:
+    """Run a task's coroutine to completion, then drop pooled connections."""
+
+    async def run() -> dict[str, Any]:
+        try:
+            return await body
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+async def notify(job: Job, event: str) -> None:
+    """Push the job's state to the sheet room. Best effort — never fails the job."""
+    try:
+        await publish_sheet_event(
+            job.sheet_id,
+            {
+                "event": event,
+                "job_id": str(job.id),
+                "status": job.status,
+                "progress": job.progress,
+                "error": job.error,
+            },
+        )
+    except Exception as exc:
+        logger.warning(f"Could not publish progress for job {job.id}: {exc}")
+
+
+async def fail(
+    db: AsyncSession, job: Job, event: str, exc: Exception
+) -> dict[str, Any]:
+    """Roll back, mark the job failed and tell the room; returns the task result."""
+    await db.rollback()
+    # The rollback expired `job`; reload it before touching attributes.
+    await db.refresh(job)
+    await job_service.set_status(db, job, "failed", error=str(exc))
+    await notify(job, event)
+    return {"status": "failed", "error": str(exc)}
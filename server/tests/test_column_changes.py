@@ -0,0 +1,58 @@
+"""
+sheet_service.diff_columns(): every column that leaves the schema must be
+declared as a rename or a drop (see app/services/sheet_service.py
+COLUMN CHANGES).
+"""
+
+import pytest
+
+from app.services.sheet_service import diff_columns
+
+OLD = [
+    {"key": "name", "label": "Name", "type": "string", "order": 0},
+    {"key": "score", "label": "Score", "type": "number", "order": 1},
+    {"key": "notes", "label": "Notes", "type": "string", "order": 2},
+]
+
+
+def test_declared_changes():
+    renames, drops = diff_columns(
+        OLD, ["name", "points", "extra"], {"score": "points"}, ["notes", "notes"]
+    )
+    assert renames == {"score": "points"}
+    assert drops == ["notes"]
+
+
+def test_unchanged_and_added_columns_need_nothing():
+    assert diff_columns(OLD, ["notes", "name", "score", "new"], {}, []) == ({}, [])
+
+
+@pytest.mark.parametrize(
+    ("new_keys", "renames", "drops", "missing"),
+    [
+        (["name", "points", "notes"], {}, [], "score"),
+        (["name"], {}, [], "notes, score"),
+        (["name", "points"], {"score": "points"}, [], "notes"),
+        (["name", "score"], {}, [], "notes"),
+    ],
+)
+def test_undeclared_removals_are_rejected(new_keys, renames, drops, missing):
+    with pytest.raises(ValueError, match=f"without a rename or drop: {missing} —"):
+        diff_columns(OLD, new_keys, renames, drops)
+
+
+@pytest.mark.parametrize(
+    ("new_keys", "renames", "drops", "error"),
+    [
+        (["name", "score", "notes"], {}, ["zz"], "Can't drop 'zz'"),
+        (["name", "score", "notes"], {}, ["name"], "'name' is dropped but still"),
+        (["name", "st"], {"notes": "st"}, ["notes", "score"], "both renamed and"),
+        (["name", "notes", "p"], {"zz": "p"}, ["score"], "Can't rename 'zz'"),
+        (["name", "notes"], {"score": "p"}, [], "Rename target 'p' is not listed"),
+        (["name", "x"], {"score": "x", "notes": "x"}, [], "same key"),
+        (["name", "notes"], {"score": "notes"}, [], "'notes': that column exists"),
+    ],
+)
+def test_invalid_renames_and_drops(new_keys, renames, drops, error):
+    with pytest.raises(ValueError, match=error):
+        diff_columns(OLD, new_keys, renames, drops)
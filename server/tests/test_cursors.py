@@ -0,0 +1,122 @@
+"""
+Keyset cursors come back from clients as opaque tokens: a tampered one
+must fail as ValueError("Invalid cursor") — a 400 — never as some other
+exception or a database error (see app/services/row_service.py
+POSITION and row_query.RowSort.restore).
+"""
+
+import base64
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+
+import app.models  # noqa: F401 — configures the mappers Row depends on
+from app.models.row import Row
+from app.services import row_service
+from app.services.row_query import compile_sort
+
+ROW_ID = "6f1c1f0e-6a2b-4a43-9d3e-2b7f9a0c1d2e"
+
+COLUMNS = [
+    {"key": "name", "label": "Name", "type": "string", "order": 0},
+    {"key": "score", "label": "Score", "type": "number", "order": 1},
+    {"key": "paid", "label": "Paid", "type": "boolean", "order": 2},
+    {
+        "key": "status",
+        "label": "Status",
+        "type": "dropdown",
+        "order": 3,
+        "options": ["Pending", "Selected"],
+    },
+]
+
+
+def _token(position) -> str:
+    raw = json.dumps(position).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    row = Row(id=uuid.UUID(ROW_ID), order_key="a0V", row_order=3.5)
+    assert row_service.decode_cursor(row_service.encode_cursor(row)) == (
+        "a0V",
+        3.5,
+        uuid.UUID(ROW_ID),
+    )
+    token = row_service.encode_sorted_cursor(Decimal("1.5"), row)
+    assert row_service.decode_sorted_cursor(token) == (
+        "1.5",
+        "a0V",
+        3.5,
+        uuid.UUID(ROW_ID),
+    )
+
+
+@pytest.mark.parametrize(
+    "position",
+    [
+        ["a", 1, 123],
+        ["a", 1, [1]],
+        ["a", 1, {"id": ROW_ID}],
+        ["a", 1, None],
+        ["a", 1, "not-a-uuid"],
+        [None, 1, ROW_ID],
+        [1, 1, ROW_ID],
+        ["a\u0000", 1, ROW_ID],
+        ["a", "x", ROW_ID],
+        ["a", [1], ROW_ID],
+        ["a", 10**400, ROW_ID],
+        ["a", 1],
+        {"a": 1},
+        "a",
+    ],
+)
+def test_malformed_cursor(position):
+    with pytest.raises(ValueError, match="^Invalid cursor$"):
+        row_service.decode_cursor(_token(position))
+    if isinstance(position, list) and len(position) == 3:
+        with pytest.raises(ValueError, match="^Invalid cursor$"):
+            row_service.decode_sorted_cursor(_token(["x", *position]))
+
+
+@pytest.mark.parametrize("token", ["", "!!!", "bm90IGpzb24", _token(None)])
+def test_undecodable_cursor(token):
+    with pytest.raises(ValueError, match="^Invalid cursor$"):
+        row_service.decode_cursor(token)
+
+
+@pytest.mark.parametrize(
+    ("key", "value", "restored"),
+    [
+        ("score", "1.5", Decimal("1.5")),
+        ("score", 2, Decimal(2)),
+        ("paid", False, False),
+        ("status", 2, 2),
+        ("name", "Asha", "Asha"),
+        ("name", None, None),
+    ],
+)
+def test_sort_value_restore(key, value, restored):
+    assert compile_sort(key, COLUMNS).restore(value) == restored
+
+
+@pytest.mark.parametrize(
+    ("key", "value"),
+    [
+        ("score", True),
+        ("score", [1]),
+        ("score", {"a": 1}),
+        ("paid", "true"),
+        ("paid", 1),
+        ("status", True),
+        ("status", "Pending"),
+        ("name", 1),
+        ("name", {"a": 1}),
+        ("name", "a\u0000b"),
+    ],
+)
+def test_sort_value_restore_rejects(key, value):
+    with pytest.raises((TypeError, ValueError)):
+        compile_sort(key, COLUMNS).restore(value)
@@ -0,0 +1,328 @@
+"""
+Formula engine: parsing, type checking, cycle detection, and agreement
+between the per-row Python evaluator and the per-batch Arrow evaluator
+(see app/services/formula_engine.py TWO EVALUATORS, SAME RULES).
+"""
+
+import itertools
+
+import pytest
+
+from app.services import formula_engine
+from app.services.formula_engine import (
+    ARROW_MIN_ROWS,
+    FormulaSet,
+    changed_formulas,
+    compile_formulas,
+)
+
+COLUMNS = [
+    {"key": "name", "label": "Name", "type": "string", "order": 0},
+    {"key": "score", "label": "Score", "type": "number", "order": 1},
+    {"key": "bonus", "label": "Bonus", "type": "number", "order": 2},
+    {"key": "flag", "label": "Flag", "type": "boolean", "order": 3},
+    {"key": "other", "label": "Other", "type": "boolean", "order": 4},
+    {
+        "key": "status",
+        "label": "Status",
+        "type": "dropdown",
+        "order": 5,
+        "options": ["Pending", "Selected"],
+    },
+    {"key": "roll no", "label": "Roll No", "type": "number", "order": 6},
+]
+
+
+def _schema(**formulas: str) -> list[dict]:
+    return COLUMNS + [
+        {"key": key, "label": key, "type": "formula", "formula": text, "order": 10 + i}
+        for i, (key, text) in enumerate(formulas.items())
+    ]
+
+
+def _compile(**formulas: str) -> FormulaSet:
+    return compile_formulas(_schema(**formulas))
+
+
+def _both(formulas: FormulaSet, rows: list[dict]) -> tuple[list[dict], list[dict]]:
+    """(Python results, Arrow results) for the same rows."""
+    python = [formulas.compute(row) for row in rows]
+    # Repeat the rows so the batch is long enough for the Arrow kernels.
+    copies = -(-ARROW_MIN_ROWS // len(rows))
+    arrow = formulas.compute_batch(rows * copies)[: len(rows)]
+    return python, arrow
+
+
+# ── Parser and type checker ──────────────────────────────
+
+
+@pytest.mark.parametrize(
+    ("text", "error"),
+    [
+        ("score +", "invalid syntax"),
+        ("missing + 1", "unknown column 'missing'"),
+        ("__import__('os')", "is not a function"),
+        ("score.real", "'score.real' is not supported"),
+        ("name[0]", "'name\\[0\\]' is not supported"),
+        ("[score]", "is not supported"),
+        ("score ** 2", "only \\+ - \\* / are supported"),
+        ("score + name", "'\\+' needs a number, 'name' is a string"),
+        ("flag and score", "'and' needs a boolean, 'score' is a number"),
+        ("not name", "'not' needs a boolean"),
+        ("concat(name, score)", "concat\\(\\) needs a string, 'score' is a number"),
+        ("1 if flag else 'x'", "'else' needs a number"),
+        ("flag < other", "needs numbers or text, not booleans"),
+        ("1 < score < 3", "compare two values"),
+        ("round(score, 11)", "digit count"),
+        ("round(score, 1.5)", "digit count"),
+        ("round(score, ndigits=1)", "takes no keyword arguments"),
+        ("round(score, 1, 2)", "takes a number and optionally a digit count"),
+        ("abs", "'abs' is a function"),
+        ("min()", "needs at least one argument"),
+        ("col(1)", "col\\(\\) takes one column key"),
+        ("1e999", "is not a finite number"),
+        ("None", "is not supported"),
+    ],
+)
+def test_rejected_formulas(text, error):
+    with pytest.raises(ValueError, match=f"^Formula 't': .*{error}"):
+        _compile(t=text)
+
+
+def test_formula_columns_need_text():
+    schema = COLUMNS + [{"key": "t", "label": "T", "type": "formula", "order": 9}]
+    with pytest.raises(ValueError, match="Formula column 't' needs a formula"):
+        compile_formulas(schema)
+
+
+def test_only_formula_columns_have_formulas():
+    schema = COLUMNS + [
+        {"key": "t", "label": "T", "type": "number", "order": 9, "formula": "1"}
+    ]
+    with pytest.raises(ValueError, match="isn't a formula column"):
+        compile_formulas(schema)
+
+
+def test_result_types_are_inferred():
+    formulas = _compile(
+        total="score + bonus",
+        passed="score >= 80 and status == 'Selected'",
+        label="'Yes' if passed else 'No'",
+        roll='col("roll no") * 2',
+        first="coalesce(name, label)",
+    )
+    types = {formula.key: formula.result_type for formula in formulas.formulas}
+    assert types == {
+        "total": "number",
+        "passed": "boolean",
+        "label": "string",
+        "roll": "number",
+        "first": "string",
+    }
+
+
+# ── Dependency graph ─────────────────────────────────────
+
+
+def test_self_reference_is_rejected():
+    with pytest.raises(ValueError, match="Formula 't' refers to itself"):
+        _compile(t="t + 1")
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(ValueError, match="Formulas refer to each other: a → b → c → a"):
+        _compile(a="b + 1", b="c + 1", c="a + score")
+
+
+def test_cycle_through_col_is_rejected():
+    with pytest.raises(ValueError, match="refer to each other"):
+        _compile(a='col("b") + 1', b="a * 2")
+
+
+def test_formulas_run_in_dependency_order():
+    formulas = _compile(grand="total * 2", total="score + bonus")
+    assert [formula.key for formula in formulas.formulas] == ["total", "grand"]
+    assert formulas.formulas[1].sources == {"total", "score", "bonus"}
+    assert formulas.compute({"score": 2, "bonus": 3}) == {"total": 5, "grand": 10}
+
+
+def test_affected_follows_dependencies():
+    formulas = _compile(total="score + bonus", grand="total * 2", tag="concat(name)")
+    assert [formula.key for formula in formulas.affected(["bonus"])] == [
+        "total",
+        "grand",
+    ]
+    assert [formula.key for formula in formulas.affected(["name"])] == ["tag"]
+    assert formulas.affected(["status"]) == ()
+
+
+def test_changed_formulas():
+    old = _compile(total="score + bonus", grand="total * 2", tag="concat(name)")
+    new = _compile(total="score - bonus", grand="total * 2", tag="concat(name)")
+    assert changed_formulas(old, new) == ["total", "grand"]
+    assert changed_formulas(old, old) == []
+
+
+def test_input_type_change_counts_as_changed():
+    old = _compile(double="bonus * 2")
+    schema = [
+        {**col, "type": "string"} if col["key"] == "bonus" else col
+        for col in _schema(double="concat(bonus)")
+    ]
+    new = compile_formulas(schema)
+    assert changed_formulas(old, new) == ["double"]
+
+
+# ── Python and Arrow evaluators agree ────────────────────
+
+
+@pytest.mark.parametrize("ndigits", [0, 1, 2, -1, -2])
+def test_round_half_to_even(ndigits):
+    formulas = _compile(r=f"round(score, {ndigits})")
+    values = [
+        0.5, 1.5, 2.5, -0.5, -1.5, -2.5, 0.125, 0.375, 2.675, 1.005,
+        15, 25, 35, -25, 150, 250, 1234.5678, 1e300, -1e300, 0, None,
+    ]  # fmt: skip
+    rows = [{"score": value} for value in values]
+    python, arrow = _both(formulas, rows)
+    assert python == arrow
+
+
+def test_round_half_to_even_values():
+    formulas = _compile(r="round(score)", r2="round(score, 2)", r_1="round(score, -1)")
+    results = [
+        formulas.compute({"score": value}) for value in (0.5, 1.5, 2.5, -2.5, 0.125, 25)
+    ]
+    assert [result["r"] for result in results] == [0, 2, 2, -2, 0, 25]
+    assert results[4]["r2"] == 0.12
+    assert results[5]["r_1"] == 20
+
+
+def test_division_by_zero_is_empty():
+    formulas = _compile(q="score / bonus", neg="-score / bonus", zero="bonus / 0")
+    rows = [
+        {"score": 1, "bonus": 0},
+        {"score": 0, "bonus": 0},
+        {"score": -3, "bonus": 0.0},
+        {"score": 6, "bonus": 3},
+        {"score": 1, "bonus": 3},
+        {"score": None, "bonus": 2},
+        {"score": 2, "bonus": None},
+        {"score": "n/a", "bonus": "0"},
+    ]
+    python, arrow = _both(formulas, rows)
+    assert python == arrow
+    assert [result["q"] for result in python] == [
+        None, None, None, 2, 1 / 3, None, None, None,
+    ]  # fmt: skip
+    assert all(result["zero"] is None for result in python)
+
+
+def test_overflow_is_empty():
+    formulas = _compile(big="score * score")
+    python, arrow = _both(formulas, [{"score": 1e200}, {"score": 3}])
+    assert python == arrow == [{"big": None}, {"big": 9}]
+
+
+BOOLEANS = [True, False, None]
+
+
+def test_and_or_not_with_empty_operands():
+    formulas = _compile(
+        a="flag and other",
+        o="flag or other",
+        n="not flag",
+        a3="flag and other and score > 1",
+        o3="flag or other or score > 1",
+    )
+    rows = [
+        {"flag": flag, "other": other, "score": score}
+        for flag, other, score in itertools.product(BOOLEANS, BOOLEANS, [0, 2, None])
+    ]
+    python, arrow = _both(formulas, rows)
+    assert python == arrow
+    by_operands = {
+        (row["flag"], row["other"]): result for row, result in zip(rows, python)
+    }
+    # Three-valued logic: a deciding operand wins over an empty one.
+    assert by_operands[(None, False)]["a"] is False
+    assert by_operands[(None, True)]["a"] is None
+    assert by_operands[(None, True)]["o"] is True
+    assert by_operands[(None, False)]["o"] is None
+    assert by_operands[(None, None)]["n"] is None
+
+
+def test_conditional_and_functions_agree():
+    formulas = _compile(
+        pick="score if flag else bonus",
+        low="min(score, bonus, 10)",
+        high="max(score, bonus)",
+        first="coalesce(score, bonus, 0)",
+        size="abs(score - bonus)",
+        tag="concat(name, '-', status)",
+        cmp="name == 'b' or status != 'Pending'",
+    )
+    rows = [
+        {
+            "name": name,
+            "score": score,
+            "bonus": bonus,
+            "flag": flag,
+            "status": status,
+        }
+        for name, score, bonus, flag, status in itertools.product(
+            ["a", "b", None],
+            [-2.5, 4, None, " 7 "],
+            [3, None],
+            BOOLEANS,
+            ["Pending", "Selected", "Other", None],
+        )
+    ]
+    python, arrow = _both(formulas, rows)
+    assert python == arrow
+
+
+# ── Batch size threshold ─────────────────────────────────
+
+
+@pytest.mark.parametrize(
+    "size", [ARROW_MIN_ROWS - 1, ARROW_MIN_ROWS, ARROW_MIN_ROWS + 1]
+)
+def test_batches_around_arrow_threshold(size, monkeypatch):
+    formulas = _compile(
+        total="score / bonus + 0.5",
+        r="round(total, 1)",
+        ok="flag and total > 1",
+        label="'big' if ok else concat(name, '!')",
+    )
+    rows = [
+        {
+            "name": f"n{i}",
+            "score": i * 0.5 if i % 7 else None,
+            "bonus": i % 4,
+            "flag": BOOLEANS[i % 3],
+        }
+        for i in range(size)
+    ]
+    expected = [formulas.compute(row) for row in rows]
+
+    python_calls = 0
+    compute = FormulaSet.compute
+
+    def counting(self, data, formulas=None):
+        nonlocal python_calls
+        python_calls += 1
+        return compute(self, data, formulas)
+
+    monkeypatch.setattr(FormulaSet, "compute", counting)
+    assert formulas.compute_batch(rows) == expected
+    # Short batches stay in Python; from ARROW_MIN_ROWS on, Arrow does it all.
+    assert python_calls == (size if size < formula_engine.ARROW_MIN_ROWS else 0)
+
+
+def test_apply_batch_keeps_row_data():
+    formulas = _compile(total="score + bonus")
+    rows = [{"name": "x", "score": i, "bonus": 1} for i in range(ARROW_MIN_ROWS)]
+    applied = formulas.apply_batch(rows)
+    assert applied[5] == {"name": "x", "score": 5, "bonus": 1, "total": 6}
+    assert applied == [formulas.apply(row) for row in rows]
@@ -0,0 +1,125 @@
+"""
+FastJSONResponse / dumps(row_payloads(...)) must produce what RowResponse
+would have — see app/core/serialization.py SAME OUTPUT AS RowResponse.
+
+Each case is checked for every row shape row_payload() accepts: ORM Row
+objects, column tuples in ROW_FIELDS order, and mappings.
+"""
+
+import json
+import uuid
+from datetime import UTC, datetime, timedelta, timezone
+
+import pydantic_core
+import pytest
+
+import app.models  # noqa: F401 — configures the mappers Row depends on
+from app.core.serialization import (
+    ROW_FIELDS,
+    FastJSONResponse,
+    dumps,
+    row_payload,
+    row_payloads,
+)
+from app.models.row import Row
+from app.schemas.row import RowResponse
+
+CREATED = datetime(2026, 10, 17, 9, 30, 15, 123456, tzinfo=UTC)
+
+
+def _fields(**overrides) -> dict:
+    fields = {
+        "id": uuid.UUID("6f1c1f0e-6a2b-4a43-9d3e-2b7f9a0c1d2e"),
+        "sheet_id": uuid.UUID("0b8e3c55-1d7a-4c2e-8f60-7a9d2e4b1c3f"),
+        "data": {"name": "Asha", "score": 87, "status": "Selected"},
+        "row_order": 3.5,
+        "order_key": "",
+        "version": 2,
+        "change_seq": 41,
+        "created_at": CREATED,
+        "updated_at": CREATED + timedelta(minutes=5),
+    }
+    fields.update(overrides)
+    return fields
+
+
+CASES = {
+    "plain": _fields(),
+    "none_cells": _fields(data={"name": None, "score": None, "notes": ""}),
+    "nested_json": _fields(
+        data={
+            "tags": ["a", "b", {"deep": [1, 2.5, None, True]}],
+            "meta": {"source": "import", "ids": [uuid.uuid4().hex], "ok": False},
+            "unicode": "Zoë — ✓",
+        }
+    ),
+    "empty_data": _fields(data={}),
+    "uuid_cell": _fields(data={"ref": str(uuid.uuid4())}),
+    "whole_row_order": _fields(row_order=7.0, order_key="a0V"),
+    "no_microseconds": _fields(created_at=datetime(2026, 1, 1, tzinfo=UTC)),
+    "other_timezone": _fields(
+        updated_at=datetime(
+            2026, 3, 4, 5, 6, 7, 890, tzinfo=timezone(timedelta(hours=5, minutes=30))
+        )
+    ),
+}
+
+
+def _orm(fields: dict) -> Row:
+    return Row(**fields)
+
+
+def _tuple(fields: dict) -> tuple:
+    return tuple(fields[field] for field in ROW_FIELDS)
+
+
+def _mapping(fields: dict) -> dict:
+    return dict(fields)
+
+
+SHAPES = {"orm": _orm, "tuple": _tuple, "mapping": _mapping}
+
+
+def _expected(rows: list[dict]) -> list[dict]:
+    return [
+        RowResponse.model_validate(fields).model_dump(mode="json") for fields in rows
+    ]
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("case", CASES)
+def test_dumps_matches_row_response(case, shape):
+    fields = CASES[case]
+    body = dumps(row_payloads([SHAPES[shape](fields)]))
+    expected = _expected([fields])
+    assert json.loads(body) == expected
+    # Same bytes too, not just the same values.
+    assert body == pydantic_core.to_json(expected)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_orm_row_matches_from_attributes(case):
+    # RowResponse.model_validate(row) — what the routes did before dumps().
+    row = _orm(CASES[case])
+    expected = RowResponse.model_validate(row).model_dump(mode="json")
+    assert json.loads(dumps(row_payload(row))) == expected
+
+
+def test_fast_json_response_body_matches_row_response():
+    rows = [SHAPES[shape](fields) for shape in SHAPES for fields in CASES.values()]
+    expected = _expected([fields for _ in SHAPES for fields in CASES.values()])
+    response = FastJSONResponse({"rows": row_payloads(rows), "next_cursor": None})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"rows": expected, "next_cursor": None}
+    assert response.body == pydantic_core.to_json(
+        {"rows": expected, "next_cursor": None}
+    )
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_big_integer_cell_falls_back_to_pydantic(shape):
+    # orjson can't encode ints beyond 64 bits; dumps() must still succeed.
+    fields = _fields(data={"huge": 2**70, "small": -(2**65)})
+    body = dumps(row_payloads([SHAPES[shape](fields)]))
+    assert json.loads(body) == _expected([fields])
+    assert body == pydantic_core.to_json(_expected([fields]))